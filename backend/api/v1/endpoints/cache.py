@@ -0,0 +1,78 @@
+"""
+Embedding cache API endpoints.
+Exposes live cache accounting for tuning cache sizes from real traffic,
+and snapshot export/import for prewarming new workers and nodes.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from app.cache import get_embedding_cache, default_snapshot_path
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get(
+    "/cache/stats",
+    summary="Get embedding cache statistics",
+    description="Returns entry count, size, hits, misses, evictions and average lookup latency for this worker's embedding cache."
+)
+async def get_cache_stats():
+    """
+    Get live embedding cache statistics (constant time, no disk scan).
+    """
+    return {
+        "status": "success",
+        "stats": get_embedding_cache().get_stats()
+    }
+
+@router.post(
+    "/cache/snapshot",
+    summary="Export embedding cache snapshot",
+    description="Writes all live embedding cache entries to a compressed snapshot keyed by embedding model name and version."
+)
+async def export_cache_snapshot():
+    """
+    Export the embedding cache to `cache/snapshots/embeddings-<model>@<version>.npz`.
+    """
+    try:
+        snapshot = await run_in_threadpool(get_embedding_cache().export_snapshot)
+        return {"status": "success", "snapshot": snapshot}
+    except Exception as e:
+        logger.error(f"Snapshot export failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Snapshot export failed: {str(e)}")
+
+@router.get(
+    "/cache/snapshot",
+    response_class=FileResponse,
+    summary="Download embedding cache snapshot",
+    description="Downloads the latest snapshot for the configured embedding model, for prewarming other nodes."
+)
+async def download_cache_snapshot():
+    """
+    Stream the snapshot file for the configured embedding model.
+    """
+    path = default_snapshot_path()
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="No snapshot exported for the current embedding model")
+    return FileResponse(path=path, media_type="application/octet-stream", filename=path.name)
+
+@router.post(
+    "/cache/snapshot/import",
+    summary="Import embedding cache snapshot",
+    description="Loads a snapshot into the embedding cache. Snapshots from a different embedding model are ignored."
+)
+async def import_cache_snapshot():
+    """
+    Import the snapshot for the configured embedding model.
+    """
+    try:
+        result = await run_in_threadpool(get_embedding_cache().import_snapshot)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No snapshot found for the current embedding model")
+    except Exception as e:
+        logger.error(f"Snapshot import failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Snapshot import failed: {str(e)}")
+
+    return {"status": "success", "result": result}
@@ -0,0 +1,30 @@
+"""
+Embedding generation API endpoints.
+Exposes micro-batching statistics for tuning batch wait time and size,
+and the shared embedding server's stats when one is configured.
+"""
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.embeddings import get_embedding_dispatcher, get_embedding_server_info
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get(
+    "/embeddings/stats",
+    summary="Get embedding micro-batching statistics",
+    description="Returns the batch-size histogram and batching totals of this worker's embedding dispatcher, plus the shared embedding server's stats if configured."
+)
+async def get_embedding_stats():
+    """
+    Get live micro-batching statistics for this worker.
+    """
+    return {
+        "status": "success",
+        "microbatch_enabled": settings.EMBEDDING_MICROBATCH_ENABLED,
+        "stats": get_embedding_dispatcher().get_stats(),
+        "server": await run_in_threadpool(get_embedding_server_info) if settings.EMBEDDING_SERVER_SOCKET else None
+    }
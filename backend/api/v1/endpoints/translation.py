@@ -4,8 +4,10 @@ Provides RAG-based high-fidelity translation for manifestations.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.schemas import TranslationRequest, TranslationResponse
 from app.rag_translate import translate_with_rag, get_supported_languages
+from app.translation_memory import get_translation_memory
 import logging
 import os
 from datetime import datetime
@@ -50,8 +52,10 @@ async def translate_manifestation(request: TranslationRequest):
         # Set username for vector store
         username = request.username or "anonymous"
         
-        # Perform RAG-based translation
-        translated_text = translate_with_rag(
+        # Perform RAG-based translation (blocking embedding, vector store and
+        # LLM calls run off the event loop)
+        translated_text = await run_in_threadpool(
+            translate_with_rag,
             text=request.text,
             target_language=request.target_language,
             username=username
@@ -105,3 +109,17 @@ async def get_languages():
         "status": "success",
         "languages": get_supported_languages()
     }
+
+@router.get(
+    "/translation-memory/stats",
+    summary="Get translation memory statistics",
+    description="Returns entry counts per language and this worker's exact-match hit/miss counters."
+)
+async def get_translation_memory_stats():
+    """
+    Get exact-match translation memory statistics.
+    """
+    return {
+        "status": "success",
+        "stats": get_translation_memory().get_stats()
+    }
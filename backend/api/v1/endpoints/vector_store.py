@@ -0,0 +1,58 @@
+"""
+Vector store API endpoints.
+Exposes collection sizes per shard, the write-behind queue and the
+retention job's last report, and lets operators trigger an
+eviction/compaction run.
+"""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from app.async_vector_store import get_collection_stats_async, get_vector_store_writer
+from app.config import settings
+from app.retention import get_retention_job
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get(
+    "/vector-store/stats",
+    summary="Get vector store statistics",
+    description="Returns chunk counts per shard, this worker's write-behind queue, and the retention settings and last eviction report."
+)
+async def get_vector_store_stats():
+    """
+    Get vector store sizes and retention state.
+    """
+    return {
+        "status": "success",
+        "stats": await get_collection_stats_async(),
+        "write_behind": get_vector_store_writer().get_stats() if settings.VECTOR_STORE_WRITE_BEHIND else None,
+        "retention": get_retention_job().get_stats()
+    }
+
+@router.post(
+    "/vector-store/retention",
+    summary="Run vector store retention now",
+    description="Evicts expired and over-cap chunks, compacts the store and reports reclaimed space. Returns 409 if a run is already in progress."
+)
+async def run_vector_store_retention(dry_run: bool = False):
+    """
+    Run one eviction and compaction pass (or only report it with `dry_run=true`).
+    """
+    job = get_retention_job()
+    if not job.enabled:
+        raise HTTPException(
+            status_code=400,
+            detail="Retention is disabled; set VECTOR_STORE_MAX_CHUNKS_PER_USER or VECTOR_STORE_TTL_DAYS"
+        )
+
+    try:
+        report = await run_in_threadpool(job.run, dry_run)
+    except Exception as e:
+        logger.error(f"Vector store retention failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Retention failed: {str(e)}")
+
+    if not report:
+        raise HTTPException(status_code=409, detail="A retention run is already in progress")
+    return {"status": "success", "report": report}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import manifestation, tts, translation, background_audio, finalize, profile, vedic
+from .endpoints import manifestation, tts, translation, background_audio, finalize, profile, vedic, cache, embeddings, vector_store
 
 api_router = APIRouter()
 
@@ -10,5 +10,8 @@ api_router.include_router(background_audio.router, tags=["Background Audio"])
 api_router.include_router(finalize.router, tags=["Finalization"])
 api_router.include_router(profile.router, prefix="/profile", tags=["Profile Ingest"])
 api_router.include_router(vedic.router, tags=["Vedic Context"])
+api_router.include_router(cache.router, tags=["Cache"])
+api_router.include_router(embeddings.router, tags=["Embeddings"])
+api_router.include_router(vector_store.router, tags=["Vector Store"])
 
 
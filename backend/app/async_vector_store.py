@@ -0,0 +1,309 @@
+"""
+Non-blocking access to the vector store.
+
+Reads (RAG context retrieval and collection stats) run on a dedicated,
+bounded thread pool (VECTOR_STORE_READ_WORKERS), so slow Chroma queries
+neither block the event loop nor pile up on the threadpool FastAPI uses
+for everything else. Writes of finished
+translations (the vector store upsert and the exact-match translation
+memory rows) go into a write-behind queue that a background thread flushes
+in batches, so a translation response never waits on index inserts.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import settings
+from .translation_memory import get_translation_memory
+from .vector_store import (
+    as_matrix,
+    get_collection_stats,
+    retrieve_similar_chunks,
+    retrieve_similar_chunks_batch,
+    store_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def store_translations(
+    chunks: List[str],
+    embeddings: Union[List[List[float]], np.ndarray],
+    username: str,
+    session_id: str,
+    language: str,
+    translations: List[str]
+) -> None:
+    """
+    Persist freshly translated chunks: upsert them with their translation into
+    the vector store, and record them in the exact-match translation memory.
+    Failures are logged, never raised; both stores are caches of the LLM output.
+    """
+    try:
+        store_chunks(
+            chunks=chunks,
+            embeddings=embeddings,
+            username=username,
+            session_id=session_id,
+            translations={language: translations}
+        )
+        logger.info(f"Stored {language} translations in vector DB for translation memory")
+    except Exception as e:
+        logger.warning(f"Failed to store translations: {e}")
+
+    if settings.TRANSLATION_MEMORY_ENABLED:
+        try:
+            get_translation_memory().store_many(chunks, translations, language, username)
+        except Exception as e:
+            logger.warning(f"Failed to update exact-match translation memory: {e}")
+
+
+class VectorStoreWriter:
+    """
+    Write-behind queue for translation results.
+
+    Queued results of the same user and language are merged into one
+    upsert per flush. When the queue is full the caller writes its own
+    batch synchronously, which bounds memory and slows producers down
+    instead of dropping data.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, max_pending: int = 1000, batch_size: int = 64):
+        """
+        Initialize the writer (the flush thread starts on first submit).
+
+        Args:
+            flush_interval: Seconds between background flushes
+            max_pending: Queued results before submit() writes synchronously
+            batch_size: Queued results that trigger an early flush
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        # Serializes flushes so queued writes for a key land in submission order
+        self._flush_lock = threading.Lock()
+        self._pending: List[Dict] = []
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "submitted": 0, "written": 0, "flushes": 0, "sync_writes": 0, "flush_seconds": 0.0
+        }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="vector-store-writer", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Vector store write-behind flush failed: {e}")
+
+    def submit(
+        self,
+        chunks: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        username: str,
+        session_id: str,
+        language: str,
+        translations: List[str]
+    ) -> None:
+        """Queue one request's translated chunks for persistence (see store_translations)."""
+        item = {
+            "chunks": list(chunks),
+            "embeddings": as_matrix(embeddings),
+            "username": username,
+            "session_id": session_id,
+            "language": language,
+            "translations": list(translations)
+        }
+
+        with self._lock:
+            self._stats["submitted"] += 1
+            overflow = self._closing.is_set() or len(self._pending) >= self.max_pending
+            if not overflow:
+                self._pending.append(item)
+                queued = len(self._pending)
+
+        if overflow:
+            with self._lock:
+                self._stats["sync_writes"] += 1
+            self._write([item])
+            return
+
+        self._ensure_thread()
+        if queued >= self.batch_size:
+            self._wake.set()
+
+    @staticmethod
+    def _merge(items: Sequence[Dict]) -> List[Dict]:
+        """Combine queued results per (user, language), keeping submission order."""
+        groups: Dict[Tuple[str, str], Dict] = {}
+        for item in items:
+            key = (item["username"], item["language"])
+            group = groups.get(key)
+            if group is None:
+                groups[key] = {**item, "chunks": list(item["chunks"]),
+                               "embeddings": [item["embeddings"]], "translations": list(item["translations"])}
+                continue
+            group["chunks"].extend(item["chunks"])
+            group["embeddings"].append(item["embeddings"])
+            group["translations"].extend(item["translations"])
+            # Later writes win, as they would have with synchronous upserts
+            group["session_id"] = item["session_id"]
+
+        for group in groups.values():
+            group["embeddings"] = np.concatenate(group["embeddings"])
+        return list(groups.values())
+
+    def _write(self, items: Sequence[Dict]) -> int:
+        with self._flush_lock:
+            started = time.perf_counter()
+            for group in self._merge(items):
+                store_translations(
+                    group["chunks"],
+                    group["embeddings"],
+                    group["username"],
+                    group["session_id"],
+                    group["language"],
+                    group["translations"]
+                )
+            with self._lock:
+                self._stats["written"] += len(items)
+                self._stats["flushes"] += 1
+                self._stats["flush_seconds"] += time.perf_counter() - started
+        return len(items)
+
+    def flush(self) -> int:
+        """
+        Write everything queued so far.
+
+        Returns:
+            Number of queued results written
+        """
+        with self._lock:
+            items, self._pending = self._pending, []
+        if not items:
+            return 0
+        return self._write(items)
+
+    def close(self) -> None:
+        """Stop the flush thread and write whatever is still queued."""
+        self._closing.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=30)
+        self.flush()
+
+    def get_stats(self) -> Dict:
+        """
+        Get write-behind queue statistics for this worker.
+
+        Returns:
+            Dict with queue depth and flush counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "max_pending": self.max_pending,
+            "submitted": stats["submitted"],
+            "written": stats["written"],
+            "flushes": stats["flushes"],
+            "sync_writes": stats["sync_writes"],
+            "avg_flush_ms": round(stats["flush_seconds"] / stats["flushes"] * 1000, 2) if stats["flushes"] else 0.0
+        }
+
+
+# Global read executor and writer (singletons)
+_read_executor: Optional[ThreadPoolExecutor] = None
+_writer: Optional[VectorStoreWriter] = None
+_init_lock = threading.Lock()
+
+def get_read_executor() -> ThreadPoolExecutor:
+    """
+    Get the bounded thread pool for vector store reads (singleton).
+
+    Returns:
+        ThreadPoolExecutor with VECTOR_STORE_READ_WORKERS threads
+    """
+    global _read_executor
+
+    if _read_executor is None:
+        with _init_lock:
+            if _read_executor is None:
+                _read_executor = ThreadPoolExecutor(
+                    max_workers=max(settings.VECTOR_STORE_READ_WORKERS, 1),
+                    thread_name_prefix="vector-store-read"
+                )
+
+    return _read_executor
+
+def get_vector_store_writer() -> VectorStoreWriter:
+    """
+    Get global write-behind writer instance (singleton).
+
+    Returns:
+        VectorStoreWriter instance
+    """
+    global _writer
+
+    if _writer is None:
+        with _init_lock:
+            if _writer is None:
+                _writer = VectorStoreWriter(
+                    flush_interval=settings.VECTOR_STORE_FLUSH_INTERVAL_S,
+                    max_pending=settings.VECTOR_STORE_WRITE_QUEUE_SIZE
+                )
+
+    return _writer
+
+def shutdown_vector_store_io() -> None:
+    """Flush queued writes and stop the read executor."""
+    if _writer is not None:
+        _writer.close()
+    if _read_executor is not None:
+        _read_executor.shutdown(wait=True)
+
+
+def _read_blocking(fn, *args, **kwargs):
+    return get_read_executor().submit(fn, *args, **kwargs).result()
+
+async def _read(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_read_executor(), functools.partial(fn, *args, **kwargs))
+
+def retrieve_similar_chunks_bounded(
+    query_embedding: Union[List[float], np.ndarray],
+    top_k: int = 3,
+    username: Optional[str] = None
+) -> List[Dict]:
+    """retrieve_similar_chunks on the read executor; blocks the calling worker thread until done."""
+    return _read_blocking(retrieve_similar_chunks, query_embedding, top_k=top_k, username=username)
+
+def retrieve_similar_chunks_batch_bounded(
+    query_embeddings: Union[List[List[float]], np.ndarray],
+    top_k: int = 3,
+    username: Optional[str] = None
+) -> List[List[Dict]]:
+    """retrieve_similar_chunks_batch on the read executor; blocks the calling worker thread until done."""
+    return _read_blocking(retrieve_similar_chunks_batch, query_embeddings, top_k=top_k, username=username)
+
+async def get_collection_stats_async() -> Dict:
+    """Async get_collection_stats, run on the read executor."""
+    return await _read(get_collection_stats)
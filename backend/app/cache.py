@@ -1,130 +1,1227 @@
 """
 Embedding caching system for performance optimization.
 Uses hash-based persistent caching to avoid re-generating embeddings.
+
+Storage layout (one "generation" of files is live at a time):
+
+    cache/embeddings/
+        CURRENT              -> number of the live generation
+        index.<gen>.bin      -> header + fixed-size (hash, offset, dim, created, atime) records
+        vectors.<gen>.f32    -> append-only segment, memory-mapped for reads; vectors are
+                                float32 unless the header names a compact codec
+                                (float16 / int8, see vector_codec)
+        .lock                -> flock() target serialising writers across workers
+
+The disk tier is bounded: a background compactor drops expired entries
+(TTL on creation time) and the least recently accessed ones (LRU on the
+shared `atime` column) into a fresh generation, then switches CURRENT.
+
+In front of the disk tier every process keeps a bounded LRU of recently
+used vectors (`MemoryTier`), so repeat lookups never leave the process.
+
+Writers append the vector bytes first and the index record second, so a
+reader never sees an index entry pointing at a half-written vector.
 """
 
+import atexit
 import hashlib
 import json
 import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import settings
+from .vector_codec import get_codec
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+INDEX_MAGIC = b"AFEMBIDX"
+INDEX_VERSION = 4
+# magic, version, vector codec, fingerprint of the embedding model identity
+INDEX_HEADER = struct.Struct("<8sIB3x16s")
+# Version 3 had no codec byte (zero padding there) and was always float32
+
+# Packed on-disk index record. `key` is the first 8 bytes of SHA256(text).
+# `atime` is updated in place (shared mmap) on every hit.
+INDEX_DTYPE = np.dtype([
+    ("key", "<u8"),
+    ("offset", "<u8"),
+    ("dim", "<u4"),
+    ("created", "<f8"),
+    ("atime", "<f8"),
+])
+ATIME_FIELD = struct.Struct("<d")
+ATIME_OFFSET = INDEX_DTYPE.fields["atime"][1]
+
+VECTOR_DTYPE = np.dtype("<f4")
+
+SNAPSHOT_FORMAT = 1
+
+
+def embedding_model_identity() -> str:
+    """
+    Identity of the configured embedding model.
+    Cached vectors and snapshots are only valid for the identity that produced them.
+    """
+    identity = f"{settings.EMBEDDING_MODEL}@{settings.EMBEDDING_MODEL_VERSION}"
+    if settings.EMBEDDING_BACKEND != "torch":
+        # Quantized backends produce slightly different vectors
+        identity += f"+{settings.EMBEDDING_BACKEND}"
+    return identity
+
+
+def default_snapshot_path(identity: Optional[str] = None) -> Path:
+    """Snapshot file for a model identity, e.g. cache/snapshots/embeddings-<model>@<version>.npz"""
+    slug = re.sub(r"[^A-Za-z0-9@._-]+", "-", identity or embedding_model_identity())
+    return Path(settings.EMBEDDING_CACHE_SNAPSHOT_DIR) / f"embeddings-{slug}.npz"
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write the whole buffer, looping over short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+class MemoryTier:
+    """
+    Per-process LRU of embedding vectors bounded by a byte budget.
+
+    Vectors are private read-only copies, so they stay valid when the
+    disk tier is cleared or switches generation.
+    """
+
+    # Rough per-entry bookkeeping cost (ndarray header + OrderedDict node)
+    ENTRY_OVERHEAD_BYTES = 200
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: int) -> Optional[np.ndarray]:
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+        return vector
+
+    def put(self, key: int, vector: np.ndarray) -> None:
+        cost = vector.nbytes + self.ENTRY_OVERHEAD_BYTES
+        if cost > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+
+        vector = np.array(vector, dtype=VECTOR_DTYPE, copy=True)
+        vector.flags.writeable = False
+        self._entries[key] = vector
+        self._bytes += cost
+
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes + self.ENTRY_OVERHEAD_BYTES
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
 class EmbeddingCache:
     """
     Persistent cache for embeddings to improve translation performance.
-    
+
     Benefits:
     - First translation: Generate embeddings (~2-3s)
     - Subsequent translations: Load from cache (<0.1s)
     - Deterministic hashing ensures same text = same cache key
+    - Lookups are zero-copy views into a memory-mapped float32 segment (or decoded
+      from an opt-in float16 / int8 segment that is 2-4x smaller)
+    - Safe for several gunicorn workers writing at once (flock + append-only files)
+    - Hot vectors are served from an in-process LRU without touching disk
+    - New vectors are persisted by a write-behind thread, off the request path
     """
-    
-    def __init__(self, cache_dir: str = "./cache/embeddings"):
+
+    # Wake the writer early once this many entries are queued
+    WRITE_BATCH_SIZE = 256
+
+    # Compaction shrinks an over-budget cache to this fraction of max_bytes,
+    # and rewrites an in-budget one once this fraction of the segment is dead
+    COMPACT_LOW_WATER = 0.8
+    COMPACT_DEAD_RATIO = 0.25
+
+    def __init__(
+        self,
+        cache_dir: str = "./cache/embeddings",
+        memory_budget_bytes: int = 64 * 1024 * 1024,
+        write_behind: bool = True,
+        flush_interval: float = 1.0,
+        max_bytes: int = 0,
+        ttl_seconds: float = 0,
+        compact_interval: float = 300.0,
+        model_identity: str = "",
+        codec: str = "float32"
+    ):
         """
         Initialize embedding cache.
-        
+
         Args:
             cache_dir: Directory to store cached embeddings
+            memory_budget_bytes: Byte budget of the in-process LRU tier (0 disables it)
+            write_behind: Persist new entries on a background thread instead of inline
+            flush_interval: Seconds between write-behind flushes
+            max_bytes: Disk tier size limit, enforced by LRU eviction (0 = unbounded)
+            ttl_seconds: Maximum entry age on disk (0 = never expires)
+            compact_interval: Seconds between background compaction runs
+            model_identity: Embedding model that produced the vectors; a generation
+                            built for a different model is discarded
+            codec: On-disk vector encoding ("float32", "float16" or "int8");
+                   a generation written with another codec is discarded
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Embedding cache initialized at: {self.cache_dir}")
-    
+
+        self.model_identity = model_identity
+        self._codec = get_codec(codec)
+        fingerprint = hashlib.sha256(model_identity.encode('utf-8')).digest()[:16]
+        self._header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self._codec.code, fingerprint)
+        # Generations this cache can read; version 3 files are float32 with the same layout
+        self._readable_headers = {self._header}
+        if self._codec.code == 0:
+            self._readable_headers.add(INDEX_HEADER.pack(INDEX_MAGIC, 3, 0, fingerprint))
+
+        self._memory = MemoryTier(memory_budget_bytes)
+        # Running counters so get_stats() never has to scan the cache
+        self._stats = {
+            "memory_hits": 0,
+            "memory_misses": 0,
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "lookups": 0,
+            "lookup_seconds": 0.0
+        }
+
+        self._lock = threading.RLock()
+        self._lock_path = self.cache_dir / ".lock"
+        # In-process half of the writer lock (flock does not exclude threads sharing a descriptor)
+        self._file_mutex = threading.RLock()
+        self._file_lock_depth = 0
+        # Serializes flushes; a flush writes to disk without holding self._lock
+        self._flush_lock = threading.Lock()
+        self._clear_epoch = 0
+
+        # Write-behind queue: key -> vector not yet on disk
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, np.ndarray] = {}
+        self._writer: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+
+        # Eviction / compaction
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compact_interval = compact_interval
+        self._compact_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._disk_evictions = 0
+
+        # Per-process view of the live generation
+        self._generation: Optional[int] = None
+        self._index: Dict[int, Tuple[int, int, int, float]] = {}  # key -> (offset, dim, row, created)
+        self._index_pos = 0
+        self._vector_bytes = 0
+        self._index_map: Optional[mmap.mmap] = None  # writable, for atime updates
+        self._segment: Optional[mmap.mmap] = None
+        self._segment_size = 0
+
+        with self._lock:
+            self._migrate_legacy_json()
+            self._refresh()
+
+        if write_behind or max_bytes or ttl_seconds:
+            atexit.register(self.close)
+
+        if (max_bytes or ttl_seconds) and compact_interval > 0:
+            self._compactor = threading.Thread(
+                target=self._compactor_loop,
+                name="embedding-cache-compactor",
+                daemon=True
+            )
+            self._compactor.start()
+
+        logger.info(
+            f"Embedding cache initialized at: {self.cache_dir} "
+            f"(generation {self._generation}, {len(self._index)} entries)"
+        )
+
     def _get_hash(self, text: str) -> str:
         """
         Generate deterministic hash for text.
-        
+
         Args:
             text: Input text to hash
-            
+
         Returns:
             16-character hex hash
         """
         # Use SHA256 for deterministic hashing
-        # Truncate to 16 chars for shorter filenames
+        # Truncate to 16 chars (8 bytes) so the key fits in a uint64 index slot
         return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
-    
+
+    def _get_key(self, text: str) -> int:
+        """Integer form of `_get_hash`, as stored in the index file."""
+        return int(self._get_hash(text), 16)
+
+    # ------------------------------------------------------------------
+    # File layout helpers
+    # ------------------------------------------------------------------
+
+    def _index_path(self, generation: int) -> Path:
+        return self.cache_dir / f"index.{generation}.bin"
+
+    def _segment_path(self, generation: int) -> Path:
+        return self.cache_dir / f"vectors.{generation}.f32"
+
+    @contextmanager
+    def _file_lock(self):
+        """
+        Exclusive cross-process lock held by writers.
+        Re-entrant within a thread (flock itself is not); the depth counter
+        is only touched by the thread holding `self._file_mutex`.
+        """
+        with self._file_mutex:
+            if self._file_lock_depth:
+                self._file_lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth -= 1
+                return
+
+            with open(self._lock_path, "a+") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self._file_lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._file_lock_depth = 0
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_current(self) -> Optional[int]:
+        try:
+            return int((self.cache_dir / "CURRENT").read_text().strip())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _publish_generation(self, generation: int, tmp_index: Path, tmp_segment: Path) -> None:
+        """
+        Move fully written files into place as `generation` and point CURRENT at it.
+        Must be called with the file lock held.
+        """
+        os.replace(tmp_segment, self._segment_path(generation))
+        os.replace(tmp_index, self._index_path(generation))
+
+        tmp_current = self.cache_dir / ".CURRENT.tmp"
+        tmp_current.write_text(f"{generation}\n")
+        os.replace(tmp_current, self.cache_dir / "CURRENT")
+
+        logger.info(f"Embedding cache switched to generation {generation}")
+
+    def _new_generation(self) -> int:
+        """
+        Create an empty generation and point CURRENT at it.
+        Must be called with the file lock held.
+        """
+        generation = (self._read_current() or 0) + 1
+
+        tmp_index = self.cache_dir / f".index.{generation}.tmp"
+        tmp_segment = self.cache_dir / f".vectors.{generation}.tmp"
+        with open(tmp_index, "wb") as f:
+            f.write(self._header)
+        open(tmp_segment, "wb").close()
+
+        self._publish_generation(generation, tmp_index, tmp_segment)
+        return generation
+
+    def _remove_generation(self, generation: int) -> None:
+        """Unlink a retired generation. Open mmaps in other workers stay valid."""
+        for path in (self._index_path(generation), self._segment_path(generation)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _open_generation(self, generation: int) -> bool:
+        """
+        Switch this process to `generation`.
+
+        Returns:
+            False if the generation vanished or has an unknown format
+        """
+        try:
+            with open(self._index_path(generation), "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+        except FileNotFoundError:
+            return False
+
+        if header not in self._readable_headers:
+            logger.warning(
+                f"Embedding cache generation {generation} has an unknown format, "
+                f"another codec or was built for another model, discarding"
+            )
+            return False
+
+        self._generation = generation
+        self._index = {}
+        self._index_pos = INDEX_HEADER.size
+        self._vector_bytes = 0
+        self._index_map = None
+        self._segment = None
+        self._segment_size = 0
+        return True
+
+    def _refresh(self) -> None:
+        """
+        Pick up the live generation and any index records appended by other workers.
+        Called on misses only; hits never touch the filesystem.
+        """
+        for _ in range(3):
+            generation = self._read_current()
+            if generation is not None and generation == self._generation:
+                break
+            if generation is not None and self._open_generation(generation):
+                break
+            # Missing, retired or unreadable generation: start a fresh one
+            with self._file_lock():
+                if self._read_current() == generation:
+                    stale = generation
+                    generation = self._new_generation()
+                    if stale is not None:
+                        self._remove_generation(stale)
+            if self._open_generation(self._read_current()):
+                break
+
+        self._tail_index()
+
+    def _tail_index(self) -> None:
+        """Load index records written since the last refresh."""
+        try:
+            with open(self._index_path(self._generation), "rb") as f:
+                f.seek(self._index_pos)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        count = len(data) // INDEX_DTYPE.itemsize
+        if count == 0:
+            return
+
+        records = np.frombuffer(data, dtype=INDEX_DTYPE, count=count)
+        first_row = (self._index_pos - INDEX_HEADER.size) // INDEX_DTYPE.itemsize
+        for row, (key, offset, dim, created) in enumerate(zip(
+            records["key"].tolist(),
+            records["offset"].tolist(),
+            records["dim"].tolist(),
+            records["created"].tolist()
+        ), start=first_row):
+            self._index[key] = (offset, dim, row, created)
+        self._index_pos += count * INDEX_DTYPE.itemsize
+        self._vector_bytes += int(self._codec.nbytes(records["dim"].astype(np.int64)).sum())
+
+    def _view(self, offset: int, dim: int) -> Optional[np.ndarray]:
+        """
+        Read-only float32 vector from the segment (a zero-copy view for the float32 codec).
+
+        Returns:
+            None if the segment is gone (another worker compacted or cleared
+            the cache and retired this generation)
+        """
+        end = offset + self._codec.nbytes(dim)
+        if end > self._segment_size:
+            # Segment grew since we mapped it; remap. Views into the old map keep it alive.
+            try:
+                with open(self._segment_path(self._generation), "rb") as f:
+                    segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+            self._segment = segment
+            self._segment_size = len(segment)
+            if end > self._segment_size:
+                return None
+        return self._codec.decode(self._segment, offset, dim)
+
+    def _read_entry(self, key: int) -> Optional[np.ndarray]:
+        """
+        Vector of a key in the disk tier, or None on a miss.
+        Must be called with `self._lock` held.
+
+        If the live generation was retired under us, switch to the current
+        one and look the key up there once.
+        """
+        for attempt in range(2):
+            entry = self._index.get(key)
+            if entry is None or self._is_expired(entry[3]):
+                return None
+            offset, dim, row, _ = entry
+            vector = self._view(offset, dim)
+            if vector is not None:
+                self._touch(row)
+                return vector
+            if attempt == 0:
+                logger.info(f"Embedding cache generation {self._generation} was retired, refreshing")
+                self._refresh()
+        return None
+
+    def _touch(self, row: int) -> None:
+        """Record an access time in the shared index so compaction can evict by LRU (best effort)."""
+        position = INDEX_HEADER.size + row * INDEX_DTYPE.itemsize + ATIME_OFFSET
+        if self._index_map is None or position + ATIME_FIELD.size > len(self._index_map):
+            try:
+                with open(self._index_path(self._generation), "r+b") as f:
+                    self._index_map = mmap.mmap(f.fileno(), 0)
+            except (OSError, ValueError):
+                # Index retired by another worker; the next refresh maps the live one
+                self._index_map = None
+                return
+            if position + ATIME_FIELD.size > len(self._index_map):
+                return
+        ATIME_FIELD.pack_into(self._index_map, position, time.time())
+
+    def _is_expired(self, created: float) -> bool:
+        return bool(self.ttl_seconds) and created < time.time() - self.ttl_seconds
+
+    def _append(self, entries: Sequence[Tuple[int, np.ndarray]]) -> int:
+        """
+        Append vectors to the live generation.
+        Must be called with both locks held and after `_refresh()`.
+
+        Returns:
+            Number of entries actually written (live keys already present are skipped)
+        """
+        entries = [
+            (key, vec) for key, vec in entries
+            if key not in self._index or self._is_expired(self._index[key][3])
+        ]
+        if not entries:
+            return 0
+
+        self._write_entries(self._generation, entries)
+        self._tail_index()
+        return len(entries)
+
+    def _write_entries(self, generation: int, entries: Sequence[Tuple[int, np.ndarray]]) -> None:
+        """
+        Append vectors and their index records to `generation`'s files.
+        Must be called with the file lock held; touches no in-process state.
+        """
+        segment_path = self._segment_path(generation)
+        index_path = self._index_path(generation)
+
+        seg_fd = os.open(segment_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            end = os.fstat(seg_fd).st_size
+            # Keep every vector 4-byte aligned even after a torn write
+            padding = (-end) % VECTOR_DTYPE.itemsize
+            offset = end + padding
+
+            records = np.zeros(len(entries), dtype=INDEX_DTYPE)
+            payload = [b"\0" * padding]
+            now = time.time()
+            for i, (key, vec) in enumerate(entries):
+                records[i] = (key, offset, vec.shape[0], now, now)
+                payload.append(self._codec.encode(vec))
+                offset += self._codec.nbytes(vec.shape[0])
+            _write_all(seg_fd, b"".join(payload))
+        finally:
+            os.close(seg_fd)
+
+        idx_fd = os.open(index_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            # Drop a torn trailing record left by a crashed writer
+            size = os.fstat(idx_fd).st_size
+            torn = (size - INDEX_HEADER.size) % INDEX_DTYPE.itemsize
+            if torn:
+                os.ftruncate(idx_fd, size - torn)
+            _write_all(idx_fd, records.tobytes())
+        finally:
+            os.close(idx_fd)
+
+    def _writable_generation(self) -> int:
+        """
+        Live generation to append to, replacing a missing or unreadable one.
+        Must be called with the file lock held; touches no in-process state.
+        """
+        generation = self._read_current()
+        if generation is not None:
+            try:
+                with open(self._index_path(generation), "rb") as f:
+                    if f.read(INDEX_HEADER.size) in self._readable_headers:
+                        return generation
+            except FileNotFoundError:
+                pass
+
+        stale = generation
+        generation = self._new_generation()
+        if stale is not None:
+            self._remove_generation(stale)
+        return generation
+
+    def _unwritten(
+        self,
+        entries: Sequence[Tuple[int, np.ndarray]],
+        generation: int,
+        known_generation: Optional[int],
+        known_position: int
+    ) -> List[Tuple[int, np.ndarray]]:
+        """
+        Drop entries that other workers wrote to `generation` after this
+        process last read its index (at `known_position` of `known_generation`).
+        Must be called with the file lock held; touches no in-process state.
+        """
+        start = known_position if generation == known_generation else INDEX_HEADER.size
+        try:
+            with open(self._index_path(generation), "rb") as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return list(entries)
+
+        count = len(data) // INDEX_DTYPE.itemsize
+        records = np.frombuffer(data, dtype=INDEX_DTYPE, count=count)
+        if self.ttl_seconds:
+            records = records[records["created"] >= time.time() - self.ttl_seconds]
+        present = set(records["key"].tolist())
+        return [(key, vec) for key, vec in entries if key not in present]
+
+    def _migrate_legacy_json(self) -> None:
+        """One-time import of the old one-JSON-file-per-embedding layout."""
+        legacy_files = list(self.cache_dir.glob("*.json"))
+        if not legacy_files:
+            return
+
+        with self._file_lock():
+            self._refresh()
+            entries = []
+            for cache_file in legacy_files:
+                try:
+                    with open(cache_file, 'r') as f:
+                        data = json.load(f)
+                    entries.append((int(data['hash'], 16), np.asarray(data['embedding'], dtype=VECTOR_DTYPE)))
+                except FileNotFoundError:
+                    continue  # Another worker migrated it first
+                except (json.JSONDecodeError, KeyError, ValueError) as e:
+                    logger.warning(f"Skipping corrupted legacy cache file: {cache_file}, error: {e}")
+                cache_file.unlink(missing_ok=True)
+
+            migrated = self._append(entries)
+
+        logger.info(f"Migrated {migrated} legacy JSON embeddings into the binary cache")
+
+    # ------------------------------------------------------------------
+    # Write-behind persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(
+                target=self._writer_loop,
+                name="embedding-cache-writer",
+                daemon=True
+            )
+            self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while not self._closing.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _enqueue(self, entries: Sequence[Tuple[int, np.ndarray]]) -> None:
+        """Make entries visible immediately and queue them for the disk tier."""
+        with self._lock:
+            for key, vector in entries:
+                self._memory.put(key, vector)
+                if key not in self._index:
+                    self._pending[key] = vector
+            pending = len(self._pending)
+
+        if not self.write_behind or self._closing.is_set():
+            self.flush()
+            return
+
+        self._ensure_writer()
+        if pending >= self.WRITE_BATCH_SIZE:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Persist all queued entries in a single locked append.
+
+        The disk write holds only the cross-process file lock, so lookups in
+        this process carry on meanwhile; `self._lock` is taken just to pick
+        up the queue and to publish the new index entries afterwards.
+
+        Returns:
+            Number of entries written to disk
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                queued = list(self._pending.items())
+                batch = [
+                    (key, vec) for key, vec in queued
+                    if key not in self._index or self._is_expired(self._index[key][3])
+                ]
+                known_generation, known_position = self._generation, self._index_pos
+                epoch = self._clear_epoch
+
+            written = 0
+            try:
+                with self._file_lock():
+                    # Entries queued before a clear() are dropped, not resurrected
+                    if batch and self._clear_epoch == epoch:
+                        generation = self._writable_generation()
+                        batch = self._unwritten(batch, generation, known_generation, known_position)
+                        if batch:
+                            self._write_entries(generation, batch)
+                        written = len(batch)
+            except OSError as e:
+                logger.error(f"Failed to cache embeddings: {e}")
+                return 0
+
+            with self._lock:
+                # Index entries become visible before the queued copies are dropped,
+                # so a concurrent lookup never misses them
+                self._refresh()
+                for key, vector in queued:
+                    if self._pending.get(key) is vector:
+                        del self._pending[key]
+
+        logger.debug(f"Flushed {written} embeddings to disk ({len(queued) - written} already present)")
+        return written
+
+    def close(self) -> None:
+        """Stop the background threads and flush whatever is still queued."""
+        self._closing.set()
+        self._wake.set()
+        for thread in (self._writer, self._compactor):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=10)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Eviction and compaction
+    # ------------------------------------------------------------------
+
+    def _compactor_loop(self) -> None:
+        while not self._closing.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Embedding cache compaction failed: {e}")
+
+    def _plan_compaction(self, records: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Pick the records that survive compaction.
+
+        Returns:
+            (surviving records, number of evicted entries)
+        """
+        # Later records supersede earlier ones for the same key (TTL re-inserts)
+        keys = records["key"][::-1]
+        _, last = np.unique(keys, return_index=True)
+        live = records[np.sort(len(records) - 1 - last)]
+        unique_count = len(live)
+
+        if self.ttl_seconds:
+            live = live[live["created"] >= time.time() - self.ttl_seconds]
+
+        entry_bytes = self._codec.nbytes(live["dim"].astype(np.int64)) + INDEX_DTYPE.itemsize
+        if self.max_bytes and int(entry_bytes.sum()) + INDEX_HEADER.size > self.max_bytes:
+            # Keep the most recently accessed entries that fit under the low-water mark
+            order = np.argsort(-live["atime"], kind="stable")
+            fits = np.cumsum(entry_bytes[order]) <= self.max_bytes * self.COMPACT_LOW_WATER
+            live = live[np.sort(order[fits])]
+
+        return live, unique_count - len(live)
+
+    def compact(self, force: bool = False) -> dict:
+        """
+        Evict expired and least-recently-used entries and reclaim dead segment space.
+
+        Survivors are copied into a new generation without holding any lock,
+        so lookups here and in other workers carry on. Only the final switch
+        (plus copying entries appended meanwhile) takes the writer lock.
+        Only one compaction runs at a time across all workers.
+
+        Args:
+            force: Rewrite even if nothing would be evicted
+
+        Returns:
+            Report dict, empty if compaction was skipped
+        """
+        if not self._compact_lock.acquire(blocking=False):
+            return {}
+        try:
+            with open(self.cache_dir / ".compact.lock", "a+") as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return {}
+                return self._compact(force)
+        finally:
+            self._compact_lock.release()
+
+    def _compact(self, force: bool) -> dict:
+        started = time.perf_counter()
+        generation = self._read_current()
+        if generation is None:
+            return {}
+
+        index_path = self._index_path(generation)
+        segment_path = self._segment_path(generation)
+        try:
+            with open(index_path, "rb") as f:
+                data = f.read()
+            old_bytes = len(data) + segment_path.stat().st_size
+        except FileNotFoundError:
+            return {}
+        if data[:INDEX_HEADER.size] not in self._readable_headers:
+            return {}
+
+        count = (len(data) - INDEX_HEADER.size) // INDEX_DTYPE.itemsize
+        snapshot_end = INDEX_HEADER.size + count * INDEX_DTYPE.itemsize
+        records = np.frombuffer(data, dtype=INDEX_DTYPE, count=count, offset=INDEX_HEADER.size)
+
+        live, evicted = self._plan_compaction(records)
+        live_bytes = INDEX_HEADER.size + int(self._codec.nbytes(live["dim"].astype(np.int64)).sum()) \
+            + len(live) * INDEX_DTYPE.itemsize
+        dead_ratio = 1 - live_bytes / old_bytes if old_bytes else 0.0
+        if not force and evicted == 0 and dead_ratio < self.COMPACT_DEAD_RATIO:
+            return {}
+
+        tmp_index = self.cache_dir / f".compact-index.{os.getpid()}.tmp"
+        tmp_segment = self.cache_dir / f".compact-vectors.{os.getpid()}.tmp"
+        try:
+            with open(segment_path, "rb") as src, open(tmp_segment, "wb") as dst, open(tmp_index, "wb") as idx:
+                idx.write(self._header)
+                self._copy_records(live, src, dst, idx)
+
+                # Switch over, picking up entries other writers appended meanwhile
+                with self._lock:
+                    with self._file_lock():
+                        if self._read_current() != generation:
+                            logger.info("Embedding cache changed generation during compaction, aborting")
+                            return {}
+                        with open(index_path, "rb") as f:
+                            f.seek(snapshot_end)
+                            delta = f.read()
+                        delta_count = len(delta) // INDEX_DTYPE.itemsize
+                        if delta_count:
+                            self._copy_records(
+                                np.frombuffer(delta, dtype=INDEX_DTYPE, count=delta_count), src, dst, idx
+                            )
+                        dst.flush()
+                        idx.flush()
+                        self._publish_generation(generation + 1, tmp_index, tmp_segment)
+                        self._remove_generation(generation)
+                    self._disk_evictions += evicted
+                    self._refresh()
+                    report = {
+                        "generation": self._generation,
+                        "evicted": evicted,
+                        "entries": len(self._index),
+                        "reclaimed_mb": round(
+                            (old_bytes - self._index_pos - self._vector_bytes) / (1024 * 1024), 2
+                        ),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 1)
+                    }
+        except FileNotFoundError:
+            return {}
+        finally:
+            tmp_index.unlink(missing_ok=True)
+            tmp_segment.unlink(missing_ok=True)
+
+        logger.info(f"Embedding cache compacted: {report}")
+        return report
+
+    def _copy_records(self, records: np.ndarray, src, dst, idx) -> None:
+        """Copy the encoded vectors of `records` from `src` to `dst` and append rewritten records to `idx`."""
+        out = records.copy()
+        offset = dst.tell()
+        for i, (old_offset, dim) in enumerate(zip(records["offset"].tolist(), records["dim"].tolist())):
+            length = self._codec.nbytes(dim)
+            src.seek(old_offset)
+            dst.write(src.read(length))
+            out["offset"][i] = offset
+            offset += length
+        idx.write(out.tobytes())
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def export_snapshot(self, path: Optional[str] = None) -> dict:
+        """
+        Write every live entry to a single compressed snapshot file.
+
+        The file records the model identity; `import_snapshot` refuses
+        snapshots taken with a different model.
+
+        Args:
+            path: Target file (default: `default_snapshot_path()` for this model)
+
+        Returns:
+            Dict describing the snapshot
+        """
+        target = Path(path) if path else default_snapshot_path(self.model_identity)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        self.flush()
+        with self._lock:
+            # A second pass if another worker retires the generation in between
+            for _ in range(2):
+                self._refresh()
+                entries = [
+                    (key, offset, dim, created)
+                    for key, (offset, dim, _, created) in self._index.items()
+                    if not self._is_expired(created)
+                ]
+                if not entries:
+                    break
+                # Map the whole segment once; the view keeps it alive outside the lock
+                last = max(entries, key=lambda entry: entry[1])
+                if self._view(last[1], last[2]) is not None:
+                    break
+            else:
+                raise FileNotFoundError(f"Embedding cache generation {self._generation} was retired during export")
+            segment = self._segment
+
+        keys = np.array([entry[0] for entry in entries], dtype="<u8")
+        dims = np.array([entry[2] for entry in entries], dtype="<u4")
+        created = np.array([entry[3] for entry in entries], dtype="<f8")
+        # Snapshots are always float32, so they import into caches with any codec
+        vectors = np.concatenate([
+            self._codec.decode(segment, offset, dim)
+            for _, offset, dim, _ in entries
+        ]) if entries else np.zeros(0, dtype=VECTOR_DTYPE)
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "model_identity": self.model_identity,
+            "entries": len(entries),
+            "created_at": time.time()
+        }
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                keys=keys,
+                dims=dims,
+                created=created,
+                vectors=vectors
+            )
+        os.replace(tmp, target)
+
+        meta["path"] = str(target)
+        meta["size_mb"] = round(target.stat().st_size / (1024 * 1024), 2)
+        logger.info(f"Exported embedding cache snapshot: {meta}")
+        return meta
+
+    def import_snapshot(self, path: Optional[str] = None) -> dict:
+        """
+        Load a snapshot into the disk tier. Keys already cached are kept.
+
+        Args:
+            path: Snapshot file (default: `default_snapshot_path()` for this model)
+
+        Returns:
+            Dict with `imported` count, or `skipped` reason
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist
+        """
+        source = Path(path) if path else default_snapshot_path(self.model_identity)
+
+        with np.load(source, allow_pickle=False) as snapshot:
+            meta = json.loads(snapshot["meta"].tobytes().decode('utf-8'))
+            if meta.get("format") != SNAPSHOT_FORMAT:
+                return {"imported": 0, "skipped": f"unsupported snapshot format {meta.get('format')}"}
+            if meta.get("model_identity") != self.model_identity:
+                logger.warning(
+                    f"Ignoring snapshot {source}: built for '{meta.get('model_identity')}', "
+                    f"cache is '{self.model_identity}'"
+                )
+                return {"imported": 0, "skipped": "model identity mismatch"}
+
+            keys = snapshot["keys"].tolist()
+            dims = snapshot["dims"].astype(np.int64)
+            vectors = snapshot["vectors"]
+
+        bounds = np.concatenate([[0], np.cumsum(dims)])
+        entries = [
+            (key, vectors[bounds[i]:bounds[i + 1]])
+            for i, key in enumerate(keys)
+        ]
+
+        with self._lock:
+            with self._file_lock():
+                self._refresh()
+                imported = self._append(entries)
+
+        logger.info(f"Imported {imported}/{len(entries)} embeddings from snapshot {source}")
+        return {"imported": imported, "entries": len(entries), "path": str(source)}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def _lookup(self, keys: Sequence[int]) -> List[Optional[np.ndarray]]:
+        """
+        Resolve keys through memory -> pending writes -> disk in one pass.
+
+        Must be called with `self._lock` held. The disk index is refreshed
+        at most once per call, and only if some key is not known yet.
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        disk_positions = []
+
+        for i, key in enumerate(keys):
+            vector = self._memory.get(key)
+            if vector is None:
+                vector = self._pending.get(key)
+            if vector is not None:
+                self._stats["memory_hits"] += 1
+                results[i] = vector
+                if key in self._index:
+                    self._touch(self._index[key][2])
+            else:
+                self._stats["memory_misses"] += 1
+                disk_positions.append(i)
+
+        if not disk_positions:
+            return results
+
+        if any(keys[i] not in self._index for i in disk_positions):
+            self._refresh()
+
+        for i in disk_positions:
+            vector = self._read_entry(keys[i])
+            if vector is None:
+                self._stats["disk_misses"] += 1
+                continue
+            self._stats["disk_hits"] += 1
+            self._memory.put(keys[i], vector)
+            results[i] = vector
+
+        return results
+
+    def _timed_lookup(self, keys: Sequence[int]) -> List[Optional[np.ndarray]]:
+        """`_lookup` plus latency accounting."""
+        started = time.perf_counter()
+        results = self._lookup(keys)
+        self._stats["lookups"] += len(keys)
+        self._stats["lookup_seconds"] += time.perf_counter() - started
+        return results
+
+    def get_array(self, text: str) -> Optional[np.ndarray]:
+        """
+        Retrieve cached embedding as a read-only float32 array.
+
+        Memory-tier hits return the in-process copy; disk-tier hits return a
+        zero-copy view into the segment and promote the vector to memory.
+
+        Args:
+            text: Text to lookup
+
+        Returns:
+            Cached embedding vector or None if not found
+        """
+        key = self._get_key(text)
+
+        with self._lock:
+            vector = self._timed_lookup([key])[0]
+
+        logger.debug(f"Cache {'MISS' if vector is None else 'HIT'} for hash: {key:016x}")
+        return vector
+
     def get(self, text: str) -> Optional[List[float]]:
         """
         Retrieve cached embedding for text.
-        
+
         Args:
             text: Text to lookup
-            
+
         Returns:
             Cached embedding vector or None if not found
         """
-        hash_key = self._get_hash(text)
-        cache_file = self.cache_dir / f"{hash_key}.json"
-        
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    logger.debug(f"Cache HIT for hash: {hash_key}")
-                    return data['embedding']
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.warning(f"Cache file corrupted: {cache_file}, error: {e}")
-                return None
-        
-        logger.debug(f"Cache MISS for hash: {hash_key}")
-        return None
-    
-    def set(self, text: str, embedding: List[float]) -> None:
+        embedding = self.get_array(text)
+        return None if embedding is None else embedding.tolist()
+
+    def get_many_arrays(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Retrieve cached embeddings for a batch of texts in one index pass.
+
+        Args:
+            texts: Texts to lookup
+
+        Returns:
+            One read-only float32 array (or None on miss) per input text
+        """
+        keys = [self._get_key(text) for text in texts]
+
+        with self._lock:
+            return self._timed_lookup(keys)
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Retrieve cached embeddings for a batch of texts in one index pass.
+
+        Args:
+            texts: Texts to lookup
+
+        Returns:
+            One embedding (or None on miss) per input text
+        """
+        return [
+            None if embedding is None else embedding.tolist()
+            for embedding in self.get_many_arrays(texts)
+        ]
+
+    def set(self, text: str, embedding: Union[List[float], np.ndarray]) -> None:
         """
         Store embedding in cache.
-        
+
+        The vector is served from memory right away; the disk write happens
+        on the write-behind thread.
+
         Args:
             text: Original text
             embedding: Embedding vector to cache
         """
-        hash_key = self._get_hash(text)
-        cache_file = self.cache_dir / f"{hash_key}.json"
-        
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump({
-                    'hash': hash_key,
-                    'text_length': len(text),
-                    'embedding_dim': len(embedding),
-                    'embedding': embedding
-                }, f)
-            logger.debug(f"Cached embedding for hash: {hash_key}")
-        except Exception as e:
-            logger.error(f"Failed to cache embedding: {e}")
-    
+        self.set_many([text], [embedding])
+
+    def set_many(
+        self,
+        texts: Sequence[str],
+        embeddings: Union[Sequence[List[float]], np.ndarray]
+    ) -> None:
+        """
+        Store a batch of embeddings in cache.
+
+        Args:
+            texts: Original texts
+            embeddings: Embedding vectors to cache (one per text), or a
+                (len(texts), dim) float32 array
+        """
+        entries = [
+            (self._get_key(text), np.array(embedding, dtype=VECTOR_DTYPE).ravel())
+            for text, embedding in zip(texts, embeddings)
+        ]
+        self._enqueue(entries)
+        logger.debug(f"Queued {len(entries)} embeddings for caching")
+
     def clear(self) -> int:
         """
         Clear all cached embeddings.
-        
+
         Returns:
-            Number of files deleted
+            Number of entries deleted
         """
-        count = 0
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
-            count += 1
-        
+        with self._lock:
+            self._pending.clear()
+            self._clear_epoch += 1
+            with self._file_lock():
+                self._refresh()
+                count = len(self._index)
+                stale = self._generation
+                self._new_generation()
+                self._remove_generation(stale)
+            self._refresh()
+            self._memory.clear()
+
         logger.info(f"Cleared {count} cached embeddings")
         return count
-    
+
     def get_stats(self) -> dict:
         """
         Get cache statistics.
-        
+
+        Constant time: reads running counters only. Entry and byte counts
+        reflect this worker's view of the disk tier, which is refreshed on
+        every miss and every flush.
+
         Returns:
             Dict with cache stats
         """
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_size = sum(f.stat().st_size for f in cache_files)
-        
-        return {
-            "total_entries": len(cache_files),
-            "total_size_mb": round(total_size / (1024 * 1024), 2),
-            "cache_dir": str(self.cache_dir)
-        }
+        with self._lock:
+            stats = self._stats
+            hits = stats["memory_hits"] + stats["disk_hits"]
+            misses = stats["disk_misses"]
+            lookups = stats["lookups"]
+
+            return {
+                "total_entries": len(self._index),
+                "total_size_mb": round((self._index_pos + self._vector_bytes) / (1024 * 1024), 2),
+                "cache_dir": str(self.cache_dir),
+                "codec": self._codec.name,
+                "generation": self._generation,
+                "pending_writes": len(self._pending),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "evictions": self._memory.evictions + self._disk_evictions,
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2) if self.max_bytes else None,
+                "ttl_seconds": self.ttl_seconds or None,
+                "avg_lookup_us": round(stats["lookup_seconds"] / lookups * 1e6, 2) if lookups else 0.0,
+                "tiers": {
+                    "memory": {
+                        "entries": len(self._memory),
+                        "size_mb": round(self._memory.size_bytes / (1024 * 1024), 2),
+                        "budget_mb": round(self._memory.max_bytes / (1024 * 1024), 2),
+                        "hits": stats["memory_hits"],
+                        "misses": stats["memory_misses"],
+                        "evictions": self._memory.evictions
+                    },
+                    "disk": {
+                        "hits": stats["disk_hits"],
+                        "misses": stats["disk_misses"],
+                        "evictions": self._disk_evictions
+                    }
+                }
+            }
 
 
 # Global cache instance (singleton)
@@ -133,13 +1230,46 @@ _embedding_cache = None
 def get_embedding_cache() -> EmbeddingCache:
     """
     Get global embedding cache instance (singleton).
-    
+
     Returns:
         EmbeddingCache instance
     """
     global _embedding_cache
-    
+
     if _embedding_cache is None:
-        _embedding_cache = EmbeddingCache()
-    
+        _embedding_cache = EmbeddingCache(
+            memory_budget_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+            write_behind=settings.EMBEDDING_CACHE_WRITE_BEHIND,
+            flush_interval=settings.EMBEDDING_CACHE_FLUSH_INTERVAL_S,
+            max_bytes=settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_DAYS * 86400,
+            compact_interval=settings.EMBEDDING_CACHE_COMPACT_INTERVAL_S,
+            model_identity=embedding_model_identity(),
+            codec=settings.EMBEDDING_CACHE_CODEC
+        )
+
     return _embedding_cache
+
+def prewarm_embedding_cache() -> None:
+    """
+    Import this model's snapshot, if one exists. Called from the app startup hook.
+    """
+    if not settings.EMBEDDING_CACHE_SNAPSHOT_ON_BOOT:
+        return
+
+    path = default_snapshot_path()
+    if not path.exists():
+        logger.info(f"No embedding cache snapshot at {path}, starting cold")
+        return
+
+    try:
+        get_embedding_cache().import_snapshot(str(path))
+    except Exception as e:
+        logger.warning(f"Failed to import embedding cache snapshot {path}: {e}")
+
+def shutdown_embedding_cache() -> None:
+    """
+    Flush queued cache writes. Called from the app shutdown hook.
+    """
+    if _embedding_cache is not None:
+        _embedding_cache.close()
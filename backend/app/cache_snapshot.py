@@ -0,0 +1,64 @@
+"""
+Command-line tool for embedding cache snapshots.
+
+Usage (from the backend directory):
+    python -m app.cache_snapshot export [--output PATH]
+    python -m app.cache_snapshot import [--input PATH]
+    python -m app.cache_snapshot info [--input PATH]
+
+Snapshots are keyed by embedding model name and version
+(EMBEDDING_MODEL / EMBEDDING_MODEL_VERSION); importing a snapshot taken
+with a different model is a no-op.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+import numpy as np
+
+from .cache import get_embedding_cache, default_snapshot_path, embedding_model_identity
+
+
+def _info(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as snapshot:
+        meta = json.loads(snapshot["meta"].tobytes().decode('utf-8'))
+    meta["matches_current_model"] = meta.get("model_identity") == embedding_model_identity()
+    return meta
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export or import embedding cache snapshots.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Write the cache to a snapshot file")
+    export_parser.add_argument("--output", help="Snapshot path (default: per-model file in EMBEDDING_CACHE_SNAPSHOT_DIR)")
+
+    import_parser = subparsers.add_parser("import", help="Load a snapshot into the cache")
+    import_parser.add_argument("--input", help="Snapshot path (default: per-model file in EMBEDDING_CACHE_SNAPSHOT_DIR)")
+
+    info_parser = subparsers.add_parser("info", help="Show snapshot metadata")
+    info_parser.add_argument("--input", help="Snapshot path (default: per-model file in EMBEDDING_CACHE_SNAPSHOT_DIR)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "info":
+        result = _info(args.input or str(default_snapshot_path()))
+    else:
+        cache = get_embedding_cache()
+        try:
+            if args.command == "export":
+                result = cache.export_snapshot(args.output)
+            else:
+                result = cache.import_snapshot(args.input)
+        finally:
+            cache.close()
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,20 +3,66 @@ Semantic text chunking for manifestation passages.
 Splits text into meaningful chunks while preserving narrative flow.
 """
 
-import nltk
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Optional
 import logging
+import math
+import re
+
+from .segmentation import split_sentences
+from .tokenization import get_token_counter
 
 logger = logging.getLogger(__name__)
 
-# Download required NLTK data on first import
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    logger.info("Downloading NLTK punkt tokenizer...")
-    nltk.download('punkt', quiet=True)
+# Sentence-final punctuation (incl. the Devanagari danda and double danda)
+_SENTENCE_END = re.compile(r"[.!?\u0964\u0965]")
+
+def _close_chunks(
+    sentences: Iterable[str],
+    target_token_limit: int,
+    count_tokens: Callable[[str], int]
+) -> Iterator[str]:
+    """Group sentences into chunks by the chunk_text rules, yielding each as it closes."""
+    current_chunk = []
+    current_tokens = 0
+    
+    for sentence in sentences:
+        sent_tokens = count_tokens(sentence)
+        
+        # Add to current
+        current_chunk.append(sentence)
+        current_tokens += sent_tokens
+        
+        num_sentences = len(current_chunk)
+        
+        # DECISION: Should we close this chunk?
+        
+        # Rule 1: Hard Max Sentences (4)
+        if num_sentences >= 4:
+            yield ' '.join(current_chunk)
+            current_chunk = []
+            current_tokens = 0
+            continue
+            
+        # Rule 2: Token Limit Reached (Soft)
+        # But ensure at least 2 sentences if possible (unless this one sentence is huge)
+        if current_tokens >= target_token_limit:
+            if num_sentences >= 2 or sent_tokens > target_token_limit:
+                 yield ' '.join(current_chunk)
+                 current_chunk = []
+                 current_tokens = 0
+            # Else: keep adding 1 more to reach min 2 (unless next one makes it massive? 
+            # for now, keep logic simple: try to reach 2)
+            
+    # Add any remaining
+    if current_chunk:
+        yield ' '.join(current_chunk)
 
-def chunk_text(text: str, sentences_per_chunk: int = 3, target_token_limit: int = 140) -> List[str]:
+def chunk_text(
+    text: str,
+    sentences_per_chunk: int = 3,
+    target_token_limit: int = 140,
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> List[str]:
     """
     Split text into adaptive semantic chunks.
     
@@ -30,56 +76,135 @@ def chunk_text(text: str, sentences_per_chunk: int = 3, target_token_limit: int
         text: Full text
         sentences_per_chunk: Deprecated/Soft reference (max sentences)
         target_token_limit: Soft max tokens per chunk
+        count_tokens: Token counter (default: the translation model's tokenizer)
         
     Returns:
         List of chunks
     """
-    sentences = nltk.sent_tokenize(text)
+    sentences = split_sentences(text)
     
     if not sentences:
         return []
         
-    chunks = []
-    current_chunk = []
-    current_tokens = 0
+    chunks = list(_close_chunks(sentences, target_token_limit, count_tokens or get_token_counter()))
+        
+    logger.info(f"Adaptive Chunking: {len(chunks)} chunks from {len(sentences)} sentences")
+    return chunks
+
+def stream_sentences(pieces: Iterable[str]) -> Iterator[str]:
+    """
+    Split a stream of text pieces (LLM tokens, lines, ...) into sentences.
     
-    # Heuristic: 1 word approx 1.3 tokens. 
-    # Or simplified: split by spaces count.
+    A sentence is yielded once the text after it shows that it is complete,
+    i.e. the segmenter has started the next sentence; the last one is
+    yielded when the stream ends. Only the unfinished tail is re-segmented
+    as pieces arrive.
     
-    for i, sentence in enumerate(sentences):
-        # Calculate approx tokens for this sentence
-        sent_tokens = len(sentence.split()) * 1.3
+    Args:
+        pieces: Text pieces in order; concatenated they form the full text
         
-        # Add to current
-        current_chunk.append(sentence)
-        current_tokens += sent_tokens
+    Returns:
+        Iterator of sentences, as split_sentences would split the full text
+    """
+    buffer = ""
+    
+    for piece in pieces:
+        buffer += piece
+        # No sentence can have closed without sentence-final punctuation
+        if not _SENTENCE_END.search(buffer):
+            continue
         
-        num_sentences = len(current_chunk)
+        sentences = split_sentences(buffer)
+        if len(sentences) < 2:
+            continue
         
-        # DECISION: Should we close this chunk?
+        yield from sentences[:-1]
+        # Keep the (possibly unfinished) last sentence; segmenters return slices of the input
+        buffer = buffer[buffer.rfind(sentences[-1]):]
         
-        # Rule 1: Hard Max Sentences (4)
-        if num_sentences >= 4:
+    yield from split_sentences(buffer)
+
+def stream_chunks(
+    pieces: Iterable[str],
+    target_token_limit: int = 140,
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> Iterator[str]:
+    """
+    Incremental chunk_text: chunk text while it is still being generated.
+    
+    Each chunk is yielded as soon as its last sentence is complete, so
+    translation of the first chunks can start while the LLM is still
+    writing the rest. Over a whole stream the chunks are the same as
+    chunk_text's for the concatenated text.
+    
+    Args:
+        pieces: Text pieces in order (e.g. streamed LLM tokens)
+        target_token_limit: Soft max tokens per chunk
+        count_tokens: Token counter (default: the translation model's tokenizer)
+        
+    Returns:
+        Iterator of chunks
+    """
+    return _close_chunks(stream_sentences(pieces), target_token_limit, count_tokens or get_token_counter())
+
+def chunk_to_token_budget(
+    text: str,
+    max_tokens: int,
+    count_tokens: Optional[Callable[[str], int]] = None
+) -> List[str]:
+    """
+    Split text into as few evenly sized chunks as fit a token budget.
+    
+    Sentences are never split: a single sentence over the budget becomes a
+    chunk of its own.
+    
+    Args:
+        text: Full text
+        max_tokens: Hard max tokens per chunk
+        count_tokens: Token counter (default: the translation model's tokenizer)
+        
+    Returns:
+        List of chunks (the whole text as one chunk if it fits)
+    """
+    sentences = split_sentences(text)
+    
+    if not sentences:
+        return []
+        
+    count_tokens = count_tokens or get_token_counter()
+    sizes = [count_tokens(sentence) for sentence in sentences]
+    total = sum(sizes)
+    
+    if total <= max_tokens:
+        return [text.strip()]
+        
+    # Aim for evenly sized chunks rather than filling each to the brim (which
+    # leaves a small remainder): a sentence starts a new chunk once its
+    # midpoint passes the next even share of the total
+    share = total / math.ceil(total / max_tokens)
+    boundary = share
+    
+    chunks = []
+    current_chunk = []
+    current_tokens = 0
+    seen = 0
+    
+    for sentence, size in zip(sentences, sizes):
+        midpoint = seen + size / 2
+        if current_chunk and (current_tokens + size > max_tokens or midpoint > boundary):
             chunks.append(' '.join(current_chunk))
             current_chunk = []
             current_tokens = 0
-            continue
-            
-        # Rule 2: Token Limit Reached (Soft)
-        # But ensure at least 2 sentences if possible (unless this one sentence is huge)
-        if current_tokens >= target_token_limit:
-            if num_sentences >= 2 or sent_tokens > target_token_limit:
-                 chunks.append(' '.join(current_chunk))
-                 current_chunk = []
-                 current_tokens = 0
-            # Else: keep adding 1 more to reach min 2 (unless next one makes it massive? 
-            # for now, keep logic simple: try to reach 2)
-            
-    # Add any remaining
+            while midpoint > boundary:
+                boundary += share
+        current_chunk.append(sentence)
+        current_tokens += size
+        seen += size
+        
     if current_chunk:
         chunks.append(' '.join(current_chunk))
         
-    logger.info(f"Adaptive Chunking: {len(chunks)} chunks from {len(sentences)} sentences")
+    logger.info(f"Budget Chunking: {len(chunks)} chunks of ~{share:.0f} tokens from {total} tokens")
     return chunks
 
 def chunk_with_overlap(text: str, sentences_per_chunk: int = 3, overlap: int = 1) -> List[dict]:
@@ -94,7 +219,7 @@ def chunk_with_overlap(text: str, sentences_per_chunk: int = 3, overlap: int = 1
     Returns:
         List of dicts with 'text' and 'position' keys
     """
-    sentences = nltk.sent_tokenize(text)
+    sentences = split_sentences(text)
     
     if len(sentences) == 0:
         return []
@@ -6,7 +6,44 @@ class Settings(BaseSettings):
     HUGGINGFACE_API_KEY: str
     MODEL_ID: str = "HuggingFaceH4/zephyr-7b-beta"
     EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    EMBEDDING_MODEL_VERSION: str = "1"  # Bump when model weights change to invalidate cached vectors
+    EMBEDDING_BACKEND: str = "torch"  # "torch" or "onnx-int8" (needs sentence-transformers[onnx])
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx2"  # arm64 | avx2 | avx512 | avx512_vnni
+    EMBEDDING_ONNX_DIR: str = "./cache/onnx"
+    
+    # Cross-request micro-batching of model.encode calls
+    EMBEDDING_MICROBATCH_ENABLED: bool = True
+    EMBEDDING_MICROBATCH_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_MICROBATCH_MAX_SIZE: int = 64
+    
+    # Shared embedding server (python -m app.embedding_server); empty = encode in every worker
+    EMBEDDING_SERVER_SOCKET: str = ""
+    EMBEDDING_SERVER_TIMEOUT_S: float = 10.0
+    EMBEDDING_SERVER_RETRY_S: float = 30.0  # In-process fallback period after the server fails
     CHROMA_DB_PATH: str = "./chroma_db"
+    VECTOR_STORE_BACKEND: str = "chroma"  # or "memory": per-user in-memory matrices, exact search
+    VECTOR_STORE_MEMORY_PATH: str = "./vector_store"
+    VECTOR_STORE_SHARDS: int = 1  # Tenant shard collections; migrate with python -m app.vector_store_migrate
+    VECTOR_STORE_MAX_CHUNKS_PER_USER: int = 0  # Oldest chunks beyond this are evicted (0 = unbounded)
+    VECTOR_STORE_TTL_DAYS: float = 0  # Evict chunks not stored/re-seen for this long (0 = never)
+    VECTOR_STORE_RETENTION_INTERVAL_S: float = 3600
+    VECTOR_STORE_RETENTION_BATCH: int = 500
+    VECTOR_STORE_READ_WORKERS: int = 4  # Dedicated threads for vector store reads (RAG retrieval, stats)
+    VECTOR_STORE_WRITE_BEHIND: bool = True  # Persist translations off the response path
+    VECTOR_STORE_WRITE_QUEUE_SIZE: int = 1000  # Queued requests before writers block on the insert
+    VECTOR_STORE_FLUSH_INTERVAL_S: float = 0.5
+    
+    # Exact-match translation memory (SQLite), consulted before embedding / LLM calls
+    TRANSLATION_MEMORY_ENABLED: bool = True
+    TRANSLATION_MEMORY_PATH: str = "./cache/translation_memory.sqlite3"
+    TRANSLATION_MEMORY_FLUSH_INTERVAL_S: float = 5.0  # Hit stats are buffered and written back this often
+    TRANSLATION_MEMORY_MAX_ENTRIES: int = 500000  # Least recently used entries beyond this are pruned (0 = unbounded)
+    TRANSLATION_MEMORY_TTL_DAYS: float = 30  # Entries unused for this long are pruned (0 = never)
+    TRANSLATION_MEMORY_PRUNE_INTERVAL_S: float = 3600
+    
+    # Token counting for translation chunk budgets (the primary LLM's tokenizer.json)
+    TRANSLATION_TOKENIZER: str = ""  # Hub repo id or local tokenizer.json path (default: MODEL_ID)
+    TRANSLATION_TOKENIZER_DOWNLOAD: bool = False  # Fetch it from the Hub on first use (else local HF cache only)
     
     # New Provider Settings (Optional)
     GROQ_API_KEY: str = ""  # Optional, but needed for Groq
@@ -17,6 +54,27 @@ class Settings(BaseSettings):
     
     DEEPSEEK_API_KEY: str = "" # Optional
     
+    # LLM calls in flight per provider and worker (excess calls wait for a slot)
+    NOVITA_MAX_CONCURRENCY: int = 4
+    DEEPSEEK_MAX_CONCURRENCY: int = 4
+    GROQ_MAX_CONCURRENCY: int = 2  # Free tier rate limits
+    OLLAMA_MAX_CONCURRENCY: int = 1  # Local model, one generation at a time
+    
+    # Parallel translation of a document's chunks
+    TRANSLATION_CHUNK_WORKERS: int = 8  # Threads shared by all requests of a worker
+    TRANSLATION_CHUNK_RETRIES: int = 2  # Retries of a failed chunk before the request fails
+
+    # Embedding Cache
+    EMBEDDING_CACHE_MEMORY_MB: int = 64  # Per-process LRU tier in front of the disk cache (0 = off)
+    EMBEDDING_CACHE_WRITE_BEHIND: bool = True  # Persist new embeddings off the request path
+    EMBEDDING_CACHE_FLUSH_INTERVAL_S: float = 1.0
+    EMBEDDING_CACHE_MAX_MB: int = 512  # Disk tier limit, LRU-evicted by the compactor (0 = unbounded)
+    EMBEDDING_CACHE_TTL_DAYS: float = 30  # Entries older than this are dropped (0 = never)
+    EMBEDDING_CACHE_COMPACT_INTERVAL_S: float = 300
+    EMBEDDING_CACHE_CODEC: str = "float32"  # float16 (2x smaller) or int8 (~4x smaller), lossy
+    EMBEDDING_CACHE_SNAPSHOT_DIR: str = "./cache/snapshots"
+    EMBEDDING_CACHE_SNAPSHOT_ON_BOOT: bool = True  # Prewarm from this model's snapshot at startup
+    
     class Config:
         env_file = ".env"
         extra = "ignore"
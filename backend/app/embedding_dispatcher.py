@@ -0,0 +1,167 @@
+"""
+Cross-request micro-batching for embedding generation.
+Collects concurrent encode calls for a few milliseconds (or until a batch
+fills up) and runs a single model.encode for all of them.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets ("+Inf" catches the rest)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class EmbeddingDispatcher:
+    """
+    Micro-batching front end for an encode function.
+
+    Callers block on `encode()`; a single background thread drains the
+    queue, waiting at most `max_wait_ms` after the first request for more
+    to arrive, and never packs more than `max_batch_size` texts into one
+    call (a single oversized request is still encoded in one call).
+    Duplicate texts inside a batch are encoded once.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64
+    ):
+        self.encode_fn = encode_fn
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._queue: Deque[Tuple[List[str], Future]] = deque()
+        self._queued_texts = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self._histogram_overflow = 0
+        self._stats = {"batches": 0, "requests": 0, "texts": 0, "unique_texts": 0, "encode_seconds": 0.0}
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, sharing a model call with concurrent callers.
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        if not texts:
+            raise ValueError("encode() needs at least one text")
+
+        future: Future = Future()
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append((list(texts), future))
+            self._queued_texts += len(texts)
+            self._cond.notify()
+        return future.result()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="embedding-dispatcher", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[List[str], Future]]:
+        """Block until a batch is ready and pop it off the queue."""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+
+            deadline = time.monotonic() + self.max_wait
+            while self._queued_texts < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = [self._queue.popleft()]
+            size = len(batch[0][0])
+            while self._queue and size + len(self._queue[0][0]) <= self.max_batch_size:
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request[0])
+            self._queued_texts -= size
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._process_batch(batch)
+            except Exception as e:
+                # Whatever failed (model call, bad output shape, stats), no caller may hang
+                logger.error(f"Batched embedding of {len(batch)} requests failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process_batch(self, batch: List[Tuple[List[str], Future]]) -> None:
+        """Encode one batch and resolve its futures."""
+        texts = [text for request_texts, _ in batch for text in request_texts]
+        unique = list(dict.fromkeys(texts))
+
+        started = time.perf_counter()
+        embeddings = np.asarray(self.encode_fn(unique), dtype=np.float32)
+        elapsed = time.perf_counter() - started
+        if embeddings.ndim != 2 or len(embeddings) != len(unique):
+            raise ValueError(f"encode returned shape {embeddings.shape} for {len(unique)} texts")
+
+        row = {text: i for i, text in enumerate(unique)}
+        results = [embeddings[[row[text] for text in request_texts]] for request_texts, _ in batch]
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+        self._record(len(batch), len(texts), len(unique), elapsed)
+
+        if len(batch) > 1:
+            logger.debug(f"Micro-batched {len(batch)} requests / {len(unique)} texts in {elapsed * 1000:.1f}ms")
+
+    def _record(self, requests: int, texts: int, unique_texts: int, seconds: float) -> None:
+        with self._cond:
+            self._stats["batches"] += 1
+            self._stats["requests"] += requests
+            self._stats["texts"] += texts
+            self._stats["unique_texts"] += unique_texts
+            self._stats["encode_seconds"] += seconds
+            for bucket in BATCH_SIZE_BUCKETS:
+                if unique_texts <= bucket:
+                    self._histogram[bucket] += 1
+                    break
+            else:
+                self._histogram_overflow += 1
+
+    def get_stats(self) -> Dict:
+        """
+        Batch-size histogram (texts per model call) and totals.
+
+        Returns:
+            Dict with settings, totals and per-bucket (non-cumulative) counts
+        """
+        with self._cond:
+            batches = self._stats["batches"]
+            histogram = {f"le_{bucket}": count for bucket, count in self._histogram.items()}
+            histogram["le_inf"] = self._histogram_overflow
+            return {
+                "max_wait_ms": self.max_wait * 1000,
+                "max_batch_size": self.max_batch_size,
+                "queued_texts": self._queued_texts,
+                "batches": batches,
+                "requests": self._stats["requests"],
+                "texts": self._stats["texts"],
+                "unique_texts": self._stats["unique_texts"],
+                "avg_batch_size": round(self._stats["unique_texts"] / batches, 2) if batches else 0.0,
+                "avg_requests_per_batch": round(self._stats["requests"] / batches, 2) if batches else 0.0,
+                "avg_encode_ms": round(self._stats["encode_seconds"] / batches * 1000, 2) if batches else 0.0,
+                "batch_size_histogram": histogram
+            }
@@ -0,0 +1,308 @@
+"""
+Local embedding server shared by all gunicorn workers.
+One process owns the model and the embedding cache and serves encode
+requests over a UNIX socket, so worker count no longer multiplies model
+memory. Workers talk to it through EmbeddingClient and fall back to
+in-process encoding when it is unreachable (see app/embeddings.py).
+
+Run (from the backend directory, before starting gunicorn):
+    python -m app.embedding_server --socket /run/affirmai/embeddings.sock
+
+Wire format (both directions): u4 header length, JSON header, u4 payload
+length, payload. Encode responses carry the float32 matrix as raw
+C-order bytes in the payload, with its shape in the header.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct("!I")
+# Refuse absurd frames instead of allocating them (64 MiB)
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server rejected a request or sent a malformed reply."""
+
+
+class EmbeddingServerUnavailable(EmbeddingServerError):
+    """The embedding server could not be reached (no socket, refused, timed out)."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += n
+    return bytes(buffer)
+
+
+def _recv_length(sock: socket.socket) -> int:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    return size
+
+
+def send_message(sock: socket.socket, header: Dict, payload: bytes = b"") -> None:
+    """Send one framed message (JSON header plus optional binary payload)."""
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + _LENGTH.pack(len(payload)))
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict, bytes]:
+    """Receive one framed message."""
+    header = json.loads(_recv_exact(sock, _recv_length(sock)).decode("utf-8"))
+    payload_size = _recv_length(sock)
+    payload = _recv_exact(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+class EmbeddingClient:
+    """
+    Thin client for the embedding server.
+
+    Keeps one persistent connection per thread and reconnects once if the
+    server was restarted in between.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                return sock
+            except BlockingIOError:
+                # Listen backlog full (EAGAIN on UNIX sockets): the server is busy, not down
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+            except OSError:
+                sock.close()
+                raise
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, header: Dict) -> Tuple[Dict, bytes]:
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None)
+            reused = sock is not None
+            try:
+                if sock is None:
+                    sock = self._local.sock = self._connect()
+                send_message(sock, header)
+                response, payload = recv_message(sock)
+                break
+            except OSError as e:
+                self._close()
+                # A stale pooled connection gets one retry on a fresh socket
+                if reused and attempt == 0:
+                    continue
+                raise EmbeddingServerUnavailable(f"Embedding server at {self.socket_path} unavailable: {e}") from e
+            except ValueError as e:
+                # Oversized frame: the stream is out of sync, but the server is up
+                self._close()
+                raise EmbeddingServerError(f"Bad reply from embedding server at {self.socket_path}: {e}") from e
+
+        if not response.get("ok"):
+            raise EmbeddingServerError(response.get("error", "Embedding server error"))
+        return response, payload
+
+    def encode(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """
+        Encode texts on the server.
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        response, payload = self._call({"op": "encode", "texts": list(texts), "use_cache": use_cache})
+        return np.frombuffer(payload, dtype=np.float32).reshape(response["shape"])
+
+    def info(self) -> Dict:
+        """Model identity, dimension and live stats of the server."""
+        response, _ = self._call({"op": "info"})
+        return response["info"]
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        while True:
+            try:
+                request, _ = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            except ValueError as e:
+                # Unparseable framing: the stream cannot be resynchronized
+                logger.warning(f"Dropping client after bad frame: {e}")
+                return
+
+            try:
+                header, payload = self.server.dispatch(request)
+            except Exception as e:
+                logger.error(f"Embedding server request failed: {e}")
+                header, payload = {"ok": False, "error": str(e)}, b""
+
+            try:
+                send_message(self.request, header, payload)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded UNIX-socket server around the in-process embedding pipeline.
+
+    Concurrent worker requests are coalesced by the micro-batching
+    dispatcher, so this process also batches across workers.
+    """
+
+    daemon_threads = True
+    # Every worker thread holds a connection; the default backlog of 5 is too small
+    request_queue_size = 256
+
+    def __init__(self, socket_path: str):
+        if os.path.exists(socket_path):
+            # Left behind by a previous run; refuse if something still listens on it
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+                raise RuntimeError(f"An embedding server is already listening on {socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(socket_path)
+            finally:
+                probe.close()
+
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        super().__init__(socket_path, _Handler)
+        # Workers run as the same user; nobody else needs access
+        os.chmod(socket_path, 0o600)
+
+        self.socket_path = socket_path
+        self.started_at = time.time()
+        self._counter_lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+
+    def dispatch(self, request: Dict) -> Tuple[Dict, bytes]:
+        from .embeddings import get_embeddings_local
+
+        op = request.get("op")
+        if op == "encode":
+            texts = request.get("texts") or []
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("'texts' must be a list of strings")
+            embeddings = np.ascontiguousarray(
+                get_embeddings_local(texts, use_cache=bool(request.get("use_cache", True))),
+                dtype=np.float32
+            )
+            with self._counter_lock:
+                self.requests += 1
+                self.texts += len(texts)
+            return {"ok": True, "shape": list(embeddings.shape)}, embeddings.tobytes()
+
+        if op == "info":
+            return {"ok": True, "info": self.info()}, b""
+
+        raise ValueError(f"Unknown op: {op}")
+
+    def info(self) -> Dict:
+        from .cache import embedding_model_identity, get_embedding_cache
+        from .embeddings import get_embedding_dimension, get_embedding_dispatcher
+
+        return {
+            "model_identity": embedding_model_identity(),
+            "dimension": get_embedding_dimension(),
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "texts": self.texts,
+            "microbatch": get_embedding_dispatcher().get_stats(),
+            "cache": get_embedding_cache().get_stats()
+        }
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve(socket_path: str) -> None:
+    """Load the model, then serve until SIGTERM/SIGINT."""
+    from .cache import prewarm_embedding_cache, shutdown_embedding_cache
+    from .embeddings import encode_texts, get_embedding_model
+
+    prewarm_embedding_cache()
+    get_embedding_model()
+    encode_texts(["Warmup sentence."])
+
+    server = EmbeddingServer(socket_path)
+
+    def stop(signum, frame):
+        logger.info(f"Received signal {signum}; shutting down embedding server")
+        # shutdown() waits for serve_forever(), which runs on this thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info(f"Embedding server listening on {socket_path} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        shutdown_embedding_cache()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .config import settings
+
+    parser = argparse.ArgumentParser(description="Shared embedding server for gunicorn workers")
+    parser.add_argument(
+        "--socket",
+        default=settings.EMBEDDING_SERVER_SOCKET or "./cache/embedding-server.sock",
+        help="UNIX socket path (default: EMBEDDING_SERVER_SOCKET)"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
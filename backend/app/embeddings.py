@@ -3,15 +3,108 @@ Multilingual text embeddings using sentence-transformers.
 Provides functionality to generate semantic embeddings for RAG-based translation with caching.
 """
 
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+from pathlib import Path
+import importlib.util
 import logging
+import re
+import threading
+import time
+import numpy as np
 from .cache import get_embedding_cache
+from .config import settings
+from .embedding_dispatcher import EmbeddingDispatcher
+from .embedding_server import EmbeddingClient, EmbeddingServerUnavailable
+
+if TYPE_CHECKING:
+    # Imported by the loaders: workers that only talk to the embedding server never load torch
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
 # Global model instance (singleton pattern for efficiency)
+# The model is settings.EMBEDDING_MODEL; the default supports 50+ languages in a shared embedding space
 _embedding_model = None
+_embedding_dimension = None
+_embedding_dispatcher = None
+_embedding_client = None
+# Monotonic time before which the embedding server is not retried after a failure
+_server_retry_at = 0.0
+# Serializes first-time initialization so concurrent requests load the model once
+_init_lock = threading.Lock()
+
+def _load_torch_model(model_name: str) -> SentenceTransformer:
+    """Reference backend: PyTorch weights via SentenceTransformer."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+def _load_onnx_int8_model(model_name: str) -> SentenceTransformer:
+    """
+    Same model as an int8 dynamically-quantized ONNX Runtime graph (CPU).
+    
+    Uses the pre-quantized file from the model repo when it exists,
+    otherwise exports and quantizes once into EMBEDDING_ONNX_DIR.
+    """
+    if importlib.util.find_spec("onnxruntime") is None or importlib.util.find_spec("optimum") is None:
+        raise RuntimeError(
+            "EMBEDDING_BACKEND=onnx-int8 requires ONNX Runtime: pip install 'sentence-transformers[onnx]'"
+        )
+    from sentence_transformers import SentenceTransformer
+    
+    quantization = settings.EMBEDDING_ONNX_QUANTIZATION
+    # Optimum quantizes weights to uint8 for avx2 and to int8 everywhere else
+    weights = "quint8" if quantization == "avx2" else "qint8"
+    file_name = f"onnx/model_{weights}_{quantization}.onnx"
+    try:
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": file_name})
+    except Exception as e:
+        logger.info(f"No pre-quantized {file_name} available ({e}); quantizing locally")
+    
+    local_dir = Path(settings.EMBEDDING_ONNX_DIR) / re.sub(r"[^A-Za-z0-9._-]+", "-", model_name)
+    if not (local_dir / file_name).exists():
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        onnx_model = SentenceTransformer(model_name, backend="onnx")
+        onnx_model.save(str(local_dir))
+        export_dynamic_quantized_onnx_model(onnx_model, quantization, str(local_dir))
+        logger.info(f"Saved int8 ONNX model to {local_dir / file_name}")
+    
+    return SentenceTransformer(str(local_dir), backend="onnx", model_kwargs={"file_name": file_name})
+
+# Selected by settings.EMBEDDING_BACKEND; each loader takes a model name or path
+EMBEDDING_BACKENDS: Dict[str, Callable[[str], SentenceTransformer]] = {
+    "torch": _load_torch_model,
+    "onnx-int8": _load_onnx_int8_model,
+}
+
+def register_embedding_backend(name: str, loader: Callable[[str], SentenceTransformer]) -> None:
+    """
+    Register an embedding backend selectable via EMBEDDING_BACKEND.
+    
+    Args:
+        name: Backend name
+        loader: Callable taking a model name and returning a SentenceTransformer-compatible model
+    """
+    EMBEDDING_BACKENDS[name] = loader
+
+def load_embedding_model(backend: str, model_name: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load a fresh (non-singleton) model instance for the given backend.
+    
+    Args:
+        backend: Key of EMBEDDING_BACKENDS
+        model_name: Model name or path (default: settings.EMBEDDING_MODEL)
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend: {backend}. "
+            f"Supported: {', '.join(EMBEDDING_BACKENDS.keys())}"
+        )
+    return EMBEDDING_BACKENDS[backend](model_name or settings.EMBEDDING_MODEL)
 
 def get_embedding_model() -> SentenceTransformer:
     """
@@ -25,98 +118,276 @@ ingual embedding model
     global _embedding_model
     
     if _embedding_model is None:
-        logger.info("Loading multilingual embedding model...")
-        # This model supports 50+ languages in a shared embedding space
-        _embedding_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        logger.info("Embedding model loaded successfully. Dimension: 384")
+        with _init_lock:
+            if _embedding_model is None:
+                backend = settings.EMBEDDING_BACKEND
+                logger.info(f"Loading embedding model {settings.EMBEDDING_MODEL} ({backend} backend)...")
+                _embedding_model = load_embedding_model(backend)
+                logger.info(f"Embedding model loaded successfully. Dimension: {get_embedding_dimension()}")
     
     return _embedding_model
 
-def get_embedding(text: str, use_cache: bool = True) -> List[float]:
+def _encode_direct(texts: List[str]) -> np.ndarray:
+    """One model.encode call for a list of texts."""
+    model = get_embedding_model()
+    return model.encode(texts, convert_to_numpy=True, show_progress_bar=False, batch_size=len(texts))
+
+def get_embedding_dispatcher() -> EmbeddingDispatcher:
+    """
+    Get the process-wide micro-batching dispatcher (singleton).
+    
+    Returns:
+        EmbeddingDispatcher instance
+    """
+    global _embedding_dispatcher
+    
+    if _embedding_dispatcher is None:
+        with _init_lock:
+            if _embedding_dispatcher is None:
+                _embedding_dispatcher = EmbeddingDispatcher(
+                    _encode_direct,
+                    max_wait_ms=settings.EMBEDDING_MICROBATCH_MAX_WAIT_MS,
+                    max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE
+                )
+    
+    return _embedding_dispatcher
+
+def encode_texts(texts: List[str]) -> np.ndarray:
+    """
+    Encode texts with the model, micro-batched with concurrent callers when enabled.
+    
+    Returns:
+        float32 array of shape (len(texts), dim)
+    """
+    if settings.EMBEDDING_MICROBATCH_ENABLED:
+        return get_embedding_dispatcher().encode(texts)
+    return _encode_direct(texts)
+
+def _get_embedding_client() -> Optional[EmbeddingClient]:
+    """Client for the shared embedding server, or None if not configured / backing off."""
+    global _embedding_client
+    
+    if not settings.EMBEDDING_SERVER_SOCKET or time.monotonic() < _server_retry_at:
+        return None
+    
+    if _embedding_client is None:
+        with _init_lock:
+            if _embedding_client is None:
+                _embedding_client = EmbeddingClient(
+                    settings.EMBEDDING_SERVER_SOCKET,
+                    timeout=settings.EMBEDDING_SERVER_TIMEOUT_S
+                )
+    
+    return _embedding_client
+
+def _server_unavailable(error: Exception) -> None:
+    global _server_retry_at
+    
+    _server_retry_at = time.monotonic() + settings.EMBEDDING_SERVER_RETRY_S
+    logger.warning(
+        f"{error}; encoding in-process for the next {settings.EMBEDDING_SERVER_RETRY_S:.0f}s"
+    )
+
+def _remote_embeddings(texts: List[str], use_cache: bool) -> Optional[np.ndarray]:
+    """
+    Encode on the shared embedding server; None means fall back to in-process.
+    
+    Only an unreachable server (missing socket, refused connection, timeout)
+    triggers the fallback; errors the server reports are raised to the caller.
+    """
+    client = _get_embedding_client()
+    if client is None:
+        return None
+    
+    try:
+        return client.encode(texts, use_cache=use_cache)
+    except EmbeddingServerUnavailable as e:
+        _server_unavailable(e)
+        return None
+
+def get_embedding_server_info() -> Optional[Dict]:
+    """
+    Identity and live stats of the shared embedding server.
+    
+    Returns:
+        Info dict, or None if no server is configured or it is unreachable
+    """
+    client = _get_embedding_client()
+    if client is None:
+        return None
+    
+    try:
+        return client.info()
+    except EmbeddingServerUnavailable as e:
+        _server_unavailable(e)
+        return None
+
+def get_embedding(
+    text: str,
+    use_cache: bool = True,
+    as_numpy: bool = False
+) -> Union[List[float], np.ndarray]:
     """
     Generate embedding for a single text with caching support.
     
     Args:
         text: Input text to embed
         use_cache: Whether to use cache (default: True)
+        as_numpy: Return a float32 ndarray instead of a list of floats
         
     Returns:
-        List of 384 float values representing the embedding
+        Embedding vector (list of floats, or 1-D float32 array if as_numpy)
     """
+    remote = _remote_embeddings([text], use_cache)
+    if remote is not None:
+        return remote[0] if as_numpy else remote[0].tolist()
+    
     # Check cache first
     if use_cache:
         cache = get_embedding_cache()
-        cached_embedding = cache.get(text)
+        cached_embedding = cache.get_array(text)
         if cached_embedding is not None:
             logger.debug(f"Cache HIT - Using cached embedding ({len(text)} chars)")
-            return cached_embedding
+            return cached_embedding if as_numpy else cached_embedding.tolist()
     
     # Generate new embedding
-    model = get_embedding_model()
-    embedding = model.encode(text, convert_to_tensor=False)
-    embedding_list = embedding.tolist()
+    embedding = encode_texts([text])[0]
     
     # Store in cache
     if use_cache:
         cache = get_embedding_cache()
-        cache.set(text, embedding_list)
+        cache.set(text, embedding)
         logger.debug(f"Cache MISS - Cached new embedding ({len(text)} chars)")
     
-    return embedding_list
+    return embedding if as_numpy else embedding.tolist()
 
-def get_embeddings_batch(texts: List[str], use_cache: bool = True) -> List[List[float]]:
+def get_embeddings_batch(
+    texts: List[str],
+    use_cache: bool = True,
+    as_numpy: bool = False
+) -> Union[List[List[float]], np.ndarray]:
     """
     Generate embeddings for multiple texts efficiently with caching.
     
     Args:
         texts: List of input texts to embed
         use_cache: Whether to use cache (default: True)
+        as_numpy: Return one contiguous float32 matrix instead of lists of floats
+        
+    Returns:
+        List of embeddings, or a (len(texts), dim) float32 array if as_numpy
+    """
+    if not texts:
+        return np.empty((0, get_embedding_dimension()), dtype=np.float32) if as_numpy else []
+    
+    embeddings = _remote_embeddings(texts, use_cache)
+    if embeddings is None:
+        embeddings = get_embeddings_local(texts, use_cache)
+    
+    return embeddings if as_numpy else embeddings.tolist()
+
+def get_embeddings_local(texts: List[str], use_cache: bool = True) -> np.ndarray:
+    """
+    Embed texts in this process (cache plus model), never via the embedding server.
+    
+    Args:
+        texts: Non-empty list of input texts
+        use_cache: Whether to use cache
         
     Returns:
-        List of embeddings, each with 384 dimensions
+        (len(texts), dim) float32 array
     """
     if not use_cache:
         # Generate all without cache
-        model = get_embedding_model()
-        embeddings = model.encode(texts, convert_to_tensor=False, show_progress_bar=False)
-        return [emb.tolist() for emb in embeddings]
+        return encode_texts(texts)
     
-    # Check cache for each text
+    # Resolve the whole batch against the cache in one pass
     cache = get_embedding_cache()
-    results = []
-    texts_to_generate = []
-    indices_to_generate = []
-    
-    for i, text in enumerate(texts):
-        cached = cache.get(text)
-        if cached is not None:
-            results.append(cached)
-        else:
-            results.append(None)  # Placeholder
-            texts_to_generate.append(text)
-            indices_to_generate.append(i)
-    
-    # Generate missing embeddings in batch
+    cached = cache.get_many_arrays(texts)
+    indices_to_generate = [i for i, vector in enumerate(cached) if vector is None]
+    texts_to_generate = [texts[i] for i in indices_to_generate]
+    
+    new_embeddings = None
     if texts_to_generate:
+        # Generate missing embeddings in batch
         logger.info(f"Generating {len(texts_to_generate)}/{len(texts)} embeddings (rest cached)")
-        model = get_embedding_model()
-        new_embeddings = model.encode(texts_to_generate, convert_to_tensor=False, show_progress_bar=False)
+        new_embeddings = encode_texts(texts_to_generate)
         
-        # Store in cache and update results
-        for idx, text, emb in zip(indices_to_generate, texts_to_generate, new_embeddings):
-            emb_list = emb.tolist()
-            cache.set(text, emb_list)
-            results[idx] = emb_list
+        # Queue for (write-behind) caching
+        cache.set_many(texts_to_generate, new_embeddings)
+        if len(texts_to_generate) == len(texts):
+            return new_embeddings
     else:
         logger.info(f"All {len(texts)} embeddings served from cache! ⚡")
     
+    # Assemble cached rows and new rows into one contiguous matrix
+    dim = next(vector for vector in cached if vector is not None).shape[0]
+    results = np.empty((len(texts), dim), dtype=np.float32)
+    for i, vector in enumerate(cached):
+        if vector is not None:
+            results[i] = vector
+    if new_embeddings is not None:
+        results[indices_to_generate] = new_embeddings
+    
     return results
 
 def get_embedding_dimension() -> int:
     """
-    Get the dimension of embeddings produced by this model.
+    Get the dimension of embeddings produced by the loaded model.
+    
+    Returns:
+        int: Embedding dimension (e.g. 384 for the default MiniLM model)
+    """
+    global _embedding_dimension
     
+    if _embedding_dimension is None and _embedding_model is None:
+        # Ask the shared server instead of loading a local copy just for this
+        info = get_embedding_server_info()
+        if info is not None:
+            _embedding_dimension = int(info["dimension"])
+    
+    if _embedding_dimension is None:
+        model = get_embedding_model()
+        dimension = model.get_sentence_embedding_dimension()
+        if dimension is None:
+            # Some custom pooling heads do not declare it; measure once
+            dimension = len(model.encode("dimension probe", convert_to_numpy=True))
+        _embedding_dimension = int(dimension)
+    
+    return _embedding_dimension
+
+def check_backend_parity(
+    texts: List[str],
+    reference: Union[str, SentenceTransformer] = "torch",
+    candidate: Union[str, SentenceTransformer] = "onnx-int8"
+) -> Dict[str, float]:
+    """
+    Compare two backends on the same texts by per-text cosine similarity.
+    
+    Args:
+        texts: Sample texts to embed with both backends
+        reference: Backend name or loaded model treated as ground truth
+        candidate: Backend name or loaded model under test
+        
     Returns:
-        int: Embedding dimension (384)
+        Dict with mean/min/p05 cosine similarity between the two outputs
     """
-    return 384
+    if isinstance(reference, str):
+        reference = load_embedding_model(reference)
+    if isinstance(candidate, str):
+        candidate = load_embedding_model(candidate)
+    
+    ref = reference.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    cand = candidate.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    return cosine_parity(ref, cand)
+
+def cosine_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity summary between two embedding matrices."""
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = np.sum(ref * cand, axis=1)
+    return {
+        "mean": float(cosine.mean()),
+        "min": float(cosine.min()),
+        "p05": float(np.percentile(cosine, 5))
+    }
@@ -1,6 +1,8 @@
 import logging
 import requests
 import json
+import threading
+import time
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, List
 from .config import settings
@@ -10,6 +12,27 @@ logger = logging.getLogger(__name__)
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
+    # Model limits, used to size translation chunks (tokens)
+    context_window: int = 8192
+    max_output_tokens: int = 4000
+    
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Args:
+            max_concurrency: Requests to this provider in flight at once (per worker)
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.slots = threading.BoundedSemaphore(self.max_concurrency)
+    
+    @property
+    def chunk_output_tokens(self) -> int:
+        """Output tokens a translation chunk is sized for: max_output_tokens, capped at half the context window."""
+        return min(self.max_output_tokens, self.context_window // 2)
+    
+    def is_configured(self) -> bool:
+        """Whether requests can be sent at all (e.g. an API key is set)."""
+        return True
+    
     @abstractmethod
     def generate_text(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
         pass
@@ -21,6 +44,8 @@ class LLMProvider(ABC):
 class NovitaProvider(LLMProvider):
     """Provider for Novita AI (via Hugging Face Router compatible API)."""
     
+    context_window = 32768  # zephyr-7b-beta (Mistral 7B)
+    
     def get_name(self) -> str:
         return "Novita (HuggingFace)"
         
@@ -37,7 +62,7 @@ class NovitaProvider(LLMProvider):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 4000,
+            "max_tokens": self.max_output_tokens,
             "temperature": 0.7,
             "top_p": 0.9,
             "stream": False
@@ -62,8 +87,13 @@ class NovitaProvider(LLMProvider):
 class GroqProvider(LLMProvider):
     """Provider for Groq (High-speed, Free Tier)."""
     
+    context_window = 131072  # llama-3.1-8b-instant
+    
     def get_name(self) -> str:
         return "Groq"
+    
+    def is_configured(self) -> bool:
+        return bool(getattr(settings, "GROQ_API_KEY", None))
         
     def generate_text(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
         api_key = getattr(settings, "GROQ_API_KEY", None)
@@ -85,7 +115,7 @@ class GroqProvider(LLMProvider):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 4000,
+            "max_tokens": self.max_output_tokens,
             "temperature": 0.7
         }
         
@@ -134,8 +164,30 @@ class GroqProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """Provider for Local Ollama."""
     
+    context_window = 4096  # Ollama's default num_ctx
+    
+    # Seconds a reachability probe result is reused
+    PROBE_TTL = 60.0
+    
+    def __init__(self, max_concurrency: int = 1):
+        super().__init__(max_concurrency)
+        self._reachable: Optional[bool] = None
+        self._probed_at = 0.0
+    
     def get_name(self) -> str:
         return "Ollama (Local)"
+    
+    def is_configured(self) -> bool:
+        """Whether the local Ollama server answers (probed at most once per PROBE_TTL)."""
+        now = time.monotonic()
+        if self._reachable is None or now - self._probed_at >= self.PROBE_TTL:
+            base_url = getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")
+            try:
+                self._reachable = requests.get(f"{base_url}/api/tags", timeout=0.5).ok
+            except requests.RequestException:
+                self._reachable = False
+            self._probed_at = now
+        return self._reachable
         
     def generate_text(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
         base_url = getattr(settings, "OLLAMA_BASE_URL", "http://localhost:11434")
@@ -157,7 +209,7 @@ class OllamaProvider(LLMProvider):
                 "repeat_penalty": 1.2, # Critical to prevent loop hallucinations
                 "top_p": 0.9,
                 "top_k": 40,
-                "num_predict": 4000
+                "num_predict": self.max_output_tokens
             }
         }
         
@@ -183,8 +235,13 @@ class OllamaProvider(LLMProvider):
 class DeepSeekProvider(LLMProvider):
     """Provider for DeepSeek Official API."""
     
+    context_window = 65536  # deepseek-chat
+    
     def get_name(self) -> str:
         return "DeepSeek (Official)"
+    
+    def is_configured(self) -> bool:
+        return bool(getattr(settings, "DEEPSEEK_API_KEY", None))
         
     def generate_text(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
         api_key = getattr(settings, "DEEPSEEK_API_KEY", None)
@@ -203,7 +260,7 @@ class DeepSeekProvider(LLMProvider):
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 4000,
+            "max_tokens": self.max_output_tokens,
             "temperature": 0.7,
             "stream": False
         }
@@ -238,14 +295,20 @@ class ProviderManager:
         # 3. Groq (Fast Fallback) - If key provided
         # 4. Ollama (Local) - If running
         
-        self.providers.append(NovitaProvider())
-        self.providers.append(DeepSeekProvider())
-        self.providers.append(GroqProvider())
-        self.providers.append(OllamaProvider())
+        self.providers.append(NovitaProvider(settings.NOVITA_MAX_CONCURRENCY))
+        self.providers.append(DeepSeekProvider(settings.DEEPSEEK_MAX_CONCURRENCY))
+        self.providers.append(GroqProvider(settings.GROQ_MAX_CONCURRENCY))
+        self.providers.append(OllamaProvider(settings.OLLAMA_MAX_CONCURRENCY))
+        
+    @property
+    def configured(self) -> List[LLMProvider]:
+        """Providers in the failover chain that can take a request (the ones requests are sized for)."""
+        return [provider for provider in self.providers if provider.is_configured()]
         
     def generate_text_with_fallback(self, prompt: str, system_prompt: str = "You are a helpful assistant.") -> str:
         """
         Try providers in sequence until one succeeds.
+        Each call waits for one of the provider's concurrency slots.
         """
         errors = []
         
@@ -254,7 +317,8 @@ class ProviderManager:
                 # Check prerequisites quickly before attempting (optimization)
                 # For now, just try-catch works.
                 logger.info(f"Attempting generation with {provider.get_name()}...")
-                return provider.generate_text(prompt, system_prompt)
+                with provider.slots:
+                    return provider.generate_text(prompt, system_prompt)
             except Exception as e:
                 error_msg = f"{provider.get_name()} failed: {str(e)}"
                 # Don't log expected config errors as warnings
@@ -1,11 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+import asyncio
 import os
 
 # Load environment variables
 load_dotenv()
 from fastapi.middleware.cors import CORSMiddleware
 from api.v1.router import api_router
+from app.cache import prewarm_embedding_cache, shutdown_embedding_cache
+from app.async_vector_store import shutdown_vector_store_io
+from app.rag_translate import shutdown_translation_executor
+from app.retention import get_retention_job, shutdown_retention_job
+from app.translation_memory import get_translation_memory, shutdown_translation_memory
+from app.config import settings
+from app.warmup import run_warmup, get_readiness
 import logging
 
 # Configure Logging
@@ -14,13 +25,39 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Prewarm caches and load models before the worker reports ready,
+    then persist write-behind cache entries on shutdown.
+    """
+    # Load the embedding cache snapshot so new workers do not start cold
+    await run_in_threadpool(prewarm_embedding_cache)
+    # Warm up in the background so /ready can answer 503 while loading
+    warmup = asyncio.create_task(run_in_threadpool(run_warmup))
+    # Periodic vector store eviction (no-op unless a cap or TTL is configured)
+    get_retention_job().start()
+    # Translation memory pruning runs from startup, not from the first lookup
+    if settings.TRANSLATION_MEMORY_ENABLED:
+        await run_in_threadpool(get_translation_memory)
+    yield
+    if not warmup.done():
+        await warmup
+    # Finish in-flight chunk translations, then write queued translations before the process exits
+    await run_in_threadpool(shutdown_translation_executor)
+    await run_in_threadpool(shutdown_vector_store_io)
+    await run_in_threadpool(shutdown_retention_job)
+    await run_in_threadpool(shutdown_translation_memory)
+    shutdown_embedding_cache()
+
 # Initialize FastAPI App
 app = FastAPI(
     title="AffirmAI API",
     description="AI-powered affirmation and manifestation platform backend.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS (Optional but recommended for frontend integration)
@@ -43,6 +80,14 @@ async def root():
     """
     return {"message": "AffirmAI Backend is running. Visit /docs for API documentation."}
 
+@app.get("/ready", tags=["Health"])
+async def ready():
+    """
+    Readiness probe: 503 until the embedding model, tokenizer and vector store are warm.
+    """
+    readiness = get_readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
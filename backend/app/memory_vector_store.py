@@ -0,0 +1,436 @@
+"""
+In-memory vector store for small per-user corpora.
+
+Keeps every user's chunks as one contiguous float32 matrix and answers
+top-k with a single vectorized dot product, instead of a SQLite metadata
+filter plus an HNSW walk per query. Each user is persisted as its own
+`.npz` file (float32 vectors plus a JSON record list) that is replaced
+atomically on every write; other workers notice the new file by inode and
+mtime and reload it before their next read.
+
+`MemoryVectorStore` implements the subset of the Chroma collection API used
+by app/vector_store.py (get, upsert, update, delete, query, count), with
+the same squared-L2 distances, so it can be selected with
+VECTOR_STORE_BACKEND=memory without touching any caller.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PARTITION_FORMAT = 1
+
+
+def _matches(metadata: Optional[Dict], where: Optional[Dict]) -> bool:
+    """Equality-only `where` filter (the only form app/vector_store.py uses)."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    return all(metadata.get(key) == value for key, value in where.items())
+
+
+class _Partition:
+    """All records of one user: parallel id/document/metadata lists and a vector matrix."""
+
+    def __init__(self, username: str, dim: int = 0):
+        self.username = username
+        self.ids: List[str] = []
+        self.documents: List[Optional[str]] = []
+        self.metadatas: List[Optional[Dict]] = []
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        # ||x||^2 per row, so a query costs one matrix-vector product
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self.rows: Dict[str, int] = {}
+        self.version: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def reindex(self) -> None:
+        self.rows = {record_id: i for i, record_id in enumerate(self.ids)}
+        self.sq_norms = np.einsum("ij,ij->i", self.vectors, self.vectors) if len(self.vectors) \
+            else np.zeros(0, dtype=np.float32)
+
+
+class MemoryVectorStore:
+    """
+    Chroma-compatible collection backed by per-user in-memory matrices.
+
+    Safe for several gunicorn workers: writers serialize on an flock()ed
+    lock file and re-read the partition before changing it; readers only
+    ever see whole files.
+    """
+
+    def __init__(self, path: str, name: str = "manifestation_chunks", metadata: Optional[Dict] = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: Directory holding one `.npz` file per user
+            name: Collection name (reported in stats)
+            metadata: Collection metadata (informational, like Chroma's)
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.metadata = metadata or {}
+
+        self._lock = threading.RLock()
+        self._lock_path = self.path / ".lock"
+        self._partitions: Dict[str, _Partition] = {}
+        # record id -> username, for id-addressed get/update/delete
+        self._owners: Dict[str, str] = {}
+
+        self._refresh_all()
+        logger.info(f"Memory vector store '{name}' at {self.path}: {self.count()} chunks in {len(self._partitions)} partitions")
+
+    # --- persistence ---------------------------------------------------
+
+    def _partition_path(self, username: str) -> Path:
+        return self.path / f"{hashlib.sha1(username.encode('utf-8')).hexdigest()[:20]}.npz"
+
+    @staticmethod
+    def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        # os.replace() always yields a new inode, so this changes on every write
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _load(self, path: Path) -> Optional[_Partition]:
+        version = self._file_version(path)
+        if version is None:
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(bytes(data["meta"]).decode("utf-8"))
+                vectors = np.ascontiguousarray(data["vectors"], dtype=np.float32)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Skipping unreadable vector store partition {path}: {e}")
+            return None
+
+        partition = _Partition(meta["username"], vectors.shape[1])
+        partition.ids = meta["ids"]
+        partition.documents = meta["documents"]
+        partition.metadatas = meta["metadatas"]
+        partition.vectors = vectors
+        partition.version = version
+        partition.reindex()
+        return partition
+
+    def _save(self, partition: _Partition) -> None:
+        """Write a partition atomically (or remove it when empty). Call with the file lock held."""
+        target = self._partition_path(partition.username)
+        if not len(partition):
+            try:
+                target.unlink()
+            except FileNotFoundError:
+                pass
+            partition.version = None
+            return
+
+        meta = {
+            "format": PARTITION_FORMAT,
+            "username": partition.username,
+            "ids": partition.ids,
+            "documents": partition.documents,
+            "metadatas": partition.metadatas,
+        }
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+                vectors=partition.vectors
+            )
+        os.replace(tmp, target)
+        partition.version = self._file_version(target)
+
+    def _install(self, username: str, partition: Optional[_Partition]) -> None:
+        old = self._partitions.pop(username, None)
+        if old is not None:
+            for record_id in old.ids:
+                self._owners.pop(record_id, None)
+        if partition is not None and len(partition):
+            self._partitions[username] = partition
+            for record_id in partition.ids:
+                self._owners[record_id] = username
+
+    def _refresh(self, username: str) -> Optional[_Partition]:
+        """Reload one user's partition if another process rewrote it."""
+        path = self._partition_path(username)
+        current = self._partitions.get(username)
+        version = self._file_version(path)
+        if current is not None and current.version == version:
+            return current
+        if current is None and version is None:
+            return None
+        with self._lock:
+            partition = self._load(path)
+            self._install(username, partition)
+            return self._partitions.get(username)
+
+    def _refresh_all(self) -> None:
+        """Pick up partitions written, changed or removed by other processes."""
+        with self._lock:
+            known = {self._partition_path(username): username for username in self._partitions}
+            seen = set()
+            for path in self.path.glob("*.npz"):
+                username = known.get(path)
+                if username is not None and self._partitions[username].version == self._file_version(path):
+                    seen.add(username)
+                    continue
+                partition = self._load(path)
+                if partition is not None:
+                    self._install(partition.username, partition)
+                    seen.add(partition.username)
+            for username in list(self._partitions):
+                if username not in seen:
+                    self._install(username, None)
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialize writers in this process and across workers."""
+        with self._lock:
+            with open(self._lock_path, "a+") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _scope(self, where: Optional[Dict]) -> List[_Partition]:
+        """Partitions a `where` filter can match, freshly reloaded."""
+        username = (where or {}).get("username")
+        if username is not None:
+            partition = self._refresh(username)
+            return [partition] if partition is not None else []
+        with self._lock:
+            self._refresh_all()
+            return list(self._partitions.values())
+
+    def _locate(self, ids: Sequence[str]) -> Dict[str, List[str]]:
+        """Group known record ids by owning user, rescanning the directory only for unknown ids."""
+        with self._lock:
+            if any(record_id not in self._owners for record_id in ids):
+                self._refresh_all()
+            owners: Dict[str, List[str]] = {}
+            for record_id in ids:
+                username = self._owners.get(record_id)
+                if username is not None:
+                    owners.setdefault(username, []).append(record_id)
+            return owners
+
+    # --- Chroma collection API ------------------------------------------
+
+    def count(self) -> int:
+        return sum(len(partition) for partition in self._scope(None))
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[Dict] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ("metadatas", "documents")
+    ) -> Dict:
+        """Fetch records by id and/or metadata filter, in the shape Chroma returns."""
+        wanted = set(ids) if ids is not None else None
+        if ids is not None and "username" not in (where or {}):
+            with self._lock:
+                partitions = [self._partitions[username] for username in self._locate(ids)]
+        else:
+            partitions = self._scope(where)
+
+        selected: List[Tuple[_Partition, int]] = []
+        for partition in partitions:
+            for i, record_id in enumerate(partition.ids):
+                if wanted is not None and record_id not in wanted:
+                    continue
+                if _matches(partition.metadatas[i], where):
+                    selected.append((partition, i))
+        if offset:
+            selected = selected[offset:]
+        if limit is not None:
+            selected = selected[:limit]
+
+        result = {
+            "ids": [partition.ids[i] for partition, i in selected],
+            "documents": None,
+            "metadatas": None,
+            "embeddings": None,
+        }
+        if "documents" in include:
+            result["documents"] = [partition.documents[i] for partition, i in selected]
+        if "metadatas" in include:
+            result["metadatas"] = [partition.metadatas[i] for partition, i in selected]
+        if "embeddings" in include:
+            result["embeddings"] = np.stack([partition.vectors[i] for partition, i in selected]) \
+                if selected else np.zeros((0, 0), dtype=np.float32)
+        return result
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        embeddings,
+        documents: Optional[Sequence[str]] = None,
+        metadatas: Optional[Sequence[Dict]] = None
+    ) -> None:
+        """Insert new records and replace existing ones; records are partitioned by metadata username."""
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        by_user: Dict[str, List[int]] = {}
+        for i in range(len(ids)):
+            username = ((metadatas[i] if metadatas else None) or {}).get("username", "")
+            by_user.setdefault(username, []).append(i)
+
+        with self._write_lock():
+            for username, rows in by_user.items():
+                partition = self._load(self._partition_path(username)) or _Partition(username, matrix.shape[1])
+                if len(partition) and partition.vectors.shape[1] != matrix.shape[1]:
+                    raise ValueError(
+                        f"Embedding dimension {matrix.shape[1]} does not match the stored "
+                        f"dimension {partition.vectors.shape[1]}"
+                    )
+
+                appended = []
+                for i in rows:
+                    record = (
+                        documents[i] if documents is not None else None,
+                        metadatas[i] if metadatas is not None else None
+                    )
+                    row = partition.rows.get(ids[i])
+                    if row is None:
+                        partition.rows[ids[i]] = len(partition.ids)
+                        partition.ids.append(ids[i])
+                        partition.documents.append(record[0])
+                        partition.metadatas.append(record[1])
+                        appended.append(i)
+                    else:
+                        partition.documents[row] = record[0]
+                        partition.metadatas[row] = record[1]
+                        partition.vectors[row] = matrix[i]
+
+                if appended:
+                    partition.vectors = np.concatenate([partition.vectors, matrix[appended]])
+                partition.reindex()
+                self._save(partition)
+                self._install(username, partition)
+
+    def update(self, ids: Sequence[str], metadatas: Sequence[Dict]) -> None:
+        """Replace the metadata of existing records (unknown ids are ignored)."""
+        new_metadata = dict(zip(ids, metadatas))
+        with self._write_lock():
+            for username, record_ids in self._locate(ids).items():
+                partition = self._load(self._partition_path(username))
+                if partition is None:
+                    continue
+                for record_id in record_ids:
+                    row = partition.rows.get(record_id)
+                    if row is not None:
+                        partition.metadatas[row] = new_metadata[record_id]
+                self._save(partition)
+                self._install(username, partition)
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict] = None) -> None:
+        """Delete records by id and/or metadata filter."""
+        with self._write_lock():
+            if ids is not None:
+                targets = self._locate(ids)
+                doomed = set(ids)
+            else:
+                targets = {partition.username: partition.ids for partition in self._scope(where)}
+                doomed = None
+
+            for username in targets:
+                partition = self._load(self._partition_path(username))
+                if partition is None:
+                    continue
+                keep = [
+                    i for i, record_id in enumerate(partition.ids)
+                    if not ((doomed is None or record_id in doomed) and _matches(partition.metadatas[i], where))
+                ]
+                if len(keep) == len(partition):
+                    continue
+                partition.ids = [partition.ids[i] for i in keep]
+                partition.documents = [partition.documents[i] for i in keep]
+                partition.metadatas = [partition.metadatas[i] for i in keep]
+                partition.vectors = np.ascontiguousarray(partition.vectors[keep])
+                partition.reindex()
+                self._save(partition)
+                self._install(username, partition)
+
+    def query(
+        self,
+        query_embeddings,
+        n_results: int = 10,
+        where: Optional[Dict] = None,
+        include: Sequence[str] = ("metadatas", "documents", "distances")
+    ) -> Dict:
+        """
+        Exact top-k by squared L2 distance (Chroma's default space), one list per query.
+        """
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        queries = queries.reshape(len(queries), -1)
+
+        partitions = self._scope(where)
+        if len(partitions) == 1 and set(where or {}) <= {"username"}:
+            # Common case: one user's matrix, no copy
+            partition = partitions[0]
+            vectors, sq_norms = partition.vectors, partition.sq_norms
+            candidates = [(partition, i) for i in range(len(partition))]
+        else:
+            candidates = [
+                (partition, i)
+                for partition in partitions
+                for i in range(len(partition))
+                if _matches(partition.metadatas[i], where)
+            ]
+            if candidates:
+                vectors = np.stack([partition.vectors[i] for partition, i in candidates])
+                sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+        result = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        if not candidates or not len(queries):
+            result.update({key: [[] for _ in range(len(queries))] for key in result})
+            return result
+
+        # ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2, for every query and candidate at once
+        distances = sq_norms[None, :] - 2 * (queries @ vectors.T) + np.einsum("ij,ij->i", queries, queries)[:, None]
+        np.maximum(distances, 0, out=distances)
+
+        k = min(n_results, len(candidates))
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < len(candidates) \
+            else np.broadcast_to(np.arange(len(candidates)), distances.shape)
+        order = np.take_along_axis(distances, top, axis=1).argsort(axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        for q, rows in enumerate(top.tolist()):
+            hits = [candidates[row] for row in rows]
+            result["ids"].append([partition.ids[i] for partition, i in hits])
+            result["documents"].append([partition.documents[i] for partition, i in hits])
+            result["metadatas"].append([partition.metadatas[i] for partition, i in hits])
+            result["distances"].append([float(distances[q, row]) for row in rows])
+
+        for key in ("documents", "metadatas", "distances"):
+            if key not in include:
+                result[key] = None
+        return result
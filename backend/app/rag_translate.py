@@ -4,15 +4,30 @@ Translates English manifestations to target languages while preserving
 emotional tone, manifestation phrasing, and psychological intent.
 """
 
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Union
 import logging
 import re
+import threading
+import time
+import uuid
 from datetime import datetime
 
-from .chunker import chunk_text
+import numpy as np
+
+from .chunker import chunk_to_token_budget
 from .embeddings import get_embedding, get_embeddings_batch
-from .vector_store import store_chunks, retrieve_similar_chunks
+from .async_vector_store import (
+    get_vector_store_writer,
+    retrieve_similar_chunks_batch_bounded,
+    retrieve_similar_chunks_bounded,
+    store_translations,
+)
+from .translation_memory import get_translation_memory
 from .hf_client import generate_text
+from .llm_providers import LLMProvider, provider_manager
+from .tokenization import get_token_counter
+from .config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +45,121 @@ SUPPORTED_LANGUAGES = {
     }
 }
 
+TAMIL_SYSTEM_PROMPT = """You are a bilingual English–Tamil language expert and a professional localization translator.
+
+Your task is to translate the given English text into Tamil with **100% semantic accuracy** and **natural spoken flow**.
+
+━━━━━━━━━━━━━━━━━━━━━━
+PRIMARY OBJECTIVE (NON-NEGOTIABLE)
+━━━━━━━━━━━━━━━━━━━━━━
+The Tamil output MUST:
+- Preserve the **exact meaning** of every sentence
+- Preserve the **intent** and **emotional tone**
+- Preserve the **logical flow**
+- NOT add new ideas
+- NOT remove any ideas
+
+This is a **faithful translation**, not a summary or rewrite.
+
+━━━━━━━━━━━━━━━━━━━━━━
+TRANSLATION MODE
+━━━━━━━━━━━━━━━━━━━━━━
+Use **Meaning-Preserving Natural Translation**:
+- Translate sentence-by-sentence
+- Keep the same intent per sentence
+- You may change sentence structure ONLY if required for correct and natural Tamil
+- If a sentence exists in English, its meaning MUST exist in Tamil
+
+━━━━━━━━━━━━━━━━━━━━━━
+LANGUAGE STYLE (MANDATORY)
+━━━━━━━━━━━━━━━━━━━━━━
+- Use **simple spoken Tamil**
+- Calm, steady tone
+- Second person (“நீ”)
+- Present tense only
+- No formal, academic, or literary Tamil
+- No poetic exaggeration
+
+The output must sound like a **human inner voice** when read aloud.
+
+━━━━━━━━━━━━━━━━━━━━━━
+AUDIO / TTS SAFETY RULES
+━━━━━━━━━━━━━━━━━━━━━━
+- Prefer short, clear sentences
+- Use commas and periods for pauses
+- Avoid long compound sentences
+- Avoid rare or complex Tamil words
+- Flow must be comfortable at slow speech speed
+
+━━━━━━━━━━━━━━━━━━━━━━
+TECHNICAL & PROPER NOUN HANDLING (STRICT)
+━━━━━━━━━━━━━━━━━━━━━━
+DO NOT translate these terms. Keep them exactly in English:
+- AI/ML
+- Backend Developer
+- Software Engineer
+- Internship
+- Full-time
+- Hackathon
+- Open-source
+- Python
+- Technical Lead
+- Event / Meetup names (e.g., FOSS United Chennai, YuniQ)
+
+━━━━━━━━━━━━━━━━━━━━━━
+EMOTIONAL FIDELITY RULE
+━━━━━━━━━━━━━━━━━━━━━━
+For each English sentence, ask: “What is the feeling this sentence creates?”
+The Tamil sentence MUST create the **same feeling**.
+
+━━━━━━━━━━━━━━━━━━━━━━
+PROHIBITED ACTIONS
+━━━━━━━━━━━━━━━━━━━━━━
+❌ Do NOT paraphrase loosely  
+❌ Do NOT summarize  
+❌ Do NOT generalize  
+❌ Do NOT repeat ideas  
+❌ Do NOT add motivational lines  
+❌ Do NOT remove specific achievements or references  
+
+━━━━━━━━━━━━━━━━━━━━━━
+OUTPUT FORMAT (STRICT)
+━━━━━━━━━━━━━━━━━━━━━━
+Return ONLY the Tamil translation.
+- No English
+- No explanations
+- No headings
+- No quotes
+- No markdown
+
+━━━━━━━━━━━━━━━━━━━━━━
+FINAL VERIFICATION (MANDATORY)
+━━━━━━━━━━━━━━━━━━━━━━
+Before responding, internally verify:
+- Every English idea exists in Tamil
+- No new ideas are added
+- No ideas are missing
+- Meaning matches sentence-by-sentence
+- Tamil sounds natural when spoken"""
+
+# One sentence and its translations. Tokenizing them measures how many output
+# tokens a language needs per English input token with the model's tokenizer.
+REFERENCE_SENTENCE = {
+    "en": "You welcome abundance, health and peace into your life with an open heart.",
+    "ta": "நீ உன் வாழ்க்கையில் செழிப்பையும் அமைதியையும் திறந்த மனதுடன் வரவேற்கிறாய்.",
+    "hi": "तुम अपने जीवन में समृद्धि और शांति का खुले दिल से स्वागत करते हो।"
+}
+
+# Share of the provider's output limit a chunk's translation may use
+# (models do not translate at an exact token ratio)
+OUTPUT_HEADROOM = 0.8
+
+# Budgets never go below the adaptive chunker's target chunk size
+MIN_CHUNK_TOKENS = 140
+
+# Delay before the first retry of a failed chunk (doubles per retry)
+RETRY_BACKOFF_S = 1.0
+
 def build_translation_prompt(
     chunk_text: str,
     target_language: str,
@@ -116,11 +246,84 @@ NATURAL {lang_name.upper()} TRANSLATION (emotionally resonant, culturally approp
 
     return prompt.strip()
 
+def get_system_prompt(target_language: str) -> str:
+    """
+    Get the system prompt for translating into a language.
+    
+    Args:
+        target_language: Target language code (ta, hi)
+        
+    Returns:
+        System prompt string
+    """
+    if target_language == "ta":
+        return TAMIL_SYSTEM_PROMPT
+    
+    # Fallback for other languages
+    lang_info = SUPPORTED_LANGUAGES.get(target_language, {})
+    lang_name = lang_info.get("name", "Target Language")
+    return f"You are a world-class translator and poet specializing in {lang_name}. Your mission is to translate English manifestation affirmations into emotionally resonant, simple, and powerful {lang_name} (Simple Conversational Style)."
+
+# Chunk token budgets, keyed by (providers, tokenizer, language)
+_token_budgets: Dict[tuple, int] = {}
+
+def _provider_token_budget(provider: LLMProvider, overhead: int, ratio: float) -> int:
+    """Largest chunk one provider can take, given the prompt size and output token ratio."""
+    input_budget = provider.context_window - provider.chunk_output_tokens - overhead
+    output_budget = int(provider.chunk_output_tokens * OUTPUT_HEADROOM / ratio)
+    return min(input_budget, output_budget)
+
+def get_chunk_token_budget(target_language: str) -> int:
+    """
+    Get the largest English chunk (in tokens) that one translation call can take.
+    
+    Counted with the primary model's tokenizer and sized for every provider
+    in the failover chain that is configured, so a chunk still fits when
+    it fails over to the one with the smallest window: the prompt (system
+    prompt, instructions and a full translation-memory context section)
+    plus the chunk must fit the context window next to the output limit,
+    and the chunk's translation must fit the output limit.
+    
+    Args:
+        target_language: Target language code (ta, hi)
+        
+    Returns:
+        Token budget per chunk
+    """
+    providers = provider_manager.configured
+    count_tokens = get_token_counter()
+    key = (tuple(provider.get_name() for provider in providers), count_tokens.source, target_language)
+    
+    budget = _token_budgets.get(key)
+    if budget is None:
+        english = REFERENCE_SENTENCE["en"]
+        translated = REFERENCE_SENTENCE.get(target_language, english)
+        translation_key = f"translation_{target_language}"
+        worst_context = [
+            {"text": english * 2, "metadata": {translation_key: translated * 2}}
+        ] * 3
+        overhead = (
+            count_tokens(get_system_prompt(target_language))
+            + count_tokens(build_translation_prompt("", target_language, worst_context))
+        )
+        ratio = max(count_tokens(translated) / max(count_tokens(english), 1), 1.0)
+        
+        limiting = min(providers, key=lambda provider: _provider_token_budget(provider, overhead, ratio))
+        budget = max(_provider_token_budget(limiting, overhead, ratio), MIN_CHUNK_TOKENS)
+        _token_budgets[key] = budget
+        logger.info(
+            f"Chunk budget for {target_language}: {budget} tokens, limited by {limiting.get_name()} "
+            f"(prompt {overhead}, output ratio {ratio:.2f}, counter: {count_tokens.source})"
+        )
+    
+    return budget
+
 def translate_chunk(
     chunk_text: str,
     target_language: str,
-    chunk_embedding: List[float],
-    username: str
+    chunk_embedding: Union[List[float], np.ndarray],
+    username: str,
+    similar_chunks: Optional[List[Dict]] = None
 ) -> str:
     """
     Translate a single chunk using RAG for context.
@@ -130,129 +333,91 @@ def translate_chunk(
         target_language: Target language code
         chunk_embedding: Embedding of the chunk
         username: Username for retrieving similar chunks
+        similar_chunks: Context already retrieved for this chunk (skips the lookup)
         
     Returns:
         Translated chunk text
     """
     # Retrieve similar chunks for context (from same user if available)
-    similar_chunks = retrieve_similar_chunks(
-        query_embedding=chunk_embedding,
-        top_k=2,
-        username=username
-    )
+    if similar_chunks is None:
+        similar_chunks = retrieve_similar_chunks_bounded(
+            query_embedding=chunk_embedding,
+            top_k=2,
+            username=username
+        )
     
     # Build translation prompt
     prompt = build_translation_prompt(chunk_text, target_language, similar_chunks)
     
-    if target_language == "ta":
-        system_prompt = """You are a bilingual English–Tamil language expert and a professional localization translator.
-
-Your task is to translate the given English text into Tamil with **100% semantic accuracy** and **natural spoken flow**.
-
-━━━━━━━━━━━━━━━━━━━━━━
-PRIMARY OBJECTIVE (NON-NEGOTIABLE)
-━━━━━━━━━━━━━━━━━━━━━━
-The Tamil output MUST:
-- Preserve the **exact meaning** of every sentence
-- Preserve the **intent** and **emotional tone**
-- Preserve the **logical flow**
-- NOT add new ideas
-- NOT remove any ideas
-
-This is a **faithful translation**, not a summary or rewrite.
-
-━━━━━━━━━━━━━━━━━━━━━━
-TRANSLATION MODE
-━━━━━━━━━━━━━━━━━━━━━━
-Use **Meaning-Preserving Natural Translation**:
-- Translate sentence-by-sentence
-- Keep the same intent per sentence
-- You may change sentence structure ONLY if required for correct and natural Tamil
-- If a sentence exists in English, its meaning MUST exist in Tamil
-
-━━━━━━━━━━━━━━━━━━━━━━
-LANGUAGE STYLE (MANDATORY)
-━━━━━━━━━━━━━━━━━━━━━━
-- Use **simple spoken Tamil**
-- Calm, steady tone
-- Second person (“நீ”)
-- Present tense only
-- No formal, academic, or literary Tamil
-- No poetic exaggeration
-
-The output must sound like a **human inner voice** when read aloud.
-
-━━━━━━━━━━━━━━━━━━━━━━
-AUDIO / TTS SAFETY RULES
-━━━━━━━━━━━━━━━━━━━━━━
-- Prefer short, clear sentences
-- Use commas and periods for pauses
-- Avoid long compound sentences
-- Avoid rare or complex Tamil words
-- Flow must be comfortable at slow speech speed
-
-━━━━━━━━━━━━━━━━━━━━━━
-TECHNICAL & PROPER NOUN HANDLING (STRICT)
-━━━━━━━━━━━━━━━━━━━━━━
-DO NOT translate these terms. Keep them exactly in English:
-- AI/ML
-- Backend Developer
-- Software Engineer
-- Internship
-- Full-time
-- Hackathon
-- Open-source
-- Python
-- Technical Lead
-- Event / Meetup names (e.g., FOSS United Chennai, YuniQ)
-
-━━━━━━━━━━━━━━━━━━━━━━
-EMOTIONAL FIDELITY RULE
-━━━━━━━━━━━━━━━━━━━━━━
-For each English sentence, ask: “What is the feeling this sentence creates?”
-The Tamil sentence MUST create the **same feeling**.
-
-━━━━━━━━━━━━━━━━━━━━━━
-PROHIBITED ACTIONS
-━━━━━━━━━━━━━━━━━━━━━━
-❌ Do NOT paraphrase loosely  
-❌ Do NOT summarize  
-❌ Do NOT generalize  
-❌ Do NOT repeat ideas  
-❌ Do NOT add motivational lines  
-❌ Do NOT remove specific achievements or references  
-
-━━━━━━━━━━━━━━━━━━━━━━
-OUTPUT FORMAT (STRICT)
-━━━━━━━━━━━━━━━━━━━━━━
-Return ONLY the Tamil translation.
-- No English
-- No explanations
-- No headings
-- No quotes
-- No markdown
-
-━━━━━━━━━━━━━━━━━━━━━━
-FINAL VERIFICATION (MANDATORY)
-━━━━━━━━━━━━━━━━━━━━━━
-Before responding, internally verify:
-- Every English idea exists in Tamil
-- No new ideas are added
-- No ideas are missing
-- Meaning matches sentence-by-sentence
-- Tamil sounds natural when spoken"""
-    else:
-        # Fallback for other languages
-        lang_info = SUPPORTED_LANGUAGES.get(target_language, {})
-        lang_name = lang_info.get("name", "Target Language")
-        system_prompt = f"You are a world-class translator and poet specializing in {lang_name}. Your mission is to translate English manifestation affirmations into emotionally resonant, simple, and powerful {lang_name} (Simple Conversational Style)."
-
+    system_prompt = get_system_prompt(target_language)
+    
     # Generate translation via LLM
     # Note: verify_ssl or other params might be needed depending on environment, but standard call is enough.
     translated_text = generate_text(prompt, system_prompt=system_prompt, expect_tags=False)
     
     return clean_llm_artifacts(translated_text)
 
+def translate_chunk_with_retry(
+    chunk_text: str,
+    target_language: str,
+    chunk_embedding: Union[List[float], np.ndarray],
+    username: str,
+    similar_chunks: Optional[List[Dict]] = None,
+    retries: Optional[int] = None
+) -> str:
+    """
+    translate_chunk, retried on its own with exponential backoff when it fails.
+    
+    Args:
+        retries: Retries after the first attempt (default: TRANSLATION_CHUNK_RETRIES)
+        
+    Returns:
+        Translated chunk text
+        
+    Raises:
+        The last attempt's exception
+    """
+    retries = settings.TRANSLATION_CHUNK_RETRIES if retries is None else retries
+    
+    for attempt in range(retries + 1):
+        try:
+            return translate_chunk(chunk_text, target_language, chunk_embedding, username, similar_chunks)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = RETRY_BACKOFF_S * 2 ** attempt
+            logger.warning(f"Chunk translation failed ({e}); retry {attempt + 1}/{retries} in {delay:.0f}s")
+            time.sleep(delay)
+
+# Global chunk translation executor (singleton)
+_translation_executor: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.Lock()
+
+def get_translation_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool that translates chunks in parallel (singleton).
+    LLM calls are further bounded per provider (see ProviderManager).
+    
+    Returns:
+        ThreadPoolExecutor with TRANSLATION_CHUNK_WORKERS threads
+    """
+    global _translation_executor
+    
+    if _translation_executor is None:
+        with _init_lock:
+            if _translation_executor is None:
+                _translation_executor = ThreadPoolExecutor(
+                    max_workers=max(settings.TRANSLATION_CHUNK_WORKERS, 1),
+                    thread_name_prefix="translate-chunk"
+                )
+    
+    return _translation_executor
+
+def shutdown_translation_executor() -> None:
+    """Wait for in-flight chunk translations and stop the executor."""
+    if _translation_executor is not None:
+        _translation_executor.shutdown(wait=True)
+
 def clean_llm_artifacts(text: str) -> str:
     """
     Aggressively strips LLM meta-commentary that leaks into output.
@@ -323,10 +488,14 @@ def translate_with_rag(
     This function:
     1. Strips emotional tags (for clean translation input)
     2. Chunks the English text semantically
-    3. Generates embeddings for each chunk
-    4. Stores chunks in vector DB
-    5. Translates each chunk with RAG context
-    6. Reassembles translated chunks
+    3. Serves chunks translated before from the exact-match translation memory
+    4. Generates embeddings for the remaining chunks
+    5. Translates them in parallel, each with its own RAG context
+       (a failed chunk is retried on its own)
+    6. Upserts them with their translations into the vector DB and translation memory
+       (queued on the write-behind writer when VECTOR_STORE_WRITE_BEHIND is on);
+       if a chunk still fails, the finished ones are stored before the error is raised
+    7. Reassembles translated chunks in order
     
     Args:
         text: Full English manifestation text
@@ -352,58 +521,94 @@ def translate_with_rag(
     clean_text = strip_emotional_tags(text)
     
     # Step 1: Smart Context Decision
-    # If text is small enough (< 3000 chars approx 750 tokens), send it ALL at once.
+    # If the text fits the model's token budget, send it ALL at once.
     # This provides SUPERIOR quality compared to chunking.
-    if len(clean_text) < 3000:
+    chunks = chunk_to_token_budget(clean_text, get_chunk_token_budget(target_language))
+    if len(chunks) == 1:
         logger.info("Text fits in single context window. Using Direct Full-Context Translation.")
-        chunks = [clean_text] # Treat as one massive chunk
-        
-        # We still generate embedding for the whole block for vector storage
-        embeddings = get_embeddings_batch(chunks)
-    else:
-        # Fallback to chunking for massive texts
-        chunks = chunk_text(clean_text, sentences_per_chunk=3)
-        embeddings = get_embeddings_batch(chunks)
         
     logger.info(f"Processing {len(chunks)} chunks/blocks")
     
-    # Step 3: Store chunks (same logic)
-    session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    store_chunks(
-        chunks=chunks,
-        embeddings=embeddings,
-        username=username,
-        session_id=session_id
-    )
-
-    # Step 4: Translate
-    translated_chunks = []
-    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-        logger.info(f"Translating block {i+1}/{len(chunks)}...")
+    # Step 2: Exact-match translation memory
+    # Text translated before skips embedding, retrieval and the LLM call entirely
+    if settings.TRANSLATION_MEMORY_ENABLED:
+        translated_chunks = get_translation_memory().lookup_many(chunks, target_language)
+    else:
+        translated_chunks = [None] * len(chunks)
+    pending = [i for i, translated in enumerate(translated_chunks) if translated is None]
+    
+    if len(pending) < len(chunks):
+        logger.info(f"Translation memory hit for {len(chunks) - len(pending)}/{len(chunks)} blocks")
+    
+    if pending:
+        pending_chunks = [chunks[i] for i in pending]
         
-        translated_chunk = translate_chunk(
-            chunk_text=chunk,
-            target_language=target_language,
-            chunk_embedding=embedding,
-            username=username
-        )
+        # Step 3: Embeddings (also stored for vector storage)
+        embeddings = get_embeddings_batch(pending_chunks, as_numpy=True)
         
-        translated_chunks.append(translated_chunk)
-    
-    # Step 5: Store translations back in vector DB for future reference
-    try:
-        # Update the chunks with translation metadata
-        translation_dict = {target_language: translated_chunks}
-        store_chunks(
-            chunks=chunks,
-            embeddings=embeddings,
-            username=username,
-            session_id=f"{session_id}_translated",
-            translations=translation_dict
-        )
-        logger.info(f"Stored {target_language} translations in vector DB for translation memory")
-    except Exception as e:
-        logger.warning(f"Failed to store translations: {e}")
+        # Unique per request, so concurrent requests from one user never collide
+        session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        # Step 4: Retrieve context for the whole document in one query (on the bounded
+        # vector store read pool), then translate
+        # the chunks concurrently (bounded by TRANSLATION_CHUNK_WORKERS and each
+        # provider's concurrency limit)
+        contexts = retrieve_similar_chunks_batch_bounded(embeddings, top_k=2, username=username)
+        
+        executor = get_translation_executor()
+        futures = {
+            executor.submit(
+                translate_chunk_with_retry,
+                chunk_text=chunk,
+                target_language=target_language,
+                chunk_embedding=embedding,
+                username=username,
+                similar_chunks=context
+            ): n
+            for n, (chunk, embedding, context) in enumerate(zip(pending_chunks, embeddings, contexts))
+        }
+        logger.info(f"Translating {len(pending)} blocks in parallel...")
+        
+        new_translations: List[Optional[str]] = [None] * len(pending)
+        error = None
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            n = futures[future]
+            try:
+                new_translations[n] = future.result()
+            except Exception as e:
+                logger.error(f"Block {n+1}/{len(pending)} failed after retries: {e}")
+                if error is None:
+                    error = e
+                    # Chunks not started yet are pointless now; running ones still finish
+                    for other in futures:
+                        other.cancel()
+        
+        done = [n for n, translated in enumerate(new_translations) if translated is not None]
+        for n in done:
+            translated_chunks[pending[n]] = new_translations[n]
+        
+        # Step 5: Upsert chunks with their translations for future reference
+        # (one write per request; records are content-addressed, so re-translations
+        # update the existing chunk instead of adding copies). With write-behind
+        # the response does not wait for the vector DB / translation memory inserts.
+        # After a failure the finished chunks are still stored, so a retry of the
+        # request only translates what is missing.
+        if done:
+            done_chunks = [pending_chunks[n] for n in done]
+            done_translations = [new_translations[n] for n in done]
+            if settings.VECTOR_STORE_WRITE_BEHIND:
+                get_vector_store_writer().submit(
+                    done_chunks, embeddings[done], username, session_id, target_language, done_translations
+                )
+            else:
+                store_translations(
+                    done_chunks, embeddings[done], username, session_id, target_language, done_translations
+                )
+        
+        if error is not None:
+            raise error
     
     # Step 6: Reassemble translated chunks
     full_translation = ' '.join(translated_chunks)
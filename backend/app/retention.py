@@ -0,0 +1,330 @@
+"""
+Retention for the vector store.
+
+Evicts chunks that have not been stored or re-seen for
+VECTOR_STORE_TTL_DAYS, and the oldest chunks of users above
+VECTOR_STORE_MAX_CHUNKS_PER_USER, then compacts the persistent store and
+reports how much disk space was reclaimed. Runs as a background thread in
+every worker (only one run at a time across workers), or once from the
+command line:
+
+    python -m app.retention [--dry-run]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+from .vector_store import get_collections, get_persist_directory
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# (record id, username, last stored/seen as epoch seconds)
+Record = Tuple[str, str, float]
+
+
+def _directory_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _last_seen(metadata: Optional[Dict], now: float) -> float:
+    """When a chunk was last stored; records without a readable timestamp count as fresh."""
+    try:
+        return datetime.fromisoformat((metadata or {})["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return now
+
+
+def plan_evictions(
+    records: Iterable[Record],
+    max_per_user: int = 0,
+    ttl_seconds: float = 0,
+    now: Optional[float] = None
+) -> Tuple[List[str], int, int]:
+    """
+    Pick the records to evict.
+
+    Args:
+        records: (id, username, last_seen) of every stored chunk
+        max_per_user: Keep at most this many most recently seen chunks per user (0 = no cap)
+        ttl_seconds: Evict chunks not seen for this long (0 = never)
+        now: Reference time (default: now)
+
+    Returns:
+        (ids to evict, number expired, number over the per-user cap)
+    """
+    now = time.time() if now is None else now
+    cutoff = now - ttl_seconds if ttl_seconds else None
+
+    expired: List[str] = []
+    by_user: Dict[str, List[Tuple[float, str]]] = {}
+    for record_id, username, last_seen in records:
+        if cutoff is not None and last_seen < cutoff:
+            expired.append(record_id)
+        else:
+            by_user.setdefault(username, []).append((last_seen, record_id))
+
+    over_cap: List[str] = []
+    if max_per_user:
+        for user_records in by_user.values():
+            if len(user_records) > max_per_user:
+                user_records.sort(reverse=True)
+                over_cap.extend(record_id for _, record_id in user_records[max_per_user:])
+
+    return expired + over_cap, len(expired), len(over_cap)
+
+
+class RetentionJob:
+    """
+    Periodic vector store eviction and compaction.
+
+    Reports of the last run are kept for the stats endpoint.
+    """
+
+    def __init__(
+        self,
+        max_chunks_per_user: int = 0,
+        ttl_seconds: float = 0,
+        interval: float = 3600.0,
+        batch_size: int = 500
+    ):
+        """
+        Initialize the job (call start() to schedule it).
+
+        Args:
+            max_chunks_per_user: Per-user chunk cap (0 = unbounded)
+            ttl_seconds: Chunk time-to-live since last stored (0 = never expire)
+            interval: Seconds between background runs
+            batch_size: Records scanned and deleted per store call
+        """
+        self.max_chunks_per_user = max_chunks_per_user
+        self.ttl_seconds = ttl_seconds
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._run_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_report: Dict = {}
+        self.runs = 0
+        self.total_evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_chunks_per_user or self.ttl_seconds)
+
+    def start(self) -> None:
+        """Start the background thread if a cap or TTL is configured."""
+        if not self.enabled or self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="vector-store-retention", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Vector store retention every {self.interval:.0f}s "
+            f"(max {self.max_chunks_per_user or 'unbounded'} chunks/user, TTL {self.ttl_seconds or 'none'}s)"
+        )
+
+    def close(self) -> None:
+        """Stop the background thread (an in-flight run finishes first)."""
+        self._closing.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=30)
+
+    def _loop(self) -> None:
+        while not self._closing.wait(self.interval):
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"Vector store retention failed: {e}")
+
+    def run(self, dry_run: bool = False) -> Dict:
+        """
+        Evict expired and over-cap chunks, then compact the store.
+
+        Only one run happens at a time across all workers; others return at once.
+
+        Args:
+            dry_run: Only report what would be evicted
+
+        Returns:
+            Report dict, empty if another run was in progress
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return {}
+        try:
+            persist_directory = get_persist_directory()
+            os.makedirs(persist_directory, exist_ok=True)
+            with open(os.path.join(persist_directory, ".retention.lock"), "a+") as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return {}
+                return self._run(persist_directory, dry_run)
+        finally:
+            self._run_lock.release()
+
+    def _scan(self, collection, now: float) -> List[Record]:
+        records: List[Record] = []
+        offset = 0
+        while True:
+            page = collection.get(limit=self.batch_size, offset=offset, include=["metadatas"])
+            if not page["ids"]:
+                return records
+            offset += len(page["ids"])
+            records.extend(
+                (record_id, (metadata or {}).get("username", ""), _last_seen(metadata, now))
+                for record_id, metadata in zip(page["ids"], page["metadatas"])
+            )
+
+    def _run(self, persist_directory: str, dry_run: bool) -> Dict:
+        started = time.perf_counter()
+        now = time.time()
+        size_before = _directory_bytes(persist_directory)
+
+        scanned = expired = over_cap = evicted = 0
+        for collection in get_collections():
+            records = self._scan(collection, now)
+            scanned += len(records)
+            doomed, n_expired, n_over_cap = plan_evictions(
+                records, self.max_chunks_per_user, self.ttl_seconds, now
+            )
+            expired += n_expired
+            over_cap += n_over_cap
+            if dry_run:
+                continue
+            for i in range(0, len(doomed), self.batch_size):
+                collection.delete(ids=doomed[i:i + self.batch_size])
+                evicted += len(doomed[i:i + self.batch_size])
+
+        if evicted:
+            self._compact(persist_directory)
+
+        size_after = _directory_bytes(persist_directory)
+        report = {
+            "dry_run": dry_run,
+            "scanned": scanned,
+            "expired": expired,
+            "over_cap": over_cap,
+            "evicted": evicted,
+            "size_mb_before": round(size_before / (1024 * 1024), 2),
+            "size_mb_after": round(size_after / (1024 * 1024), 2),
+            "reclaimed_mb": round((size_before - size_after) / (1024 * 1024), 2),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "finished_at": time.time()
+        }
+
+        if not dry_run:
+            self.runs += 1
+            self.total_evicted += evicted
+            self.last_report = report
+        logger.info(f"Vector store retention: {report}")
+        return report
+
+    def _compact(self, persist_directory: str) -> None:
+        """
+        Give space freed by deletions back to the filesystem.
+
+        The memory backend rewrites partitions on delete, so only Chroma's
+        SQLite file needs a VACUUM.
+        """
+        if settings.VECTOR_STORE_BACKEND != "chroma":
+            return
+        database = os.path.join(persist_directory, "chroma.sqlite3")
+        if not os.path.exists(database):
+            return
+        conn = sqlite3.connect(database, timeout=60, isolation_level=None)
+        try:
+            conn.execute("VACUUM")
+        except sqlite3.OperationalError as e:
+            # Busy with a concurrent write; the next run will try again
+            logger.warning(f"Could not vacuum {database}: {e}")
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict:
+        """
+        Get retention settings and the report of the last run in this worker.
+
+        Returns:
+            Dict with retention stats
+        """
+        return {
+            "enabled": self.enabled,
+            "max_chunks_per_user": self.max_chunks_per_user,
+            "ttl_days": round(self.ttl_seconds / 86400, 2),
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "total_evicted": self.total_evicted,
+            "last_run": self.last_report or None
+        }
+
+
+# Global retention job instance (singleton)
+_retention_job = None
+_init_lock = threading.Lock()
+
+def get_retention_job() -> RetentionJob:
+    """
+    Get global retention job instance (singleton, not started).
+
+    Returns:
+        RetentionJob instance
+    """
+    global _retention_job
+
+    if _retention_job is None:
+        with _init_lock:
+            if _retention_job is None:
+                _retention_job = RetentionJob(
+                    max_chunks_per_user=settings.VECTOR_STORE_MAX_CHUNKS_PER_USER,
+                    ttl_seconds=settings.VECTOR_STORE_TTL_DAYS * 86400,
+                    interval=settings.VECTOR_STORE_RETENTION_INTERVAL_S,
+                    batch_size=settings.VECTOR_STORE_RETENTION_BATCH
+                )
+
+    return _retention_job
+
+def shutdown_retention_job() -> None:
+    """Stop the background retention thread, if it was started."""
+    if _retention_job is not None:
+        _retention_job.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evict expired and over-cap vector store chunks once.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be evicted")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    job = get_retention_job()
+    if not job.enabled:
+        print("Set VECTOR_STORE_MAX_CHUNKS_PER_USER or VECTOR_STORE_TTL_DAYS to enable retention.", file=sys.stderr)
+        return 1
+
+    print(json.dumps(job.run(dry_run=args.dry_run), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Sentence segmentation for the chunker.
+
+Tamil and Hindi text takes a compiled-regex fast path that splits after
+sentence-final punctuation, including the Devanagari danda (।) and double
+danda (॥) that NLTK's English Punkt model ignores. Other text goes through
+a Punkt tokenizer that is loaded lazily on first use and cached: the
+trained English model if its data is installed, otherwise NLTK's built-in
+untrained Punkt tokenizer. Nothing is ever downloaded at runtime: the
+`punkt_tab` data is not vendored here but fetched at build time (the
+Dockerfile in docs/DEPLOYMENT.md and setup_ec2.sh do this). The untrained
+fallback keeps the service up without it but splits English less
+accurately, e.g. after abbreviations.
+"""
+
+import logging
+import re
+import threading
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# Devanagari (Hindi, incl. danda) and Tamil blocks
+_INDIC = re.compile(r"[\u0900-\u097F\u0B80-\u0BFF]")
+# Whitespace after sentence-final punctuation (optionally behind a closing quote/bracket),
+# or a danda directly followed by the next sentence
+_INDIC_BOUNDARY = re.compile(
+    r"(?<=[.!?।॥])\s+|(?<=[.!?।॥][\"'”’)\]])\s+|(?<=[।॥])(?=[^\s\"'”’)\]])"
+)
+
+# Cached Punkt tokenizer (singleton)
+_tokenizer = None
+_init_lock = threading.Lock()
+
+
+def _load_tokenizer():
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+    try:
+        from nltk.tokenize.punkt import PunktTokenizer  # nltk >= 3.8.2 (punkt_tab data)
+        return PunktTokenizer("english")
+    except (ImportError, LookupError):
+        pass
+
+    try:
+        import nltk
+        return nltk.data.load("tokenizers/punkt/english.pickle")
+    except (LookupError, ValueError, OSError):
+        pass
+
+    logger.warning("NLTK punkt data not installed; using the untrained Punkt sentence tokenizer")
+    return PunktSentenceTokenizer()
+
+
+def get_sentence_tokenizer():
+    """
+    Get the cached Punkt sentence tokenizer, loading it on first use.
+
+    Returns:
+        Object with a `tokenize(text) -> List[str]` method
+    """
+    global _tokenizer
+
+    if _tokenizer is None:
+        with _init_lock:
+            if _tokenizer is None:
+                _tokenizer = _load_tokenizer()
+                logger.info(f"Sentence tokenizer loaded: {type(_tokenizer).__name__}")
+
+    return _tokenizer
+
+
+def split_indic_sentences(text: str) -> List[str]:
+    """Regex sentence split for Tamil/Hindi text (., !, ?, । and ॥ end a sentence)."""
+    return [sentence.strip() for sentence in _INDIC_BOUNDARY.split(text) if sentence.strip()]
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences.
+
+    Args:
+        text: Text in English, Tamil or Hindi
+
+    Returns:
+        List of sentences (stripped, non-empty)
+    """
+    if _INDIC.search(text):
+        return split_indic_sentences(text)
+    return [sentence for sentence in get_sentence_tokenizer().tokenize(text) if sentence.strip()]
@@ -0,0 +1,123 @@
+"""
+Token counting for translation chunk budgets.
+
+Counts come from the LLM's own `tokenizer.json` (HF `tokenizers`), loaded
+once per tokenizer and cached. By default only the local Hugging Face
+cache is consulted (see docs/DEPLOYMENT.md for pre-fetching it); when the
+tokenizer is not available the counter falls back to a script-aware
+estimate, so chunking keeps working offline.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Devanagari (Hindi) and Tamil blocks
+_INDIC_CHAR = re.compile(r"[\u0900-\u097F\u0B80-\u0BFF]")
+_WORD = re.compile(r"\S+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of text without a tokenizer.
+
+    English-heavy BPE vocabularies produce ~1.3 tokens per English word but
+    about one token per Tamil/Devanagari character (often more), so Indic
+    characters are counted individually and the rest by words.
+
+    Args:
+        text: Text in any language
+
+    Returns:
+        Estimated token count
+    """
+    indic = len(_INDIC_CHAR.findall(text))
+    if not indic:
+        return math.ceil(len(_WORD.findall(text)) * 1.3)
+    latin_words = len(_WORD.findall(_INDIC_CHAR.sub("", text)))
+    return indic + math.ceil(latin_words * 1.3)
+
+
+class TokenCounter:
+    """Callable text -> token count, backed by a tokenizer or the estimate."""
+
+    def __init__(self, tokenizer=None, source: str = "estimate"):
+        self.tokenizer = tokenizer
+        self.source = source
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def __call__(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is None:
+            return estimate_tokens(text)
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def _load_tokenizer(tokenizer_id: str):
+    """Load a tokenizer.json by path or Hub repo id; None if unavailable."""
+    try:
+        from tokenizers import Tokenizer
+    except ImportError:
+        logger.warning("`tokenizers` is not installed; estimating token counts")
+        return None
+
+    try:
+        if os.path.isfile(tokenizer_id):
+            path = tokenizer_id
+        else:
+            from huggingface_hub import hf_hub_download
+            path = hf_hub_download(
+                tokenizer_id,
+                "tokenizer.json",
+                token=settings.HUGGINGFACE_API_KEY or None,
+                local_files_only=not settings.TRANSLATION_TOKENIZER_DOWNLOAD
+            )
+        return Tokenizer.from_file(path)
+    except Exception as e:
+        logger.warning(f"Tokenizer for {tokenizer_id} not available ({type(e).__name__}); estimating token counts")
+        return None
+
+
+# Loaded token counters, keyed by tokenizer id
+_counters: Dict[str, TokenCounter] = {}
+_init_lock = threading.Lock()
+
+def get_token_counter(tokenizer_id: Optional[str] = None) -> TokenCounter:
+    """
+    Get the cached token counter for a tokenizer, loading it on first use.
+
+    Args:
+        tokenizer_id: Hub repo id or tokenizer.json path
+                      (default: TRANSLATION_TOKENIZER, else MODEL_ID)
+
+    Returns:
+        TokenCounter (exact if the tokenizer could be loaded, else estimating)
+    """
+    tokenizer_id = tokenizer_id or settings.TRANSLATION_TOKENIZER or settings.MODEL_ID
+
+    counter = _counters.get(tokenizer_id)
+    if counter is None:
+        with _init_lock:
+            counter = _counters.get(tokenizer_id)
+            if counter is None:
+                tokenizer = _load_tokenizer(tokenizer_id)
+                counter = TokenCounter(tokenizer, tokenizer_id if tokenizer is not None else "estimate")
+                _counters[tokenizer_id] = counter
+                logger.info(f"Token counter for {tokenizer_id}: {counter.source}")
+
+    return counter
+
+def count_tokens(text: str) -> int:
+    """Count tokens of text with the default translation tokenizer."""
+    return get_token_counter()(text)
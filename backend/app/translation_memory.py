@@ -0,0 +1,431 @@
+"""
+Exact-match translation memory.
+Stores finished chunk translations in SQLite, keyed by a hash of the
+normalized source text and target language, so repeated text skips
+embedding, vector search and the LLM call entirely.
+"""
+
+import atexit
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation_memory (
+    key          BLOB PRIMARY KEY,
+    language     TEXT NOT NULL,
+    source_text  TEXT NOT NULL,
+    translation  TEXT NOT NULL,
+    username     TEXT,
+    created      REAL NOT NULL,
+    last_used    REAL NOT NULL,
+    hits         INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Retention scans entries by last use
+_LAST_USED_INDEX = """
+CREATE INDEX IF NOT EXISTS translation_memory_last_used ON translation_memory (last_used)
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for matching: Unicode NFC, whitespace runs collapsed, trimmed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def translation_key(text: str, language: str) -> bytes:
+    """SHA-256 of the normalized text and target language."""
+    return hashlib.sha256(f"{language}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class TranslationMemory:
+    """
+    SQLite-backed exact-match translation memory.
+
+    WAL mode lets every gunicorn worker read while one writes; each thread
+    uses its own connection. Lookups never write: hit counts and last-use
+    times are buffered in memory and written back by a background thread,
+    which also prunes expired and least recently used entries.
+    """
+
+    # SQLite's default limit on bound parameters is 999
+    _BATCH = 500
+
+    def __init__(
+        self,
+        db_path: str = "./cache/translation_memory.sqlite3",
+        flush_interval: float = 5.0,
+        max_entries: int = 0,
+        ttl_seconds: float = 0,
+        prune_interval: float = 3600.0
+    ):
+        """
+        Initialize translation memory.
+
+        Args:
+            db_path: SQLite database file
+            flush_interval: Seconds between write-backs of buffered hit stats
+            max_entries: Least recently used entries beyond this are pruned (0 = unbounded)
+            ttl_seconds: Entries unused for this long are pruned (0 = never)
+            prune_interval: Seconds between background prunes
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "lookup_seconds": 0.0, "lookups": 0, "pruned": 0}
+
+        # Hit stats not yet written back: key -> (hit count, last used)
+        self.flush_interval = flush_interval
+        self._pending_hits: Dict[bytes, Tuple[int, float]] = {}
+        self._hits_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+
+        # Retention
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval = prune_interval
+        # The first maintenance tick prunes, so short-lived workers still enforce retention
+        self._last_prune = float("-inf")
+
+        with self._connection() as conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_LAST_USED_INDEX)
+
+        atexit.register(self.close)
+
+        # Retention must not depend on lookups hitting; start maintenance right away
+        if self.retention_enabled:
+            self._ensure_writer()
+
+        logger.info(f"Translation memory initialized at: {self.db_path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup_many(self, texts: Sequence[str], language: str) -> List[Optional[str]]:
+        """
+        Look up stored translations for a batch of source texts.
+
+        Args:
+            texts: Source (English) texts
+            language: Target language code
+
+        Returns:
+            One translation (or None on miss) per input text
+        """
+        started = time.perf_counter()
+        keys = [translation_key(text, language) for text in texts]
+        found: Dict[bytes, str] = {}
+
+        conn = self._connection()
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), self._BATCH):
+            batch = unique[i:i + self._BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, translation FROM translation_memory WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            found.update((bytes(key), translation) for key, translation in rows)
+
+        if found:
+            self._record_hits(found)
+
+        results = [found.get(key) for key in keys]
+        hits = sum(result is not None for result in results)
+        with self._stats_lock:
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(results) - hits
+            self._stats["lookups"] += 1
+            self._stats["lookup_seconds"] += time.perf_counter() - started
+
+        return results
+
+    def _record_hits(self, keys) -> None:
+        """Buffer hit stats for the background writer instead of writing on the read path."""
+        now = time.time()
+        with self._hits_lock:
+            for key in keys:
+                hits, _ = self._pending_hits.get(key, (0, now))
+                self._pending_hits[key] = (hits + 1, now)
+        self._ensure_writer()
+
+    @property
+    def _maintenance_interval(self) -> float:
+        """Seconds between background ticks (0 = no background thread)."""
+        intervals = [self.flush_interval]
+        if self.retention_enabled:
+            intervals.append(self.prune_interval)
+        intervals = [interval for interval in intervals if interval > 0]
+        return min(intervals) if intervals else 0
+
+    def _ensure_writer(self) -> None:
+        if self._closing.is_set() or not self._maintenance_interval:
+            return
+        if self._writer is None or not self._writer.is_alive():
+            with self._hits_lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(
+                        target=self._writer_loop,
+                        name="translation-memory-maintenance",
+                        daemon=True
+                    )
+                    self._writer.start()
+
+    def _writer_loop(self) -> None:
+        while not self._closing.wait(self._maintenance_interval):
+            try:
+                self.flush_hits()
+                if (
+                    self.retention_enabled
+                    and self.prune_interval > 0
+                    and time.monotonic() - self._last_prune >= self.prune_interval
+                ):
+                    self.prune()
+            except Exception as e:
+                logger.error(f"Translation memory maintenance failed: {e}")
+
+    def flush_hits(self) -> int:
+        """
+        Write buffered hit counts and last-use times in one transaction.
+
+        Returns:
+            Number of entries updated
+        """
+        with self._hits_lock:
+            pending, self._pending_hits = self._pending_hits, {}
+        if not pending:
+            return 0
+
+        try:
+            with self._connection() as conn:
+                conn.executemany(
+                    "UPDATE translation_memory SET hits = hits + ?, last_used = MAX(last_used, ?) WHERE key = ?",
+                    [(hits, last_used, key) for key, (hits, last_used) in pending.items()]
+                )
+        except sqlite3.OperationalError as e:
+            # Usage stats are best effort; the next flush carries them again
+            logger.debug(f"Could not record translation memory hits: {e}")
+            with self._hits_lock:
+                for key, (hits, last_used) in pending.items():
+                    newer_hits, newer_used = self._pending_hits.get(key, (0, last_used))
+                    self._pending_hits[key] = (hits + newer_hits, max(last_used, newer_used))
+            return 0
+
+        return len(pending)
+
+    @property
+    def retention_enabled(self) -> bool:
+        return bool(self.max_entries or self.ttl_seconds)
+
+    def prune(self) -> int:
+        """
+        Delete entries unused for longer than the TTL, then the least
+        recently used entries beyond the entry cap.
+
+        Returns:
+            Number of entries deleted
+        """
+        self._last_prune = time.monotonic()
+        # Recent hits count as use
+        self.flush_hits()
+
+        deleted = 0
+        with self._connection() as conn:
+            if self.ttl_seconds:
+                deleted += conn.execute(
+                    "DELETE FROM translation_memory WHERE last_used < ?",
+                    (time.time() - self.ttl_seconds,)
+                ).rowcount
+            if self.max_entries:
+                excess = conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    deleted += conn.execute(
+                        """
+                        DELETE FROM translation_memory WHERE key IN (
+                            SELECT key FROM translation_memory ORDER BY last_used LIMIT ?
+                        )
+                        """,
+                        (excess,)
+                    ).rowcount
+
+        if deleted:
+            with self._stats_lock:
+                self._stats["pruned"] += deleted
+            logger.info(f"Pruned {deleted} translation memory entries")
+        return deleted
+
+    def close(self) -> None:
+        """Stop the maintenance thread and write back buffered hit stats."""
+        self._closing.set()
+        if self._writer is not None and self._writer is not threading.current_thread():
+            self._writer.join(timeout=10)
+        try:
+            self.flush_hits()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write back translation memory hits: {e}")
+
+    def lookup(self, text: str, language: str) -> Optional[str]:
+        """
+        Look up the stored translation of one source text.
+
+        Returns:
+            Translation or None if not found
+        """
+        return self.lookup_many([text], language)[0]
+
+    def store_many(
+        self,
+        texts: Sequence[str],
+        translations: Sequence[str],
+        language: str,
+        username: Optional[str] = None
+    ) -> int:
+        """
+        Store (or replace) translations of source texts.
+
+        Args:
+            texts: Source texts
+            translations: Translations, aligned with `texts`
+            language: Target language code
+            username: Owner of the translation request (informational)
+
+        Returns:
+            Number of rows written
+        """
+        now = time.time()
+        rows = [
+            (translation_key(text, language), language, normalize_text(text), translation, username, now, now)
+            for text, translation in zip(texts, translations)
+            if translation and translation.strip()
+        ]
+        if not rows:
+            return 0
+
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO translation_memory
+                    (key, language, source_text, translation, username, created, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    translation = excluded.translation,
+                    username = excluded.username,
+                    last_used = excluded.last_used
+                """,
+                rows
+            )
+
+        with self._stats_lock:
+            self._stats["stores"] += len(rows)
+        logger.debug(f"Stored {len(rows)} {language} translations in translation memory")
+        return len(rows)
+
+    def clear(self) -> int:
+        """
+        Delete every stored translation.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self._hits_lock:
+            self._pending_hits.clear()
+        with self._connection() as conn:
+            count = conn.execute("DELETE FROM translation_memory").rowcount
+        logger.info(f"Cleared {count} translation memory entries")
+        return count
+
+    def get_stats(self) -> dict:
+        """
+        Get translation memory statistics.
+
+        Hit/miss counters are per worker process; entry counts come from the shared database.
+
+        Returns:
+            Dict with memory stats
+        """
+        conn = self._connection()
+        per_language = dict(conn.execute(
+            "SELECT language, COUNT(*) FROM translation_memory GROUP BY language"
+        ).fetchall())
+        size_bytes = sum(
+            os.path.getsize(path)
+            for path in (self.db_path, Path(f"{self.db_path}-wal"))
+            if os.path.exists(path)
+        )
+
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        lookups_total = stats["hits"] + stats["misses"]
+        return {
+            "total_entries": sum(per_language.values()),
+            "entries_by_language": per_language,
+            "size_mb": round(size_bytes / (1024 * 1024), 2),
+            "db_path": str(self.db_path),
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / lookups_total, 4) if lookups_total else 0.0,
+            "stores": stats["stores"],
+            "pruned": stats["pruned"],
+            "max_entries": self.max_entries,
+            "ttl_days": round(self.ttl_seconds / 86400, 2),
+            "avg_lookup_ms": round(stats["lookup_seconds"] / stats["lookups"] * 1000, 3) if stats["lookups"] else 0.0
+        }
+
+
+# Global translation memory instance (singleton)
+_translation_memory = None
+_init_lock = threading.Lock()
+
+def get_translation_memory() -> TranslationMemory:
+    """
+    Get global translation memory instance (singleton).
+
+    Returns:
+        TranslationMemory instance
+    """
+    global _translation_memory
+
+    if _translation_memory is None:
+        with _init_lock:
+            if _translation_memory is None:
+                _translation_memory = TranslationMemory(
+                    settings.TRANSLATION_MEMORY_PATH,
+                    flush_interval=settings.TRANSLATION_MEMORY_FLUSH_INTERVAL_S,
+                    max_entries=settings.TRANSLATION_MEMORY_MAX_ENTRIES,
+                    ttl_seconds=settings.TRANSLATION_MEMORY_TTL_DAYS * 86400,
+                    prune_interval=settings.TRANSLATION_MEMORY_PRUNE_INTERVAL_S
+                )
+
+    return _translation_memory
+
+def shutdown_translation_memory() -> None:
+    """
+    Write back buffered hit stats. Called from the app shutdown hook.
+    """
+    if _translation_memory is not None:
+        _translation_memory.close()
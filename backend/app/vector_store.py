@@ -1,22 +1,71 @@
 """
 Vector database management using ChromaDB.
 Stores and retrieves manifestation chunks for RAG-based translation.
+
+The collection comes from the backend named by VECTOR_STORE_BACKEND:
+"chroma" (default) or "memory" (app/memory_vector_store.py, per-user
+in-memory matrices with exact search, for small per-user corpora).
+
+With VECTOR_STORE_SHARDS > 1 users are hashed onto that many tenant shard
+collections; a user's reads and writes only ever touch their own shard.
 """
 
 import chromadb
+import chromadb.errors
+import numpy as np
 from chromadb.config import Settings
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Union
+import hashlib
 import logging
 import os
+import shutil
+import threading
 from datetime import datetime
 
+from .config import settings
+from .memory_vector_store import MemoryVectorStore
+
 logger = logging.getLogger(__name__)
 
-# Global ChromaDB client (singleton)
+# Global ChromaDB client (singleton) and opened collections by name
 _chroma_client = None
-_collection = None
+_collections: Dict[str, object] = {}
+# Re-entrant: get_collection() initializes the client while holding it
+_init_lock = threading.RLock()
+
+# Older chromadb releases raise ValueError for a missing collection
+_ChromaNotFound = getattr(chromadb.errors, "NotFoundError", ValueError)
 
 COLLECTION_NAME = "manifestation_chunks"
+# Models whose vectors live in the original, unsuffixed collection
+_BASE_COLLECTION_MODELS = {
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+    "paraphrase-multilingual-MiniLM-L12-v2",
+}
+
+def get_collection_name(model_name: Optional[str] = None) -> str:
+    """
+    Collection for an embedding model (default: settings.EMBEDDING_MODEL).
+    
+    Vectors from different models are not comparable (and may differ in
+    dimension), so every other model gets its own suffixed collection.
+    """
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if model_name in _BASE_COLLECTION_MODELS:
+        return COLLECTION_NAME
+    return f"{COLLECTION_NAME}_{hashlib.sha1(model_name.encode('utf-8')).hexdigest()[:10]}"
+
+def get_persist_directory(backend: Optional[str] = None) -> str:
+    """
+    Directory holding a backend's persistent data.
+    
+    Args:
+        backend: Key of VECTOR_STORE_BACKENDS (default: settings.VECTOR_STORE_BACKEND)
+    """
+    backend = backend or settings.VECTOR_STORE_BACKEND
+    if backend == "memory":
+        return os.path.abspath(settings.VECTOR_STORE_MEMORY_PATH)
+    return os.path.join(os.getcwd(), "chroma_db")
 
 def get_chroma_client():
     """
@@ -28,80 +77,230 @@ def get_chroma_client():
     global _chroma_client
     
     if _chroma_client is None:
-        # Use persistent storage in ./chroma_db directory
-        persist_directory = os.path.join(os.getcwd(), "chroma_db")
-        os.makedirs(persist_directory, exist_ok=True)
-        
-        logger.info(f"Initializing ChromaDB with persistent storage at: {persist_directory}")
-        
-        _chroma_client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
-        
-        logger.info("ChromaDB client initialized successfully")
+        with _init_lock:
+            if _chroma_client is None:
+                # Use persistent storage in ./chroma_db directory
+                persist_directory = get_persist_directory("chroma")
+                os.makedirs(persist_directory, exist_ok=True)
+                
+                logger.info(f"Initializing ChromaDB with persistent storage at: {persist_directory}")
+                
+                _chroma_client = chromadb.PersistentClient(
+                    path=persist_directory,
+                    settings=Settings(
+                        anonymized_telemetry=False,
+                        allow_reset=True
+                    )
+                )
+                
+                logger.info("ChromaDB client initialized successfully")
     
     return _chroma_client
 
-def get_collection():
+def _open_chroma_collection(name: str, metadata: Dict):
+    return get_chroma_client().get_or_create_collection(name=name, metadata=metadata)
+
+def _open_memory_collection(name: str, metadata: Dict) -> MemoryVectorStore:
+    # One directory per collection, so models never share vectors (same as Chroma)
+    return MemoryVectorStore(
+        os.path.join(settings.VECTOR_STORE_MEMORY_PATH, name),
+        name=name,
+        metadata=metadata
+    )
+
+# Backend name -> opener(collection name, collection metadata)
+VECTOR_STORE_BACKENDS: Dict[str, Callable[[str, Dict], object]] = {
+    "chroma": _open_chroma_collection,
+    "memory": _open_memory_collection,
+}
+
+def get_shard(username: str, shards: Optional[int] = None) -> int:
     """
-    Get or create the manifestation chunks collection.
+    Tenant shard holding a user's chunks (stable across processes and restarts).
     
-    Returns:
-        chromadb.Collection: Collection for storing chunks
+    Args:
+        username: Owner of the chunks
+        shards: Shard count (default: settings.VECTOR_STORE_SHARDS)
+    """
+    shards = shards or settings.VECTOR_STORE_SHARDS
+    return int.from_bytes(hashlib.sha1(username.encode("utf-8")).digest()[:8], "big") % shards
+
+def get_shard_collection_name(shard: int, shards: Optional[int] = None, model_name: Optional[str] = None) -> str:
     """
-    global _collection
+    Collection name of one tenant shard.
     
-    if _collection is None:
-        client = get_chroma_client()
-        
-        # Get or create collection
-        _collection = client.get_or_create_collection(
-            name=COLLECTION_NAME,
-            metadata={"description": "Manifestation text chunks for RAG translation"}
+    A single shard keeps the unsharded name; otherwise the shard count is part
+    of the name, so changing VECTOR_STORE_SHARDS never reads a stale layout
+    (run `python -m app.vector_store_migrate` to move existing chunks).
+    """
+    shards = shards or settings.VECTOR_STORE_SHARDS
+    name = get_collection_name(model_name)
+    if shards <= 1:
+        return name
+    return f"{name}_shard{shard:02d}of{shards:02d}"
+
+def open_collection(name: str, backend: Optional[str] = None):
+    """
+    Open (or create) a collection by name, bypassing the singleton cache.
+    
+    Args:
+        name: Collection name
+        backend: Key of VECTOR_STORE_BACKENDS (default: settings.VECTOR_STORE_BACKEND)
+    
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = backend or settings.VECTOR_STORE_BACKEND
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(
+            f"Unknown vector store backend: {backend}. "
+            f"Supported: {', '.join(VECTOR_STORE_BACKENDS.keys())}"
         )
-        
-        logger.info(f"Collection '{COLLECTION_NAME}' ready. Current count: {_collection.count()}")
+    return VECTOR_STORE_BACKENDS[backend](
+        name,
+        {
+            "description": "Manifestation text chunks for RAG translation",
+            "embedding_model": settings.EMBEDDING_MODEL
+        }
+    )
+
+def drop_collection(name: str, backend: Optional[str] = None) -> None:
+    """
+    Delete a collection and its stored data (no-op if it does not exist).
     
-    return _collection
+    Args:
+        name: Collection name
+        backend: Key of VECTOR_STORE_BACKENDS (default: settings.VECTOR_STORE_BACKEND)
+    """
+    backend = backend or settings.VECTOR_STORE_BACKEND
+    with _init_lock:
+        if backend == settings.VECTOR_STORE_BACKEND:
+            _collections.pop(name, None)
+        if backend == "memory":
+            shutil.rmtree(os.path.join(settings.VECTOR_STORE_MEMORY_PATH, name), ignore_errors=True)
+        else:
+            try:
+                get_chroma_client().delete_collection(name)
+            except (ValueError, _ChromaNotFound):
+                pass
+    logger.info(f"Dropped collection '{name}' ({backend})")
+
+def _get_shard_collection(shard: int):
+    name = get_shard_collection_name(shard)
+    collection = _collections.get(name)
+    if collection is None:
+        with _init_lock:
+            collection = _collections.get(name)
+            if collection is None:
+                collection = open_collection(name)
+                _collections[name] = collection
+                logger.info(
+                    f"Collection '{name}' ({settings.VECTOR_STORE_BACKEND}) ready. "
+                    f"Current count: {collection.count()}"
+                )
+    return collection
+
+def get_collection(username: Optional[str] = None):
+    """
+    Get or create the manifestation chunks collection holding a user's chunks.
+    
+    Args:
+        username: Owner whose tenant shard to return; may be omitted when
+                  VECTOR_STORE_SHARDS is 1
+    
+    Returns:
+        chromadb.Collection (or a MemoryVectorStore with the same API): Collection for storing chunks
+    
+    Raises:
+        ValueError: If VECTOR_STORE_BACKEND is unknown, or no username is
+                    given while the store is sharded (use get_collections())
+    """
+    shards = settings.VECTOR_STORE_SHARDS
+    if shards <= 1:
+        return _get_shard_collection(0)
+    if username is None:
+        raise ValueError(
+            f"The vector store is split into {shards} shards; pass a username or use get_collections()"
+        )
+    return _get_shard_collection(get_shard(username, shards))
+
+def get_collections() -> List:
+    """
+    Get every tenant shard collection (one entry when unsharded).
+    
+    Returns:
+        List of collections, in shard order
+    """
+    return [_get_shard_collection(shard) for shard in range(max(settings.VECTOR_STORE_SHARDS, 1))]
+
+def as_matrix(embeddings: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+    """Stack embeddings into one contiguous float32 (n, dim) array (no copy if already one)."""
+    if isinstance(embeddings, np.ndarray):
+        return np.ascontiguousarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+    return np.asarray([np.asarray(e, dtype=np.float32) for e in embeddings], dtype=np.float32)
+
+def chunk_id(username: str, text: str) -> str:
+    """
+    Content-addressed chunk ID: the same user storing the same text always
+    maps to the same record, whatever the session or request.
+    """
+    return hashlib.sha256(f"{username}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+def _merge_metadata(existing: Optional[Dict], update: Dict) -> Dict:
+    """Overlay `update` on a stored record, keeping its translations and first-seen time."""
+    existing = existing or {}
+    merged = {**existing, **update}
+    merged["first_seen"] = existing.get("first_seen", existing.get("timestamp", update["timestamp"]))
+    return merged
 
 def store_chunks(
     chunks: List[str],
-    embeddings: List[List[float]],
+    embeddings: Union[List[List[float]], np.ndarray],
     username: str,
     session_id: str,
-    translations: Optional[Dict[str, str]] = None
-) -> None:
+    translations: Optional[Dict[str, List[str]]] = None
+) -> int:
     """
-    Store text chunks with their embeddings in ChromaDB.
+    Upsert text chunks with their embeddings into ChromaDB.
+    
+    Records are keyed by `chunk_id(username, text)`, so repeated text
+    updates its existing record instead of adding a new one. Translations
+    already stored on a record are kept; new ones are added or replaced.
     
     Args:
         chunks: List of text chunks
-        embeddings: List of embedding vectors (one per chunk)
+        embeddings: Embedding vectors (one per chunk), as lists or a float32 matrix
         username: Username for identification
-        session_id: Unique session identifier (timestamp)
+        session_id: Identifier of the request storing the chunks (last writer wins)
         translations: Optional dict mapping language codes to translation collections
                      e.g., {'ta': ['chunk1_tamil', 'chunk2_tamil'], 'hi': [...]}
-    """
-    collection = get_collection()
     
-    # Prepare data for ChromaDB
-    ids = []
-    metadatas = []
+    Returns:
+        int: Number of unique chunks written
+    """
+    collection = get_collection(username)
+    matrix = as_matrix(embeddings)
     
+    # One record per unique text; the last occurrence decides position/translation
+    rows: Dict[str, int] = {}
     for i, chunk in enumerate(chunks):
-        chunk_id = f"{username}_{session_id}_chunk_{i}"
-        ids.append(chunk_id)
-        
+        rows[chunk_id(username, chunk)] = i
+    ids = list(rows.keys())
+    
+    # The username filter is redundant for Chroma (IDs include it) but lets
+    # the memory backend read a single partition
+    existing = collection.get(ids=ids, where={"username": username}, include=["metadatas"])
+    stored = dict(zip(existing["ids"], existing["metadatas"]))
+    
+    now = datetime.now().isoformat()
+    metadatas = []
+    for record_id, i in rows.items():
         metadata = {
             "username": username,
             "session_id": session_id,
             "position": i,
-            "chunk_text": chunk,  # Store original text in metadata for retrieval
-            "timestamp": datetime.now().isoformat()
+            "chunk_text": chunks[i],  # Store original text in metadata for retrieval
+            "timestamp": now
         }
         
         # Add translations to metadata if provided
@@ -110,20 +309,23 @@ def store_chunks(
                 if i < len(lang_chunks):
                     metadata[f"translation_{lang_code}"] = lang_chunks[i]
         
-        metadatas.append(metadata)
+        metadatas.append(_merge_metadata(stored.get(record_id), metadata))
     
-    # Add to collection
-    collection.add(
+    collection.upsert(
         ids=ids,
-        embeddings=embeddings,
-        documents=chunks,  # Store as documents too
+        embeddings=matrix[list(rows.values())],
+        documents=[chunks[i] for i in rows.values()],  # Store as documents too
         metadatas=metadatas
     )
     
-    logger.info(f"Stored {len(chunks)} chunks for user '{username}' (session: {session_id})")
+    logger.info(
+        f"Upserted {len(ids)} chunks for user '{username}' "
+        f"({len(ids) - len(stored)} new, session: {session_id})"
+    )
+    return len(ids)
 
 def retrieve_similar_chunks(
-    query_embedding: List[float],
+    query_embedding: Union[List[float], np.ndarray],
     top_k: int = 3,
     username: Optional[str] = None
 ) -> List[Dict]:
@@ -131,38 +333,68 @@ def retrieve_similar_chunks(
     Retrieve similar chunks based on embedding similarity.
     
     Args:
-        query_embedding: Embedding vector of the query chunk
+        query_embedding: Embedding vector of the query chunk (list or 1-D array)
         top_k: Number of similar chunks to retrieve
         username: Optional username filter (retrieve only from this user's chunks)
         
     Returns:
         List of dicts containing chunk text, metadata, and similarity distance
     """
-    collection = get_collection()
+    return retrieve_similar_chunks_batch([query_embedding], top_k=top_k, username=username)[0]
+
+def retrieve_similar_chunks_batch(
+    query_embeddings: Union[List[List[float]], np.ndarray],
+    top_k: int = 3,
+    username: Optional[str] = None
+) -> List[List[Dict]]:
+    """
+    Retrieve similar chunks for several query embeddings in one collection query.
+    
+    Args:
+        query_embeddings: Query vectors, as lists or a (n, dim) float32 matrix
+        top_k: Number of similar chunks to retrieve per query
+        username: Optional username filter (retrieve only from this user's chunks)
+        
+    Returns:
+        One list of result dicts (text, metadata, distance) per query, in query order
+    """
+    if len(query_embeddings) == 0:
+        return []
+    
+    # A user's chunks live in one shard; an unfiltered query fans out to all of them
+    collections = [get_collection(username)] if username else get_collections()
     
     # Build where filter if username is provided
     where = {"username": username} if username else None
+    matrix = as_matrix(query_embeddings)
     
-    # Query similar chunks
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        where=where,
-        include=["documents", "metadatas", "distances"]
-    )
+    batches: List[List[Dict]] = [[] for _ in range(len(matrix))]
+    for collection in collections:
+        # Query similar chunks for all queries at once
+        results = collection.query(
+            query_embeddings=matrix,
+            n_results=top_k,
+            where=where,
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        # Format results (Chroma returns nothing at all for an empty collection)
+        for batch, documents, metadatas, distances in zip(
+            batches, results['documents'] or [], results['metadatas'] or [], results['distances'] or []
+        ):
+            batch.extend(
+                {'text': text, 'metadata': metadata, 'distance': distance}
+                for text, metadata, distance in zip(documents, metadatas, distances)
+            )
     
-    # Format results
-    similar_chunks = []
-    if results['documents'] and len(results['documents'][0]) > 0:
-        for i in range(len(results['documents'][0])):
-            similar_chunks.append({
-                'text': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i]
-            })
+    if len(collections) > 1:
+        batches = [sorted(batch, key=lambda result: result['distance'])[:top_k] for batch in batches]
     
-    logger.info(f"Retrieved {len(similar_chunks)} similar chunks (top_k={top_k})")
-    return similar_chunks
+    logger.info(
+        f"Retrieved {sum(len(batch) for batch in batches)} similar chunks "
+        f"for {len(batches)} queries (top_k={top_k})"
+    )
+    return batches
 
 def clear_user_chunks(username: str) -> int:
     """
@@ -174,7 +406,7 @@ def clear_user_chunks(username: str) -> int:
     Returns:
         int: Number of chunks deleted
     """
-    collection = get_collection()
+    collection = get_collection(username)
     
     # Get all IDs for this user
     results = collection.get(
@@ -197,10 +429,15 @@ def get_collection_stats() -> Dict:
     Returns:
         Dict with collection statistics
     """
-    collection = get_collection()
+    collections = get_collections()
+    counts = [collection.count() for collection in collections]
     
     return {
-        "name": COLLECTION_NAME,
-        "total_chunks": collection.count(),
-        "persist_directory": os.path.join(os.getcwd(), "chroma_db")
+        "name": get_collection_name(),
+        "backend": settings.VECTOR_STORE_BACKEND,
+        "embedding_model": settings.EMBEDDING_MODEL,
+        "shards": len(collections),
+        "chunks_per_shard": counts,
+        "total_chunks": sum(counts),
+        "persist_directory": get_persist_directory()
     }
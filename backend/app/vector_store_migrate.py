@@ -0,0 +1,150 @@
+"""
+Command-line tool that moves stored chunks into a new vector store layout.
+
+Usage (from the backend directory):
+    python -m app.vector_store_migrate --from-shards 1 --to-shards 8
+    python -m app.vector_store_migrate --from-backend chroma --to-backend memory
+    python -m app.vector_store_migrate --from-shards 1 --to-shards 8 --delete-source
+
+Copies every record (id, embedding, document, metadata) of the source
+layout into the tenant shard its username maps to in the target layout,
+page by page. Records are upserted by their content-addressed IDs, so an
+interrupted run can simply be repeated. Source collections are only
+dropped with --delete-source, after everything was copied. Set
+VECTOR_STORE_SHARDS / VECTOR_STORE_BACKEND to the target layout before
+restarting the API.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import Dict, Optional
+
+from .config import settings
+from .vector_store import drop_collection, get_shard, get_shard_collection_name, open_collection
+
+logger = logging.getLogger(__name__)
+
+
+def migrate(
+    from_shards: int,
+    to_shards: int,
+    from_backend: Optional[str] = None,
+    to_backend: Optional[str] = None,
+    batch_size: int = 500,
+    delete_source: bool = False
+) -> Dict:
+    """
+    Copy all chunks from one shard layout/backend to another.
+
+    Args:
+        from_shards: Shard count of the existing layout
+        to_shards: Shard count of the new layout
+        from_backend: Backend holding the existing data (default: VECTOR_STORE_BACKEND)
+        to_backend: Backend to write to (default: VECTOR_STORE_BACKEND)
+        batch_size: Records read and written per call
+        delete_source: Drop the source collections once everything is copied
+
+    Returns:
+        Dict with records copied per source and target collection
+
+    Raises:
+        ValueError: If source and target are the same layout
+    """
+    from_backend = from_backend or settings.VECTOR_STORE_BACKEND
+    to_backend = to_backend or settings.VECTOR_STORE_BACKEND
+    sources = [get_shard_collection_name(shard, from_shards) for shard in range(from_shards)]
+    targets = [get_shard_collection_name(shard, to_shards) for shard in range(to_shards)]
+    if from_backend == to_backend and sources == targets:
+        raise ValueError("Source and target layouts are identical; nothing to migrate")
+
+    opened = {}
+
+    def target_for(username: str):
+        name = targets[get_shard(username, to_shards)]
+        if name not in opened:
+            opened[name] = open_collection(name, to_backend)
+        return name, opened[name]
+
+    copied = {name: 0 for name in targets}
+    read = {}
+    for source_name in sources:
+        source = open_collection(source_name, from_backend)
+        read[source_name] = 0
+        offset = 0
+        while True:
+            page = source.get(
+                limit=batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not page["ids"]:
+                break
+            offset += len(page["ids"])
+            read[source_name] += len(page["ids"])
+
+            grouped: Dict[str, list] = {}
+            for i, metadata in enumerate(page["metadatas"]):
+                grouped.setdefault((metadata or {}).get("username", ""), []).append(i)
+
+            for username, rows in grouped.items():
+                name, target = target_for(username)
+                target.upsert(
+                    ids=[page["ids"][i] for i in rows],
+                    embeddings=[page["embeddings"][i] for i in rows],
+                    documents=[page["documents"][i] for i in rows],
+                    metadatas=[page["metadatas"][i] for i in rows]
+                )
+                copied[name] += len(rows)
+
+        logger.info(f"Copied {read[source_name]} chunks out of '{source_name}' ({from_backend})")
+
+    if delete_source:
+        for source_name in sources:
+            # A target with the same name on the same backend now holds live data
+            if from_backend == to_backend and source_name in targets:
+                continue
+            drop_collection(source_name, from_backend)
+
+    return {
+        "from": {"backend": from_backend, "shards": from_shards, "chunks": read},
+        "to": {"backend": to_backend, "shards": to_shards, "chunks": copied},
+        "total_chunks": sum(read.values()),
+        "deleted_source": delete_source
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Move stored chunks into a new shard layout or backend.")
+    parser.add_argument("--from-shards", type=int, default=1, help="Shard count of the existing data (default: 1)")
+    parser.add_argument("--to-shards", type=int, default=settings.VECTOR_STORE_SHARDS,
+                        help="Target shard count (default: VECTOR_STORE_SHARDS)")
+    parser.add_argument("--from-backend", default=settings.VECTOR_STORE_BACKEND,
+                        help="Backend holding the existing data (default: VECTOR_STORE_BACKEND)")
+    parser.add_argument("--to-backend", default=settings.VECTOR_STORE_BACKEND,
+                        help="Target backend (default: VECTOR_STORE_BACKEND)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--delete-source", action="store_true", help="Drop the source collections afterwards")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    try:
+        result = migrate(
+            args.from_shards,
+            args.to_shards,
+            from_backend=args.from_backend,
+            to_backend=args.to_backend,
+            batch_size=args.batch_size,
+            delete_source=args.delete_source
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
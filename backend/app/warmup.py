@@ -0,0 +1,120 @@
+"""
+Startup warmup and readiness state.
+Loads the embedding model, sentence tokenizer, token counter and vector
+store once per worker before it is reported ready, so no request pays
+cold-start cost.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_TEXT = "Warmup sentence. நான் அமைதியாக இருக்கிறேன்। मैं शांत हूँ।"
+
+_lock = threading.Lock()
+_state: Dict = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "error": None,
+    "steps": {}
+}
+
+
+def _warm_embedding_model() -> None:
+    from .embeddings import encode_texts, get_embedding_model, get_embedding_server_info
+
+    if get_embedding_server_info() is not None:
+        # The shared embedding server owns the (already warm) model
+        return
+
+    get_embedding_model()
+    # Dummy encode: first forward pass allocates buffers / builds kernels
+    encode_texts([_WARMUP_TEXT])
+
+
+def _warm_tokenizer() -> None:
+    from .chunker import chunk_text
+    from .segmentation import get_sentence_tokenizer
+
+    # The warmup text takes the Indic fast path; load the Punkt model explicitly
+    get_sentence_tokenizer()
+    chunk_text(_WARMUP_TEXT)
+
+
+def _warm_vector_store() -> None:
+    from .vector_store import get_collections
+
+    get_collections()
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("embedding_model", _warm_embedding_model),
+    ("tokenizer", _warm_tokenizer),
+    ("vector_store", _warm_vector_store),
+]
+
+
+def run_warmup() -> bool:
+    """
+    Run all warmup steps once; later calls return the first result.
+
+    Steps that fail are recorded and the worker stays not-ready, since a
+    request would hit the same failure.
+
+    Returns:
+        True if every step succeeded
+    """
+    with _lock:
+        if _state["finished_at"] is not None:
+            return _state["ready"]
+
+        _state["started_at"] = time.time()
+        failed: Optional[str] = None
+
+        for name, step in WARMUP_STEPS:
+            started = time.perf_counter()
+            try:
+                step()
+                _state["steps"][name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3)}
+            except Exception as e:
+                logger.error(f"Warmup step '{name}' failed: {e}")
+                _state["steps"][name] = {"ok": False, "seconds": round(time.perf_counter() - started, 3), "error": str(e)}
+                failed = failed or name
+
+        _state["finished_at"] = time.time()
+        _state["ready"] = failed is None
+        _state["error"] = f"warmup step '{failed}' failed" if failed else None
+
+        total = _state["finished_at"] - _state["started_at"]
+        if _state["ready"]:
+            logger.info(f"Warmup complete in {total:.1f}s; worker is ready")
+        else:
+            logger.error(f"Warmup finished with errors after {total:.1f}s; worker stays not-ready")
+
+        return _state["ready"]
+
+
+def is_ready() -> bool:
+    """Whether warmup has finished successfully."""
+    return _state["ready"]
+
+
+def get_readiness() -> Dict:
+    """
+    Snapshot of the warmup state for the readiness endpoint.
+
+    Returns:
+        Dict with ready flag, per-step timings and any error
+    """
+    return {
+        "ready": _state["ready"],
+        "warming_up": _state["started_at"] is not None and _state["finished_at"] is None,
+        "started_at": _state["started_at"],
+        "finished_at": _state["finished_at"],
+        "error": _state["error"],
+        "steps": dict(_state["steps"])
+    }
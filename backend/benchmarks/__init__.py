@@ -0,0 +1,4 @@
+"""
+Offline performance benchmarks for the backend.
+Run from the backend directory, e.g. `python -m benchmarks.embedding_backends`.
+"""
@@ -0,0 +1,60 @@
+"""
+Synthetic manifestation-style sentences in English, Tamil and Hindi.
+Deterministic for a given seed so benchmark runs are comparable.
+"""
+
+import random
+from typing import List
+
+NAMES = ["Priya", "Arjun", "Kavya", "Rahul", "Meena", "Vikram", "Ananya", "Karthik"]
+
+ENGLISH = [
+    "{name}, you are calm, focused and ready for every opportunity that comes your way.",
+    "Every day you grow stronger as a {role}, and your work inspires the people around you.",
+    "You welcome abundance, health and peace into your life with an open heart.",
+    "Your goal of becoming a {role} is already unfolding, one confident step at a time.",
+    "You trust yourself, {name}, and you finish what you begin with patience and joy.",
+    "Success flows to you naturally because you show up with kindness and discipline.",
+]
+
+TAMIL = [
+    "{name}, நீ அமைதியாகவும் கவனமாகவும் இருக்கிறாய், ஒவ்வொரு வாய்ப்புக்கும் தயாராக இருக்கிறாய்.",
+    "ஒவ்வொரு நாளும் நீ ஒரு {role} ஆக வலுவாக வளர்கிறாய்.",
+    "நீ உன் வாழ்க்கையில் செழிப்பையும் அமைதியையும் திறந்த மனதுடன் வரவேற்கிறாய்.",
+    "{name}, நீ உன்னை நம்புகிறாய், தொடங்கியதை பொறுமையுடன் முடிக்கிறாய்.",
+]
+
+HINDI = [
+    "{name}, तुम शांत और केंद्रित हो, और हर अवसर के लिए तैयार हो।",
+    "हर दिन तुम एक {role} के रूप में और मज़बूत होते जा रहे हो।",
+    "तुम अपने जीवन में समृद्धि और शांति का खुले दिल से स्वागत करते हो।",
+    "{name}, तुम खुद पर भरोसा करते हो और जो शुरू करते हो उसे धैर्य से पूरा करते हो।",
+]
+
+ROLES = ["Software Engineer", "Backend Developer", "Technical Lead", "teacher", "designer", "founder"]
+
+TEMPLATES = {"en": ENGLISH, "ta": TAMIL, "hi": HINDI}
+
+
+def sample_sentences(count: int, seed: int = 0, languages=("en", "ta", "hi")) -> List[str]:
+    """Return `count` filled-in sentences, cycling through `languages`."""
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(count):
+        template = rng.choice(TEMPLATES[languages[i % len(languages)]])
+        sentences.append(template.format(name=rng.choice(NAMES), role=rng.choice(ROLES)))
+    return sentences
+
+
+def sample_chunks(count: int, seed: int = 0, sentences_per_chunk: int = 3, languages=("en", "ta", "hi")) -> List[str]:
+    """Return `count` chunks of a few sentences each, tagged with a unique suffix."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(count):
+        language = languages[i % len(languages)]
+        sentences = [
+            rng.choice(TEMPLATES[language]).format(name=rng.choice(NAMES), role=rng.choice(ROLES))
+            for _ in range(sentences_per_chunk)
+        ]
+        chunks.append(" ".join(sentences) + f" ({i})")
+    return chunks
@@ -0,0 +1,138 @@
+"""
+Compare embedding backends (PyTorch vs int8 ONNX Runtime) on CPU.
+
+Each backend runs in its own subprocess so peak RSS is measured per
+backend. Reports load time, encode throughput per batch size, peak RSS
+and cosine-similarity parity of every candidate against the reference.
+A backend that fails to load or crashes (or exceeds --timeout) is reported
+with its error and makes the run exit non-zero.
+
+onnx-int8 needs the optional ONNX Runtime dependencies:
+    pip install 'sentence-transformers[onnx]'
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backends torch onnx-int8 --texts 512 --min-cosine 0.98
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import queue as queue_module
+import resource
+import sys
+import time
+import traceback
+from typing import Dict, List
+
+import numpy as np
+
+from .corpus import sample_sentences
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def _run_backend(backend: str, texts: List[str], batch_sizes: List[int], repeats: int, queue) -> None:
+    try:
+        queue.put(_measure_backend(backend, texts, batch_sizes, repeats))
+    except BaseException as e:
+        traceback.print_exc()
+        queue.put({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+
+
+def _measure_backend(backend: str, texts: List[str], batch_sizes: List[int], repeats: int) -> Dict:
+    from app.embeddings import load_embedding_model
+
+    started = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_seconds = time.perf_counter() - started
+    model.encode(texts[:8], show_progress_bar=False)  # warm up
+
+    throughput = {}
+    for batch_size in batch_sizes:
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+            best = min(best, time.perf_counter() - started)
+        throughput[batch_size] = round(len(texts) / best, 1)
+
+    embeddings = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "texts_per_second": throughput,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "embeddings": embeddings.astype(np.float32)
+    }
+
+
+def run(backends: List[str], texts: List[str], batch_sizes: List[int], repeats: int, timeout: float) -> List[Dict]:
+    ctx = mp.get_context("spawn")
+    results = []
+    for backend in backends:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_backend, args=(backend, texts, batch_sizes, repeats, queue))
+        process.start()
+        # Poll so a child that dies without reporting (segfault, OOM kill) is noticed at once
+        deadline = time.monotonic() + timeout
+        result = None
+        while result is None:
+            try:
+                result = queue.get(timeout=1.0)
+            except queue_module.Empty:
+                if not process.is_alive():
+                    result = {"backend": backend, "error": f"process exited with code {process.exitcode}"}
+                elif time.monotonic() > deadline:
+                    process.terminate()
+                    result = {"backend": backend, "error": f"timed out after {timeout:.0f}s"}
+        process.join(timeout=30)
+        if "error" not in result and process.exitcode not in (0, None):
+            result = {"backend": backend, "error": f"process exited with code {process.exitcode}"}
+        if "error" in result:
+            print(f"{backend}: {result['error']}", file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-int8"],
+                        help="Backends to compare; the first one is the parity reference")
+    parser.add_argument("--texts", type=int, default=256, help="Number of sample sentences")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.98,
+                        help="Fail if any candidate's mean cosine vs the reference is below this")
+    parser.add_argument("--timeout", type=float, default=1800,
+                        help="Seconds a backend may take (model download, export, encoding)")
+    args = parser.parse_args(argv)
+
+    from app.embeddings import cosine_parity
+
+    texts = sample_sentences(args.texts)
+    results = run(args.backends, texts, args.batch_sizes, args.repeats, args.timeout)
+
+    reference = results[0].get("embeddings")
+    failed = False
+    for result in results:
+        if "error" in result:
+            failed = True
+            continue
+        embeddings = result.pop("embeddings")
+        if result is not results[0] and reference is not None:
+            result["parity_vs_" + results[0]["backend"]] = {
+                k: round(v, 4) for k, v in cosine_parity(reference, embeddings).items()
+            }
+            failed |= result["parity_vs_" + results[0]["backend"]]["mean"] < args.min_cosine
+
+    print(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Compare candidate embedding models on latency, memory and retrieval quality.
+
+Each model runs in its own subprocess so peak RSS is measured per model.
+Retrieval is scored against the stored translation memory (the Chroma
+collection of the configured EMBEDDING_MODEL): every candidate re-embeds
+the stored English chunks and is asked to find, by exact cosine search,
+
+  - cross_lingual: the English chunk for each stored translation
+    (translation_<lang> metadata) - what RAG context retrieval relies on
+  - prefix: the full chunk for its first ~60% of words
+
+hit@k is the fraction of queries whose source chunk is in the top k.
+
+Usage (from the backend directory):
+    python -m benchmarks.embedding_models
+    python -m benchmarks.embedding_models --models \\
+        sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2 \\
+        intfloat/multilingual-e5-small --max-chunks 1000 --top-k 1 2 5
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .embedding_backends import _peak_rss_mb
+
+DEFAULT_MODELS = [
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+    "sentence-transformers/distiluse-base-multilingual-cased-v2",
+    "intfloat/multilingual-e5-small",
+]
+
+
+def load_translation_memory(max_chunks: int) -> Tuple[List[str], Dict[str, List[Tuple[str, int]]]]:
+    """
+    Read stored chunks and build labelled queries from them.
+
+    Returns:
+        (unique English chunks, {query_set: [(query_text, chunk_index), ...]})
+    """
+    from app.vector_store import get_collections
+
+    documents, metadatas = [], []
+    for collection in get_collections():
+        if len(documents) >= max_chunks:
+            break
+        stored = collection.get(limit=max_chunks - len(documents), include=["documents", "metadatas"])
+        documents.extend(stored["documents"])
+        metadatas.extend(stored["metadatas"])
+
+    chunks: List[str] = []
+    position: Dict[str, int] = {}
+    translation_pairs = set()
+    for document, metadata in zip(documents, metadatas):
+        if not document:
+            continue
+        if document not in position:
+            position[document] = len(chunks)
+            chunks.append(document)
+        for field, value in (metadata or {}).items():
+            if field.startswith("translation_") and value:
+                translation_pairs.add((value, position[document]))
+
+    prefix = []
+    for i, chunk in enumerate(chunks):
+        words = chunk.split()
+        if len(words) >= 8:
+            prefix.append((" ".join(words[:int(len(words) * 0.6)]), i))
+
+    return chunks, {"cross_lingual": sorted(translation_pairs), "prefix": prefix}
+
+
+def _hit_rates(corpus: np.ndarray, queries: np.ndarray, targets: np.ndarray, top_k: List[int]) -> Dict[str, float]:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    # Rank of the correct chunk = number of chunks scoring strictly higher
+    ranks = (scores > scores[np.arange(len(targets)), targets][:, None]).sum(axis=1)
+    return {f"hit@{k}": round(float((ranks < k).mean()), 4) for k in top_k}
+
+
+def _run_model(model_name: str, backend: str, chunks: List[str], query_sets, top_k: List[int], queue) -> None:
+    from app.embeddings import load_embedding_model
+
+    started = time.perf_counter()
+    model = load_embedding_model(backend, model_name)
+    load_seconds = time.perf_counter() - started
+    model.encode(chunks[:8], show_progress_bar=False)  # warm up
+
+    # Single-text latency, as seen by one request on a cold cache
+    latencies = []
+    for text in chunks[:64]:
+        started = time.perf_counter()
+        model.encode([text], show_progress_bar=False)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    corpus = model.encode(chunks, batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+    batch_seconds = time.perf_counter() - started
+
+    retrieval = {}
+    for name, pairs in query_sets.items():
+        if not pairs:
+            continue
+        queries = model.encode([text for text, _ in pairs], batch_size=32, convert_to_numpy=True, show_progress_bar=False)
+        targets = np.array([target for _, target in pairs])
+        retrieval[name] = {"queries": len(pairs), **_hit_rates(corpus, queries, targets, top_k)}
+
+    queue.put({
+        "model": model_name,
+        "backend": backend,
+        "dimension": int(corpus.shape[1]),
+        "load_seconds": round(load_seconds, 2),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 2),
+        "batch_texts_per_second": round(len(chunks) / batch_seconds, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "retrieval": retrieval
+    })
+
+
+def run(models: List[str], backend: str, chunks: List[str], query_sets, top_k: List[int]) -> List[Dict]:
+    ctx = mp.get_context("spawn")
+    results = []
+    for model_name in models:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_model, args=(model_name, backend, chunks, query_sets, top_k, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models", nargs="+", default=DEFAULT_MODELS, help="Model names or paths to compare")
+    parser.add_argument("--backend", default="torch", help="Embedding backend used for every model")
+    parser.add_argument("--max-chunks", type=int, default=2000, help="Stored chunks to read from the translation memory")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 2, 5])
+    args = parser.parse_args(argv)
+
+    chunks, query_sets = load_translation_memory(args.max_chunks)
+    if len(chunks) < 2:
+        print("Translation memory is empty; translate a few passages first.", file=sys.stderr)
+        return 1
+    print(
+        f"Translation memory: {len(chunks)} chunks, "
+        + ", ".join(f"{len(pairs)} {name} queries" for name, pairs in query_sets.items()),
+        file=sys.stderr
+    )
+
+    results = run(args.models, args.backend, chunks, query_sets, args.top_k)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Microbenchmark sentence segmentation: app.segmentation.split_sentences
+versus the previous `nltk.sent_tokenize` call (and NLTK's untrained Punkt
+tokenizer, the offline fallback).
+
+Passages are built from the synthetic corpus per language, so the true
+sentence count is known. Reports per-call cost (best of --repeats, µs)
+and how many passages were split into exactly the right number of
+sentences. `nltk.sent_tokenize` needs the punkt data; without it that
+candidate is reported as unavailable.
+
+Usage (from the backend directory):
+    python -m benchmarks.segmentation
+    python -m benchmarks.segmentation --passages 500 --sentences 12 --repeats 5
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+from .corpus import sample_sentences
+
+
+def _nltk_sent_tokenize(text: str) -> List[str]:
+    import nltk
+
+    return nltk.sent_tokenize(text)
+
+
+_untrained = None
+
+
+def _untrained_punkt(text: str) -> List[str]:
+    global _untrained
+    if _untrained is None:
+        from nltk.tokenize.punkt import PunktSentenceTokenizer
+        _untrained = PunktSentenceTokenizer()
+    return _untrained.tokenize(text)
+
+
+def _split_sentences(text: str) -> List[str]:
+    from app.segmentation import split_sentences
+
+    return split_sentences(text)
+
+
+CANDIDATES: Dict[str, Callable[[str], List[str]]] = {
+    "nltk.sent_tokenize": _nltk_sent_tokenize,
+    "punkt_untrained": _untrained_punkt,
+    "split_sentences": _split_sentences,
+}
+
+
+def passages(language: str, count: int, sentences: int) -> List[str]:
+    return [
+        " ".join(sample_sentences(sentences, seed=seed, languages=(language,)))
+        for seed in range(count)
+    ]
+
+
+def measure(candidate: Callable[[str], List[str]], texts: List[str], sentences: int, repeats: int) -> Dict:
+    try:
+        started = time.perf_counter()
+        candidate(texts[0])
+        first_call_ms = (time.perf_counter() - started) * 1000
+    except LookupError as e:
+        message = next((line.strip() for line in str(e).splitlines() if "Resource" in line), str(e))
+        return {"available": False, "error": message}
+
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in texts:
+            candidate(text)
+        best = min(best, time.perf_counter() - started)
+
+    exact = sum(len(candidate(text)) == sentences for text in texts)
+    return {
+        "available": True,
+        "first_call_ms": round(first_call_ms, 2),
+        "per_call_us": round(best / len(texts) * 1e6, 1),
+        "exact_sentence_count": round(exact / len(texts), 4),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", nargs="+", default=["en", "ta", "hi"])
+    parser.add_argument("--passages", type=int, default=200, help="Passages per language")
+    parser.add_argument("--sentences", type=int, default=8, help="Sentences per passage")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = []
+    for language in args.languages:
+        texts = passages(language, args.passages, args.sentences)
+        for name, candidate in CANDIDATES.items():
+            results.append({
+                "language": language,
+                "candidate": name,
+                **measure(candidate, texts, args.sentences, args.repeats)
+            })
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
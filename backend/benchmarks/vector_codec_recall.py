@@ -0,0 +1,141 @@
+"""
+Measure retrieval recall loss of the compact vector codecs.
+
+Ranks a held-out set of query vectors against the rest by squared L2
+distance (the metric `retrieve_similar_chunks` gets from Chroma), once with
+float32 vectors as ground truth and once per codec in three settings:
+
+  - query: the query went through the codec (an encoded embedding cache
+    feeding `retrieve_similar_chunks` against Chroma's float32 index)
+  - index: the stored vectors went through the codec (an in-house index)
+  - both:  query and index encoded
+
+recall@k is the mean overlap of the top-k with the float32 top-k.
+
+Vectors come from the stored translation memory by default, or are
+generated from the synthetic corpus with the configured model, or (fully
+offline, no model) are the clustered unit vectors of the vector store
+benchmark.
+
+Usage (from the backend directory):
+    python -m benchmarks.vector_codec_recall
+    python -m benchmarks.vector_codec_recall --synthetic 2000 --top-k 2 5 10
+    python -m benchmarks.vector_codec_recall --clustered 20000 --dim 384
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+import numpy as np
+
+from app.vector_codec import CODECS
+
+
+def stored_vectors(limit: int) -> np.ndarray:
+    from app.vector_store import get_collections
+
+    parts = []
+    for collection in get_collections():
+        remaining = limit - sum(len(part) for part in parts)
+        if remaining <= 0:
+            break
+        embeddings = collection.get(limit=remaining, include=["embeddings"])["embeddings"]
+        if embeddings is not None and len(embeddings):
+            parts.append(np.asarray(embeddings, dtype=np.float32))
+    if not parts:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.concatenate(parts)
+
+
+def synthetic_vectors(count: int) -> np.ndarray:
+    from app.embeddings import get_embeddings_batch
+    from .corpus import sample_chunks
+
+    return get_embeddings_batch(sample_chunks(count, seed=7), use_cache=False, as_numpy=True)
+
+
+def clustered_vectors(count: int, dim: int) -> np.ndarray:
+    from .vector_stores import synthetic_corpus
+
+    return synthetic_corpus(count, dim)[1]
+
+
+def _top_k(queries: np.ndarray, index: np.ndarray, k: int) -> np.ndarray:
+    # ||q - x||^2 = ||q||^2 - 2 q.x + ||x||^2; ||q||^2 does not change the ranking
+    distances = (index * index).sum(axis=1)[None, :] - 2 * queries @ index.T
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, top, axis=1).argsort(axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth.tolist(), found.tolist())]))
+
+
+def measure(vectors: np.ndarray, query_count: int, top_k: List[int]) -> List[Dict]:
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(vectors))
+    queries, index = vectors[order[:query_count]], vectors[order[query_count:]]
+    max_k = min(max(top_k), len(index))
+    truth = _top_k(queries, index, max_k)
+
+    results = []
+    for name, codec in CODECS.items():
+        encoded_queries = codec.roundtrip(queries)
+        encoded_index = codec.roundtrip(index)
+        cosine = (encoded_index * index).sum(axis=1) / (
+            np.linalg.norm(encoded_index, axis=1) * np.linalg.norm(index, axis=1)
+        )
+
+        report = {
+            "codec": name,
+            "bytes_per_vector": codec.nbytes(vectors.shape[1]),
+            "compression_vs_float32": round(vectors.shape[1] * 4 / codec.nbytes(vectors.shape[1]), 2),
+            "min_roundtrip_cosine": round(float(cosine.min()), 6),
+        }
+        for setting, q, x in (
+            ("query", encoded_queries, index),
+            ("index", queries, encoded_index),
+            ("both", encoded_queries, encoded_index),
+        ):
+            found = _top_k(q, x, max_k)
+            report[setting] = {
+                f"recall@{k}": round(_recall(truth[:, :k], found[:, :k]), 4) for k in top_k if k <= max_k
+            }
+        results.append(report)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=20000, help="Stored vectors to read")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Embed this many synthetic chunks instead of reading the store")
+    parser.add_argument("--clustered", type=int, default=0,
+                        help="Use this many offline clustered unit vectors (no model needed)")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of --clustered vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query vectors")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 2, 5, 10])
+    args = parser.parse_args(argv)
+
+    if args.clustered:
+        vectors = clustered_vectors(args.clustered, args.dim)
+    elif args.synthetic:
+        vectors = synthetic_vectors(args.synthetic)
+    else:
+        vectors = stored_vectors(args.limit)
+    query_count = min(args.queries, len(vectors) // 2)
+    if query_count < 1:
+        print("Not enough vectors; translate a few passages first or pass --synthetic/--clustered N.", file=sys.stderr)
+        return 1
+
+    print(f"{len(vectors)} vectors of dim {vectors.shape[1]}, {query_count} held-out queries", file=sys.stderr)
+    print(json.dumps(measure(vectors, query_count, args.top_k), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Vector store benchmark: insert and query cost versus corpus size, per backend.
+
+Every (backend, corpus size) pair runs in its own subprocess against a
+fresh store in a temporary directory, driving the real `store_chunks`,
+`retrieve_similar_chunks` and `retrieve_similar_chunks_batch` functions.
+The corpus is synthetic and offline: multilingual chunks from
+benchmarks.corpus with clustered unit vectors (one cluster per sentence
+template, like paraphrases of the same affirmation), spread over `--users`
+users. Queries are noisy copies of a random user's stored chunks, filtered
+by that username like a translation request.
+
+Reported per run:
+  - insert: chunks/s and per-call p50/p95 through store_chunks
+  - single / batch: query latency p50/p95/p99 (ms), one query per call and
+    `--batch` queries per call (a chunked document)
+  - recall@k against exact top-k over the user's vectors
+  - disk_mb of the persistent store and peak_rss_mb of the run
+
+Usage (from the backend directory):
+    python -m benchmarks.vector_stores
+    python -m benchmarks.vector_stores --sizes 1000 10000 100000 1000000 --users 100 --backends chroma
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from .corpus import sample_chunks
+
+BACKENDS = ["chroma", "memory"]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+
+
+def _directory_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return round(total / (1024 * 1024), 2)
+
+
+def _percentiles(samples: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000
+    return {f"p{p}_ms": round(float(np.percentile(ms, p)), 3) for p in points}
+
+
+def synthetic_corpus(size: int, dim: int, seed: int = 0):
+    """
+    Chunks and clustered unit vectors.
+
+    Returns:
+        (texts, (size, dim) float32 vectors)
+    """
+    rng = np.random.default_rng(seed)
+    texts = sample_chunks(size, seed=seed, sentences_per_chunk=2)
+    centers = rng.standard_normal((64, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return texts, vectors
+
+
+def _exact_top_k(queries: np.ndarray, index: np.ndarray, k: int) -> List[set]:
+    distances = (index * index).sum(axis=1)[None, :] - 2 * queries @ index.T
+    return [set(row) for row in np.argsort(distances, axis=1)[:, :k].tolist()]
+
+
+def _run(backend: str, size: int, args: Dict, queue) -> None:
+    import logging
+
+    logging.disable(logging.INFO)
+    workdir = tempfile.mkdtemp(prefix=f"bench-{backend}-")
+    # get_chroma_client() persists under the working directory
+    os.chdir(workdir)
+
+    from app.config import settings
+    from app import vector_store
+
+    settings.VECTOR_STORE_BACKEND = backend
+    settings.VECTOR_STORE_MEMORY_PATH = os.path.join(workdir, "vector_store")
+    settings.VECTOR_STORE_SHARDS = args["shards"]
+
+    texts, vectors = synthetic_corpus(size, args["dim"], seed=size)
+    users = min(args["users"], size)
+    owner = np.arange(size) % users
+
+    insert_calls = []
+    started = time.perf_counter()
+    for u in range(users):
+        rows = np.flatnonzero(owner == u)
+        for start in range(0, len(rows), args["insert_batch"]):
+            batch = rows[start:start + args["insert_batch"]]
+            call_started = time.perf_counter()
+            vector_store.store_chunks(
+                [texts[i] for i in batch], vectors[batch], f"user{u}", session_id=f"bench{start}"
+            )
+            insert_calls.append(time.perf_counter() - call_started)
+    insert_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(1)
+    k = args["top_k"]
+    probes = []
+    for _ in range(args["queries"]):
+        u = int(rng.integers(users))
+        rows = np.flatnonzero(owner == u)
+        query = vectors[rng.choice(rows)] + 0.3 * rng.standard_normal(args["dim"]).astype(np.float32)
+        probes.append((u, rows, (query / np.linalg.norm(query)).astype(np.float32)))
+
+    vector_store.retrieve_similar_chunks(probes[0][2], top_k=k, username=f"user{probes[0][0]}")  # warm up
+
+    single, recalls = [], []
+    for u, rows, query in probes:
+        call_started = time.perf_counter()
+        results = vector_store.retrieve_similar_chunks(query, top_k=k, username=f"user{u}")
+        single.append(time.perf_counter() - call_started)
+
+        truth = _exact_top_k(query[None, :], vectors[rows], min(k, len(rows)))[0]
+        expected = {texts[rows[i]] for i in truth}
+        recalls.append(len(expected & {result["text"] for result in results}) / len(expected))
+
+    batched = []
+    for start in range(0, len(probes), args["batch"]):
+        group = probes[start:start + args["batch"]]
+        u = group[0][0]
+        call_started = time.perf_counter()
+        vector_store.retrieve_similar_chunks_batch(
+            np.stack([query for _, _, query in group]), top_k=k, username=f"user{u}"
+        )
+        batched.append(time.perf_counter() - call_started)
+
+    disk_mb = _directory_mb(workdir)
+    os.chdir(tempfile.gettempdir())
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    queue.put({
+        "backend": backend,
+        "total_chunks": size,
+        "users": users,
+        "chunks_per_user": size // users,
+        "insert": {
+            "chunks_per_second": round(size / insert_seconds, 1),
+            **_percentiles(insert_calls, (50, 95))
+        },
+        "single": _percentiles(single),
+        f"batch_{args['batch']}": _percentiles(batched),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "disk_mb": disk_mb,
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    })
+
+
+def run(backends: List[str], sizes: List[int], args: Dict) -> List[Dict]:
+    ctx = mp.get_context("spawn")
+    results = []
+    for size in sizes:
+        for backend in backends:
+            print(f"{backend}: {size} chunks over {min(args['users'], size)} users", file=sys.stderr)
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run, args=(backend, size, args, queue))
+            process.start()
+            result = queue.get()
+            process.join()
+            results.append(result)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Total chunks in the store")
+    parser.add_argument("--users", type=int, default=100, help="Users the chunks are spread over")
+    parser.add_argument("--shards", type=int, default=1, help="VECTOR_STORE_SHARDS for the run")
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension")
+    parser.add_argument("--insert-batch", type=int, default=32, help="Chunks per store_chunks call")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=8, help="Queries per batched call")
+    parser.add_argument("--top-k", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    settings = {
+        "users": args.users,
+        "shards": args.shards,
+        "dim": args.dim,
+        "insert_batch": args.insert_batch,
+        "queries": args.queries,
+        "batch": args.batch,
+        "top_k": args.top_k,
+    }
+    print(json.dumps(run(args.backends, args.sizes, settings), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,6 +28,8 @@ pip install torch torchvision torchaudio --index-url https://download.pytorch.or
 echo "[4/6] Installing application requirements..."
 # Exclude packages that might conflict or we already installed optimized versions of
 pip install -r requirements.txt
+# Trained English sentence model for app/segmentation.py (never downloaded at runtime)
+python3 -c "import nltk; nltk.download('punkt_tab', raise_on_error=True)"
 
 # 5. Playwright Setup (Headless Browser)
 echo "[5/6] Setting up Playwright..."
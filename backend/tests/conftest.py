@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Run from the backend directory layout: `app` is a top-level package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app.config requires it; tests never call the Hugging Face API
+os.environ.setdefault("HUGGINGFACE_API_KEY", "test")
@@ -0,0 +1,20 @@
+import threading
+
+import numpy as np
+
+from app import async_vector_store
+
+
+def test_retrieval_runs_on_the_read_executor(monkeypatch):
+    threads = []
+
+    def retrieve(query_embeddings, top_k=3, username=None):
+        threads.append(threading.current_thread().name)
+        return [[] for _ in query_embeddings]
+
+    monkeypatch.setattr(async_vector_store, "retrieve_similar_chunks_batch", retrieve)
+
+    contexts = async_vector_store.retrieve_similar_chunks_batch_bounded(np.zeros((2, 4)), top_k=2, username="u")
+
+    assert contexts == [[], []]
+    assert threads[0].startswith("vector-store-read")
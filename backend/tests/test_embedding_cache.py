@@ -0,0 +1,93 @@
+import numpy as np
+
+from app.cache import EmbeddingCache
+
+
+def _cache(path, **kwargs):
+    return EmbeddingCache(cache_dir=str(path), memory_budget_bytes=0, write_behind=False, **kwargs)
+
+
+def _vector(seed, dim=8):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def _stale_pair(path):
+    """Two instances where `b` indexes x2 but has only mapped the segment up to x1."""
+    a = _cache(path)
+    b = _cache(path)
+
+    a.set("x1", _vector(1))
+    np.testing.assert_array_equal(b.get_array("x1"), _vector(1))
+    a.set("x2", _vector(2))
+    # A miss makes b tail the index (now listing x2) without remapping the segment
+    assert b.get_array("missing") is None
+    return a, b
+
+
+def test_lookup_after_other_instance_compacts(tmp_path):
+    a, b = _stale_pair(tmp_path)
+
+    # Retires the generation b still uses and deletes its files
+    assert a.compact(force=True)
+
+    np.testing.assert_array_equal(b.get_array("x2"), _vector(2))
+    np.testing.assert_array_equal(b.get_array("x1"), _vector(1))
+    assert b.get_stats()["generation"] == a.get_stats()["generation"]
+
+
+def test_lookup_after_other_instance_clears(tmp_path):
+    a, b = _stale_pair(tmp_path)
+
+    a.clear()
+
+    assert b.get_array("x2") is None
+    assert b.get_stats()["generation"] == a.get_stats()["generation"]
+
+
+def test_writes_after_compaction_reach_stale_instance(tmp_path):
+    a, b = _stale_pair(tmp_path)
+
+    a.compact(force=True)
+    a.set("x3", _vector(3))
+
+    np.testing.assert_array_equal(b.get_array("x3"), _vector(3))
+
+
+def test_flush_waiting_on_file_lock_does_not_block_lookups(tmp_path):
+    import fcntl
+    import threading
+
+    cache = _cache(tmp_path)
+    cache.set("x1", _vector(1))
+    cache.write_behind = True
+    cache.set("x2", _vector(2))
+
+    results = {}
+
+    def lookups():
+        results["x1"] = cache.get_array("x1")
+        results["x2"] = cache.get_array("x2")
+        results["missing"] = cache.get_array("missing")
+
+    # Another worker holds the writer lock while this process flushes
+    with open(tmp_path / ".lock", "a+") as other_worker:
+        fcntl.flock(other_worker.fileno(), fcntl.LOCK_EX)
+        try:
+            flusher = threading.Thread(target=cache.flush, daemon=True)
+            flusher.start()
+            flusher.join(timeout=0.2)
+            assert flusher.is_alive()
+
+            reader = threading.Thread(target=lookups, daemon=True)
+            reader.start()
+            reader.join(timeout=2)
+            assert not reader.is_alive(), "lookups blocked behind the flush"
+        finally:
+            fcntl.flock(other_worker.fileno(), fcntl.LOCK_UN)
+    flusher.join(timeout=5)
+
+    np.testing.assert_array_equal(results["x1"], _vector(1))
+    np.testing.assert_array_equal(results["x2"], _vector(2))
+    assert results["missing"] is None
+    assert cache.get_stats()["pending_writes"] == 0
+    np.testing.assert_array_equal(_cache(tmp_path).get_array("x2"), _vector(2))
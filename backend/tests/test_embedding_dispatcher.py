@@ -0,0 +1,55 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.embedding_dispatcher import EmbeddingDispatcher
+
+
+def _encode(texts):
+    return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_concurrent_requests_share_a_batch():
+    dispatcher = EmbeddingDispatcher(_encode, max_wait_ms=50)
+    results = {}
+
+    def request(texts):
+        results[tuple(texts)] = dispatcher.encode(texts)
+
+    threads = [threading.Thread(target=request, args=(texts,)) for texts in (["a", "bb"], ["bb", "ccc"])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results[("a", "bb")][:, 0].tolist() == [1, 2]
+    assert results[("bb", "ccc")][:, 0].tolist() == [2, 3]
+    assert dispatcher.get_stats()["batches"] == 1
+
+
+@pytest.mark.parametrize("broken", [
+    lambda texts: np.zeros((len(texts) - 1, 2)),  # too few rows
+    lambda texts: 1 / 0,
+])
+def test_failed_batch_fails_callers_and_dispatcher_keeps_running(broken):
+    calls = []
+
+    def encode(texts):
+        calls.append(texts)
+        return broken(texts) if len(calls) == 1 else _encode(texts)
+
+    dispatcher = EmbeddingDispatcher(encode, max_wait_ms=1)
+
+    with pytest.raises(Exception):
+        dispatcher.encode(["a", "bb"])
+    assert dispatcher.encode(["ccc"])[:, 0].tolist() == [3]
+
+
+def test_stats_failure_does_not_hang_callers(monkeypatch):
+    dispatcher = EmbeddingDispatcher(_encode, max_wait_ms=1)
+    monkeypatch.setattr(dispatcher, "_record", lambda *args: 1 / 0)
+
+    # Results were already delivered; the stats error is only logged
+    assert dispatcher.encode(["a"])[:, 0].tolist() == [1]
+    assert dispatcher.encode(["bb"])[:, 0].tolist() == [2]
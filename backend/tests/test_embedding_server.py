@@ -0,0 +1,48 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.embedding_server import (
+    EmbeddingClient,
+    EmbeddingServer,
+    EmbeddingServerError,
+    EmbeddingServerUnavailable,
+)
+
+
+class _FakeServer(EmbeddingServer):
+    def dispatch(self, request):
+        texts = request.get("texts") or []
+        if "bad" in texts:
+            raise ValueError("bad input")
+        embeddings = np.ones((len(texts), 2), dtype=np.float32)
+        return {"ok": True, "shape": list(embeddings.shape)}, embeddings.tobytes()
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = _FakeServer(str(tmp_path / "embeddings.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_missing_socket_is_unavailable(tmp_path):
+    client = EmbeddingClient(str(tmp_path / "missing.sock"), timeout=1.0)
+    with pytest.raises(EmbeddingServerUnavailable):
+        client.encode(["a"])
+
+
+def test_server_errors_are_not_unavailability(server):
+    client = EmbeddingClient(server.socket_path, timeout=1.0)
+
+    with pytest.raises(EmbeddingServerError, match="bad input") as excinfo:
+        client.encode(["bad"])
+    assert not isinstance(excinfo.value, EmbeddingServerUnavailable)
+
+    # The connection stays usable after an application error
+    assert client.encode(["a", "b"]).shape == (2, 2)
+
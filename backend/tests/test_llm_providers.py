@@ -0,0 +1,59 @@
+import requests
+
+from app import rag_translate
+from app.config import settings
+from app.llm_providers import (
+    DeepSeekProvider,
+    GroqProvider,
+    NovitaProvider,
+    OllamaProvider,
+    provider_manager,
+)
+
+
+class _Response:
+    ok = True
+
+
+def _ollama_down(*args, **kwargs):
+    raise requests.ConnectionError("Connection refused")
+
+
+def test_chunks_leave_room_for_the_prompt():
+    assert NovitaProvider().chunk_output_tokens == NovitaProvider.max_output_tokens
+    # 4096-token window: 4000 output tokens would leave 96 for the prompt
+    assert OllamaProvider().chunk_output_tokens == 2048
+
+
+def test_ollama_counts_only_when_reachable(monkeypatch):
+    monkeypatch.setattr(requests, "get", _ollama_down)
+    assert not OllamaProvider().is_configured()
+
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: _Response())
+    assert OllamaProvider().is_configured()
+
+
+def test_only_configured_providers_size_requests(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "")
+    monkeypatch.setattr(settings, "DEEPSEEK_API_KEY", "key")
+    monkeypatch.setattr(provider_manager, "providers", [
+        NovitaProvider(), DeepSeekProvider(), GroqProvider(), OllamaProvider()
+    ])
+    monkeypatch.setattr(requests, "get", _ollama_down)
+
+    assert [type(provider) for provider in provider_manager.configured] == [NovitaProvider, DeepSeekProvider]
+
+
+def test_chunk_budget_fits_the_smallest_window(monkeypatch):
+    ollama = OllamaProvider()
+    monkeypatch.setattr(provider_manager, "providers", [NovitaProvider(), ollama])
+    monkeypatch.setattr(rag_translate, "_token_budgets", {})
+
+    monkeypatch.setattr(ollama, "is_configured", lambda: False)
+    novita_only = rag_translate.get_chunk_token_budget("ta")
+
+    monkeypatch.setattr(ollama, "is_configured", lambda: True)
+    with_ollama = rag_translate.get_chunk_token_budget("ta")
+
+    assert with_ollama < novita_only
+    assert with_ollama <= ollama.chunk_output_tokens
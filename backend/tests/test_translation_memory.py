@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import time
+
+from app.translation_memory import TranslationMemory, translation_key
+
+
+def _memory(path, **kwargs):
+    kwargs.setdefault("flush_interval", 0)
+    return TranslationMemory(str(path / "tm.sqlite3"), **kwargs)
+
+
+def _row(memory, text, language="ta"):
+    conn = sqlite3.connect(memory.db_path)
+    try:
+        return conn.execute(
+            "SELECT hits, last_used FROM translation_memory WHERE key = ?",
+            (translation_key(text, language),)
+        ).fetchone()
+    finally:
+        conn.close()
+
+
+def test_hits_are_buffered_until_flushed(tmp_path):
+    memory = _memory(tmp_path)
+    memory.store_many(["Hello.", "World."], ["வணக்கம்.", "உலகம்."], "ta")
+
+    assert memory.lookup_many(["Hello.", "Hello.", "Missing."], "ta")[:2] == ["வணக்கம்.", "வணக்கம்."]
+    memory.lookup("Hello.", "ta")
+    assert _row(memory, "Hello.")[0] == 0
+
+    assert memory.flush_hits() == 1
+    assert _row(memory, "Hello.")[0] == 2
+    assert _row(memory, "World.")[0] == 0
+
+
+def test_lookup_does_not_wait_for_writers(tmp_path):
+    memory = _memory(tmp_path)
+    memory.store_many(["Hello."], ["வணக்கம்."], "ta")
+
+    # Another worker holds the write lock
+    writer = sqlite3.connect(memory.db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        results = []
+        reader = threading.Thread(target=lambda: results.append(memory.lookup("Hello.", "ta")), daemon=True)
+        reader.start()
+        reader.join(timeout=2)
+        assert results == ["வணக்கம்."]
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+
+def test_prune_by_ttl_and_cap(tmp_path):
+    memory = _memory(tmp_path, max_entries=2, ttl_seconds=3600)
+    memory.store_many(["a.", "b.", "c.", "d."], ["A.", "B.", "C.", "D."], "hi")
+
+    conn = sqlite3.connect(memory.db_path)
+    with conn:
+        now = time.time()
+        for text, age in (("a.", 7200), ("b.", 30), ("c.", 20), ("d.", 10)):
+            conn.execute(
+                "UPDATE translation_memory SET last_used = ? WHERE key = ?",
+                (now - age, translation_key(text, "hi"))
+            )
+    conn.close()
+    # A hit buffered before the prune keeps "b." alive
+    memory.lookup("b.", "hi")
+
+    assert memory.prune() == 2
+    assert memory.lookup_many(["a.", "b.", "c.", "d."], "hi") == [None, "B.", None, "D."]
+    assert memory.get_stats()["pruned"] == 2
+
+
+def test_prunes_without_any_lookup(tmp_path):
+    path = tmp_path / "tm.sqlite3"
+    seed = TranslationMemory(str(path), flush_interval=0)
+    seed.store_many(["old.", "a.", "b.", "c."], ["OLD.", "A.", "B.", "C."], "ta")
+    conn = sqlite3.connect(path)
+    with conn:
+        now = time.time()
+        for text, age in (("old.", 7200), ("a.", 30), ("b.", 20), ("c.", 10)):
+            conn.execute(
+                "UPDATE translation_memory SET last_used = ? WHERE key = ?",
+                (now - age, translation_key(text, "ta"))
+            )
+    conn.close()
+    seed.close()
+
+    # A worker that only ever stores new text still enforces the TTL and cap
+    memory = TranslationMemory(str(path), flush_interval=0.05, max_entries=2, ttl_seconds=3600)
+    try:
+        deadline = time.monotonic() + 5
+        while memory.get_stats()["pruned"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert memory.get_stats()["total_entries"] == 2
+        assert memory.get_stats()["pruned"] == 2
+    finally:
+        memory.close()